@@ -0,0 +1,183 @@
+"""
+Report Artifact Store
+Reuses everything derived from a report across workflows that upload the same content
+
+Every bridge call builds a fresh OrchestratorAgent, so uploading the same hospital
+report again used to repeat the text extraction, the stakeholder and summary extraction
+and every per-stakeholder context call. Artifacts are stored under a hash of the content
+they were derived from (the downloaded file bytes for the extracted text, the extracted
+text for everything else) together with a version built from the prompts and the model
+that produced them; an entry with another version is stale and is recomputed.
+
+Artifacts:
+    text        Text extracted from a report file
+    extraction  {"stakeholders": [...], "company_summary": str} of a report text
+    context-*   Relevant context of one stakeholder (see context_artifact)
+    context-*-sources  Hashes of the report sections that context was built from
+    engagement  Engagement suggestions index of a report text (see agents/engagement_index.py)
+    document    Sections, pages and tables of a report text (see utils/document_model.py)
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from utils.section_cache import report_fingerprint
+from utils.structured_logger import get_logger
+
+_log = get_logger("Artifacts")
+
+# Bump when text extraction changes in a way that should not reuse older text
+TEXT_EXTRACTION_VERSION = "1"
+
+
+def content_hash(content) -> str:
+    """SHA-256 of raw file bytes or of a text."""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return hashlib.sha256(content or b"").hexdigest()
+
+
+def artifact_version(*parts: str) -> str:
+    """Version of an artifact: a short hash over the prompts, model and settings that shape it."""
+    return report_fingerprint(*parts)[:16]
+
+
+def context_artifact(stakeholder: dict) -> str:
+    """Artifact name of a stakeholder's relevant context."""
+    identity = report_fingerprint(stakeholder.get('name', ''), stakeholder.get('title', ''),
+                                  stakeholder.get('details', ''))
+    return f"context-{identity[:24]}"
+
+
+def context_sources_artifact(stakeholder: dict) -> str:
+    """Artifact name of the section hashes a stakeholder's context was built from."""
+    return f"{context_artifact(stakeholder)}-sources"
+
+
+class ReportArtifactStore:
+    """
+    Content-addressed artifacts, kept in an in-memory LRU in front of one JSON file per
+    artifact (<artifact_dir>/<content hash>/<artifact>.json).
+
+    Usage:
+        key = content_hash(report)
+        extraction = ARTIFACT_STORE.get(key, "extraction", version)
+        if extraction is None:
+            ...
+            ARTIFACT_STORE.put(key, "extraction", version, extraction)
+    """
+
+    def __init__(self, artifact_dir: str = None, max_memory_entries: int = 512):
+        self.artifact_dir = artifact_dir
+        self.max_memory_entries = max_memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def get(self, key: str, artifact: str, version: str):
+        """
+        Return a stored artifact, or None if it is missing or was produced by another version.
+
+        Args:
+            key: content_hash() of the content the artifact was derived from
+            artifact: Artifact name ("text", "extraction", context_artifact(...))
+            version: artifact_version() of the current prompts and model
+        """
+        memory_key = (key, artifact)
+        with self._lock:
+            entry = self._memory.get(memory_key)
+            if entry is not None:
+                self._memory.move_to_end(memory_key)
+        if entry is None:
+            entry = self._read_entry(key, artifact)
+            if entry is not None:
+                with self._lock:
+                    self._remember(memory_key, entry)
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.get('version') != version:
+                self.stale += 1
+                _log.debug("Artifact %s of %s is stale (version %s, current %s)", artifact, key[:12],
+                           entry.get('version'), version)
+                return None
+            self.hits += 1
+            return entry.get('value')
+
+    def put(self, key: str, artifact: str, version: str, value):
+        """Store an artifact, replacing any other version of it."""
+        entry = {"version": version, "value": value}
+        with self._lock:
+            self._remember((key, artifact), entry)
+        self._write_entry(key, artifact, entry)
+
+    def clear(self, key: str):
+        """Drop every artifact derived from one content hash."""
+        with self._lock:
+            for memory_key in [k for k in self._memory if k[0] == key]:
+                del self._memory[memory_key]
+        directory = self._directory(key)
+        if not directory or not os.path.isdir(directory):
+            return
+        for name in os.listdir(directory):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+    def _remember(self, memory_key: tuple, entry: dict):
+        """Insert into the in-memory LRU (caller holds the lock)."""
+        self._memory[memory_key] = entry
+        self._memory.move_to_end(memory_key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _directory(self, key: str) -> str:
+        if not self.artifact_dir:
+            return None
+        safe_key = "".join(c for c in key if c.isalnum())
+        return os.path.join(self.artifact_dir, safe_key)
+
+    def _entry_path(self, key: str, artifact: str) -> str:
+        safe_artifact = "".join(c for c in artifact if c.isalnum() or c in "-_")
+        return os.path.join(self._directory(key), f"{safe_artifact}.json")
+
+    def _read_entry(self, key: str, artifact: str) -> dict:
+        if not self.artifact_dir:
+            return None
+        try:
+            with open(self._entry_path(key, artifact), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if isinstance(entry, dict) else None
+
+    def _write_entry(self, key: str, artifact: str, entry: dict):
+        if not self.artifact_dir:
+            return
+        path = self._entry_path(key, artifact)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write atomically so a workflow reading the same report never sees a partial file
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, default=str)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            _log.warning("Could not persist artifact %s: %s", artifact, e)
+
+
+# Shared by every agent in the process; set REPORT_ARTIFACT_DIR="" to keep artifacts in memory only
+ARTIFACT_STORE = ReportArtifactStore(
+    artifact_dir=os.getenv(
+        'REPORT_ARTIFACT_DIR',
+        os.path.join(tempfile.gettempdir(), 'stakeholder_report_artifacts')
+    ) or None
+)
@@ -3,6 +3,8 @@ Base Agent Class
 """
 from abc import ABC, abstractmethod
 from utils.llm_api import LLMClient
+from utils.llm_limits import LLM_GATE
+from utils.structured_logger import get_logger
 
 class Agent(ABC):
     """
@@ -10,7 +12,9 @@ class Agent(ABC):
     """
     def __init__(self, name, model="google/gemini-2.5-flash"):
         self.name = name
-        self.llm_client = LLMClient(model=model)
+        # Calls share the process-wide concurrency limit and token budget
+        self.llm_client = LLM_GATE.wrap(LLMClient(model=model))
+        self.log = get_logger(name)
 
     @abstractmethod
     async def run(self, *args, **kwargs):
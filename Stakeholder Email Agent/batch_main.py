@@ -0,0 +1,73 @@
+"""
+Stakeholder Email Outreach System - Batch Mode
+Runs every report of a manifest in one process (see agents/batch_orchestrator.py)
+
+Usage:
+    python batch_main.py MANIFEST.json [--output-dir DIR] [--max-reports N]
+                         [--llm-concurrency N] [--token-budget TOKENS] [--rerun]
+
+--llm-concurrency and --token-budget apply across all reports and default to
+LLM_MAX_CONCURRENCY and LLM_TOKEN_BUDGET. Progress is logged after every report and
+DIR/summary.json is kept up to date while the batch runs.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+from agents.batch_orchestrator import BatchOrchestrator, load_manifest
+from utils.llm_limits import LLM_GATE
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate stakeholder emails for a batch of reports")
+    parser.add_argument("manifest", help="JSON manifest of reports and generation modes")
+    parser.add_argument("--output-dir", default=f"batch_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                        help="Directory of the per-report results and summary.json")
+    parser.add_argument("--max-reports", type=int, default=int(os.getenv('BATCH_MAX_REPORTS', '4')),
+                        help="Reports in progress at once")
+    parser.add_argument("--llm-concurrency", type=int, default=LLM_GATE.max_concurrency,
+                        help="LLM calls in flight across all reports (0 = no limit)")
+    parser.add_argument("--token-budget", type=int, default=LLM_GATE.token_budget,
+                        help="Estimated LLM tokens for the whole batch (0 = no budget)")
+    parser.add_argument("--rerun", action="store_true",
+                        help="Also run reports that completed in an earlier run with this output directory")
+    return parser.parse_args(argv)
+
+
+async def main(argv=None) -> int:
+    args = parse_args(argv)
+    if not os.getenv("OPENROUTER_API_KEY"):
+        print("ERROR: OPENROUTER_API_KEY environment variable not set")
+        return 1
+    try:
+        entries = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: Could not read manifest: {e}")
+        return 1
+
+    LLM_GATE.configure(max_concurrency=args.llm_concurrency, token_budget=args.token_budget)
+    batch = BatchOrchestrator(args.output_dir, max_reports=args.max_reports, rerun=args.rerun)
+    summary = await batch.run(entries)
+
+    print("\n" + "="*60)
+    print("BATCH SUMMARY")
+    print("="*60)
+    for result in summary['results']:
+        status = result.get('skipped') or result['status']
+        print(f"  {result['id']}: {status} - {result.get('emails', 0)} emails"
+              + (f" ({result['error']})" if result.get('error') else ""))
+    print(f"\nReports: {summary['counts']}")
+    print(f"LLM calls: {summary['llm']['calls']}, ~{summary['llm']['prompt_tokens'] + summary['llm']['completion_tokens']} tokens")
+    print(f"✓ Results written to: {args.output_dir}")
+    print("="*60)
+    return 0 if summary['counts'].get('failed', 0) == 0 else 2
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(asyncio.run(main()))
+    except KeyboardInterrupt:
+        print("\nBatch interrupted; re-run with the same --output-dir to continue.")
+        sys.exit(130)
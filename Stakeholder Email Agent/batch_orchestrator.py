@@ -0,0 +1,269 @@
+"""
+Batch Orchestrator
+Runs the full workflow for many reports in one process
+
+A manifest lists the reports and their generation modes. Several OrchestratorAgent
+workflows run at once (max_reports); across all of them LLM calls share the
+process-wide concurrency limit and token budget (see utils/llm_limits.py). Every report
+gets its own results directory, and a summary of the whole batch is rewritten after each
+report so progress can be followed while the batch runs.
+
+Manifest (JSON):
+    {
+      "defaults": {"generation_mode": "ai_style", "mode_config": {"style_key": "..."}},
+      "reports": [
+        {"id": "medstar-franklin", "path": "reports/medstar.pdf"},
+        {"id": "thomas", "url": "https://.../report.pdf", "max_stakeholders": 10,
+         "generation_mode": "template", "mode_config": {"template_key": "..."}},
+        {"path": "reports/st-marys.txt", "stakeholders": ["Kim Schwenk", "Stuart Levine"]}
+      ]
+    }
+
+Relative paths are resolved against the manifest. "stakeholders" limits generation to
+those extracted names; "max_stakeholders" to the first N. A report without an "id" is
+named after its file.
+
+Results (output_dir):
+    <report id>/stakeholders.json, emails.json, result.json
+    summary.json
+A re-run with the same output directory skips reports whose result is complete; stage
+checkpoints (see utils/checkpoint_store.py) let unfinished reports resume.
+"""
+import asyncio
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.llm_limits import LLM_GATE, LLMBudgetExceeded
+from utils.stakeholder_dedupe import normalize_name
+from utils.structured_logger import get_logger
+
+
+def load_manifest(path: str) -> list:
+    """
+    Read a manifest into one entry per report, with defaults applied and paths resolved.
+
+    Raises:
+        ValueError: If a report has neither "path" nor "url", or report ids repeat
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if isinstance(manifest, list):
+        manifest = {"reports": manifest}
+    defaults = manifest.get('defaults', {})
+    base_dir = os.path.dirname(os.path.abspath(path))
+
+    entries = []
+    seen = set()
+    for position, report in enumerate(manifest.get('reports', []), 1):
+        entry = dict(defaults, **report)
+        if entry.get('path'):
+            entry['path'] = os.path.join(base_dir, entry['path'])
+        elif not entry.get('url'):
+            raise ValueError(f"Report {position} of {path} has neither a path nor a url")
+        source = entry.get('path') or entry['url']
+        entry['id'] = report_id(entry.get('id') or os.path.splitext(os.path.basename(source.split('?')[0]))[0])
+        if entry['id'] in seen:
+            raise ValueError(f"Report id {entry['id']!r} appears more than once in {path}")
+        seen.add(entry['id'])
+        entry.setdefault('generation_mode', 'ai_style')
+        entry.setdefault('mode_config', {})
+        entries.append(entry)
+    return entries
+
+
+def report_id(value: str) -> str:
+    """Directory-safe report id."""
+    return re.sub(r"[^A-Za-z0-9._-]+", "-", str(value)).strip("-.") or "report"
+
+
+def select_stakeholders(stakeholders: list, entry: dict) -> list:
+    """The stakeholders of a report to write emails for, per its "stakeholders" and "max_stakeholders"."""
+    selected = stakeholders
+    if entry.get('stakeholders'):
+        wanted = {normalize_name(name) for name in entry['stakeholders']}
+        selected = [s for s in selected if normalize_name(s.get('name', '')) in wanted]
+    if entry.get('max_stakeholders'):
+        selected = selected[:int(entry['max_stakeholders'])]
+    return selected
+
+
+def _write_json(path: str, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+
+class BatchOrchestrator:
+    """
+    Runs OrchestratorAgent workflows for a list of manifest entries.
+
+    Usage:
+        batch = BatchOrchestrator("batch_results", max_reports=4)
+        summary = await batch.run(load_manifest("manifest.json"))
+    """
+
+    def __init__(self, output_dir: str, max_reports: int = 4, rerun: bool = False,
+                 orchestrator_factory=None, gate=None, log=None):
+        """
+        Args:
+            output_dir: Directory of the per-report results and summary.json
+            max_reports: Reports in progress at once
+            rerun: Also run reports that completed in an earlier batch
+            orchestrator_factory: Builds the OrchestratorAgent of one report
+            gate: LLMGate whose usage is reported (defaults to LLM_GATE)
+            log: Logger (defaults to a "BatchOrchestrator" logger)
+        """
+        if orchestrator_factory is None:
+            from agents.orchestrator import OrchestratorAgent
+            orchestrator_factory = OrchestratorAgent
+        self.output_dir = output_dir
+        self.max_reports = max(1, max_reports)
+        self.rerun = rerun
+        self.orchestrator_factory = orchestrator_factory
+        self.gate = gate or LLM_GATE
+        self.log = log or get_logger("BatchOrchestrator")
+        self.results = {}
+
+    async def run(self, entries: list) -> dict:
+        """
+        Run every entry and return the batch summary (also written to summary.json).
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._started = time.monotonic()
+        self._entries = entries
+        # Blocking LLM calls run in worker threads; size the pool for every report's stages
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=max(32, self.gate.max_concurrency * 2)))
+
+        semaphore = asyncio.Semaphore(self.max_reports)
+
+        async def run_one(entry):
+            async with semaphore:
+                result = await self._run_report(entry)
+            self.results[entry['id']] = result
+            self._report_progress(result)
+
+        self.log.info("Starting batch of %d reports (%d at a time)", len(entries), self.max_reports,
+                      category="stage")
+        await asyncio.gather(*(run_one(entry) for entry in entries))
+        summary = self._write_summary()
+        self.log.info("Batch finished in %.0fs: %s", summary['seconds'], summary['counts'], category="stage")
+        return summary
+
+    async def _run_report(self, entry: dict) -> dict:
+        """Run one report's workflow and write its results directory."""
+        report_dir = os.path.join(self.output_dir, entry['id'])
+        os.makedirs(report_dir, exist_ok=True)
+        result_path = os.path.join(report_dir, "result.json")
+        previous = self._read_result(result_path)
+        if previous and previous.get('status') == "complete" and not self.rerun:
+            return dict(previous, skipped="already complete")
+
+        result = {"id": entry['id'], "source": entry.get('path') or entry.get('url'),
+                  "generation_mode": entry['generation_mode'], "status": "failed"}
+        if self.gate.exhausted:
+            result.update(status="skipped", error="LLM token budget spent")
+            _write_json(result_path, result)
+            return result
+
+        started = time.monotonic()
+        with self.gate.track() as usage:
+            try:
+                result.update(await self._run_workflow(entry, report_dir))
+            except LLMBudgetExceeded as e:
+                result['error'] = str(e)
+            except Exception as e:
+                self.log.error("Report %s failed: %s", entry['id'], e)
+                result['error'] = str(e)
+        result['seconds'] = round(time.monotonic() - started, 1)
+        result['llm'] = dict(usage)
+        _write_json(result_path, result)
+        return result
+
+    async def _run_workflow(self, entry: dict, report_dir: str) -> dict:
+        orchestrator = self.orchestrator_factory()
+        # Checkpoints per report, so a re-run of the batch resumes unfinished reports
+        orchestrator.workflow_id = f"batch-{entry['id']}"
+        if entry.get('path'):
+            report_input = {"type": "text", "content": await asyncio.to_thread(self._read_report, entry['path'])}
+        else:
+            report_input = {"type": "file_url", "url": entry['url']}
+        report = await asyncio.to_thread(orchestrator._load_report, report_input)
+
+        stakeholders, company_summary = await orchestrator.extract_stakeholders_and_summary(report)
+        # Generation dedupes the selection too; doing it first keeps the email count comparable
+        stakeholders = orchestrator._dedupe_stakeholders(stakeholders)
+        _write_json(os.path.join(report_dir, "stakeholders.json"),
+                    {"stakeholders": stakeholders, "company_summary": company_summary})
+        selected = select_stakeholders(stakeholders, entry)
+        if not selected:
+            return {"status": "failed", "stakeholders": len(stakeholders), "emails": 0,
+                    "error": "No stakeholders to write to"}
+
+        emails = await orchestrator.generate_emails_for_selected_stakeholders(
+            report_input=report_input,
+            selected_stakeholders=selected,
+            company_summary=company_summary,
+            generation_mode=entry['generation_mode'],
+            mode_config=entry['mode_config']
+        )
+        _write_json(os.path.join(report_dir, "emails.json"), emails)
+        unfinished = sum(1 for email in emails if email.get('status', 'complete') != "complete")
+        complete = len(emails) == len(selected) and not unfinished
+        return {"status": "complete" if complete else "partial", "stakeholders": len(stakeholders),
+                "selected": len(selected), "emails": len(emails), "unfinished": unfinished}
+
+    @staticmethod
+    def _read_report(path: str) -> str:
+        if path.lower().endswith(('.pdf', '.html', '.htm')):
+            from utils.document_model import store_document_model
+            from utils.text_extraction import extract_document_from_file
+            document = extract_document_from_file(path)
+            store_document_model(document)
+            return document.text
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    @staticmethod
+    def _read_result(path: str) -> dict:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _report_progress(self, result: dict):
+        done = len(self.results)
+        counts = self._counts()
+        budget = f" of {self.gate.token_budget}" if self.gate.token_budget else ""
+        self.log.info("[%d/%d] %s: %s (%s emails, %ss) | %s | ~%d tokens%s used", done, len(self._entries), result['id'],
+                      result.get('skipped') or result['status'], result.get('emails', 0), result.get('seconds', 0),
+                      ", ".join(f"{n} {status}" for status, n in counts.items()), self.gate.tokens_used, budget,
+                      category="stage")
+        self._write_summary()
+
+    def _counts(self) -> dict:
+        counts = {}
+        for result in self.results.values():
+            counts[result['status']] = counts.get(result['status'], 0) + 1
+        return counts
+
+    def _write_summary(self) -> dict:
+        pending = [e['id'] for e in self._entries if e['id'] not in self.results]
+        summary = {
+            "reports": len(self._entries),
+            "finished": len(self.results),
+            "counts": self._counts(),
+            "seconds": round(time.monotonic() - self._started, 1),
+            "llm": dict(self.gate.usage, max_in_flight=self.gate.max_in_flight,
+                        token_budget=self.gate.token_budget or None),
+            "results": list(self.results.values()),
+        }
+        if pending:
+            summary["pending"] = pending
+        _write_json(os.path.join(self.output_dir, "summary.json"), summary)
+        return summary
@@ -1,6 +1,12 @@
         }
 
 
+def emit_email_event(email: dict):
+    """Write a finished email to stderr as an "email" event line (stdout is reserved for the result)."""
+    sys.stderr.write("LOG:" + json.dumps({"type": "email", "data": email}, default=str) + "\n")
+    sys.stderr.flush()
+
+
 async def generate_emails(
     report_input: dict,
     selected_stakeholders: list,
@@ -14,17 +20,28 @@ async def generate_emails(
         logger.log("info", "Orchestrator", f"Starting email generation for {len(selected_stakeholders)} stakeholders...")
         
         orchestrator = OrchestratorAgent()
+        # Checkpoint per workflow so a re-run after a crash resumes instead of starting over
+        orchestrator.workflow_id = os.getenv('WORKFLOW_ID') or None
         
-        # Generate emails for pre-selected stakeholders (non-interactive)
-        emails = await orchestrator.generate_emails_for_selected_stakeholders(
+        # Generate emails for pre-selected stakeholders (non-interactive), emitting each one
+        # as soon as it is finished so the webapp can persist and display it incrementally
+        emails = []
+        async for email in orchestrator.stream_emails_for_selected_stakeholders(
             report_input=report_input,
             selected_stakeholders=selected_stakeholders,
             company_summary=company_summary,
             generation_mode=generation_mode,
             mode_config=mode_config
-        )
+        ):
+            emit_email_event(email)
+            emails.append(email)
+        
+        # The final result keeps the stakeholders' input order
+        positions = {s.get('id', i): i for i, s in enumerate(selected_stakeholders)}
+        emails.sort(key=lambda email: positions.get(email.get('stakeholder_id'), len(positions)))
         
-        logger.log("info", "Orchestrator", f"Generated {len(emails)} emails")
+        unfinished = sum(1 for email in emails if email.get('status', 'complete') != 'complete')
+        logger.log("info", "Orchestrator", f"Generated {len(emails)} emails ({unfinished} partial, timed out or failed)")
         
         return {
             "success": True,
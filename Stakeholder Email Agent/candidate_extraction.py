@@ -0,0 +1,201 @@
+"""
+Candidate Pre-Extraction for the Orchestrator Agent
+Finds the lines of a report that can name a stakeholder and sends only those to the LLM
+
+Most of a strategic sales report (market data, product detail, references) says nothing
+about people. A local pass scores every line for stakeholder signals - a title from the
+role lexicon, a credential (MD, RN, MSN, MBA...), an honorific or capitalized personal
+name, a list/heading structure - and keeps the candidate lines plus a few lines of
+surrounding context. Stakeholder extraction then reads those windows instead of the
+whole report; the company summary still reads the full text.
+"""
+import os
+import re
+
+from agents.combined_extraction import parse_json_response, validate_stakeholders
+from agents.email_writer import ROLE_SECTION_MAPPING
+from prompts.orchestrator_prompts import CANDIDATE_STAKEHOLDER_EXTRACTION_PROMPT
+from utils.structured_logger import get_logger
+
+# Role keywords that have their own section in the role library, plus general leadership titles
+TITLE_LEXICON = tuple(sorted(set(ROLE_SECTION_MAPPING) | {
+    "president", "vice president", "vp", "svp", "evp", "chief", "officer", "director", "manager",
+    "coordinator", "administrator", "chair", "chairman", "head of", "lead", "leader", "founder",
+    "partner", "physician", "nurse", "pharmacist", "hospitalist", "intensivist", "surgeon",
+    "cfo", "coo", "cno", "cio", "cto", "cmio", "cnio", "cro", "ciso",
+}, key=len, reverse=True))
+
+_TITLE_RE = re.compile(r"\b(?:" + "|".join(re.escape(t) for t in TITLE_LEXICON) + r")\b", re.IGNORECASE)
+CREDENTIAL_RE = re.compile(
+    r"(?<![A-Za-z])(?:M\.?D|D\.?O|R\.?N|BSN|MSN|DNP|APRN|CRNA|NP|PA-C|Ph\.?D|PharmD|MBA|MPH|MHA|MHS|FACEP|FACHE|FACS)"
+    r"(?![A-Za-z])"
+)
+HONORIFIC_NAME_RE = re.compile(r"\b(?:Dr|Mr|Mrs|Ms|Prof)\.?\s+[A-Z][a-zA-Z'’\-]+")
+_NAME_WORD = r"(?:Mc|Mac|O['’])?[A-Z][a-z]+(?:['’\-][A-Z]?[a-z]+)?"
+NAME_RE = re.compile(rf"\b{_NAME_WORD}(?:\s+[A-Z]\.)*\s+{_NAME_WORD}(?:\s+{_NAME_WORD})?(?![a-z])")
+LIST_RE = re.compile(r"^\s*(?:[-*•▪>#]+|\d{1,2}[.)]|[A-Za-z][.)])\s+|\|")
+# Authors of cited works are not stakeholders; candidates stop at the reference list
+REFERENCES_RE = re.compile(r"^\W*(?:references|bibliography|works cited|sources)\W*$", re.IGNORECASE)
+
+# Capitalized words that start headings and sentences far more often than they start names
+_NON_NAME_WORDS = frozenset("""
+The This That These Those Their Our Your Its His Her And For With From Into About After Before During
+Key Recent Current Company Market Strategic Executive Summary Overview Table Figure Section Chapter
+Department Center Centre Hospital Medical Health Healthcare System University College School Institute
+Emergency Quality Clinical Patient Sepsis Program Report Research Results Methods Discussion Conclusion
+North South East West New United States American National International Global Group Inc Corp
+January February March April May June July August September October November December
+""".split())
+
+
+def score_line(line: str) -> int:
+    """
+    Score how likely a line is to name or describe a stakeholder.
+
+    Credentials and honorific names count 2, a title from the lexicon 1, each distinct
+    capitalized personal name 1 (at most 2), and list/heading structure 1 when the line
+    also carries another signal.
+    """
+    score = 0
+    if CREDENTIAL_RE.search(line):
+        score += 2
+    if HONORIFIC_NAME_RE.search(line):
+        score += 2
+    if _TITLE_RE.search(line):
+        score += 1
+    names = {m.group(0) for m in NAME_RE.finditer(line)
+             if not any(word in _NON_NAME_WORDS for word in re.findall(r"[A-Za-z]+", m.group(0)))}
+    score += min(2, len(names))
+    if score and LIST_RE.match(line):
+        score += 1
+    return score
+
+
+def _line_spans(report: str, max_line_chars: int) -> list:
+    """
+    (start, end) offsets of every non-empty line up to the reference list; long lines
+    are split at sentence ends.
+    """
+    spans = []
+    for match in re.finditer(r"[^\n]+", report):
+        start, end = match.span()
+        if not match.group(0).strip():
+            continue
+        if spans and REFERENCES_RE.match(match.group(0)):
+            break
+        while end - start > max_line_chars:
+            cut = report.rfind(". ", start, start + max_line_chars)
+            cut = cut + 2 if cut > start else start + max_line_chars
+            spans.append((start, cut))
+            start = cut
+        spans.append((start, end))
+    return spans
+
+
+def select_candidate_windows(report: str, context_lines: int = 2, min_score: int = 2,
+                             max_line_chars: int = 600) -> dict:
+    """
+    Locate candidate stakeholder lines and merge them with their context into windows.
+
+    Args:
+        report: Extracted report text
+        context_lines: Lines kept before and after every candidate line
+        min_score: Minimum score_line() value of a candidate line
+        max_line_chars: Lines longer than this are scored sentence by sentence
+
+    Returns:
+        {"windows": [str], "text": windows joined for the prompt, "candidates": int,
+         "coverage": share of the report characters kept}
+    """
+    spans = _line_spans(report or "", max_line_chars)
+    hits = [i for i, (start, end) in enumerate(spans) if score_line(report[start:end]) >= min_score]
+
+    ranges = []
+    for i in hits:
+        first, last = max(0, i - context_lines), min(len(spans) - 1, i + context_lines)
+        # Bridge short gaps so a list is not cut into one window per entry
+        if ranges and first <= ranges[-1][1] + 1 + context_lines:
+            ranges[-1] = (ranges[-1][0], max(ranges[-1][1], last))
+        else:
+            ranges.append((first, last))
+
+    windows = [report[spans[first][0]:spans[last][1]].strip() for first, last in ranges]
+    kept = sum(spans[last][1] - spans[first][0] for first, last in ranges)
+    return {
+        "windows": windows,
+        "text": "\n\n[...]\n\n".join(windows),
+        "candidates": len(hits),
+        "coverage": kept / len(report) if report else 0.0,
+    }
+
+
+class CandidateExtractor:
+    """
+    Stakeholder extraction over locally selected candidate windows.
+
+    Usage:
+        stakeholders = CandidateExtractor(llm_client).extract(report)
+        if stakeholders is None:
+            ...  # the windows would not save anything; read the full report
+    """
+
+    def __init__(self, llm_client, context_lines: int = None, max_coverage: float = None, log=None):
+        """
+        Args:
+            llm_client: LLM client used for the extraction call
+            context_lines: Context lines around candidates (defaults to CANDIDATE_CONTEXT_LINES or 2)
+            max_coverage: Above this share of the report the full text is used instead
+                (defaults to CANDIDATE_MAX_COVERAGE or 0.7)
+            log: Logger (defaults to a "CandidateExtraction" logger)
+        """
+        self.llm_client = llm_client
+        self.context_lines = context_lines if context_lines is not None else int(os.getenv('CANDIDATE_CONTEXT_LINES', '2'))
+        self.max_coverage = max_coverage or float(os.getenv('CANDIDATE_MAX_COVERAGE', '0.7'))
+        self.log = log or get_logger("CandidateExtraction")
+
+    def select(self, report: str) -> dict:
+        """Return the candidate selection, or None when the full report should be read instead."""
+        selection = select_candidate_windows(report, context_lines=self.context_lines)
+        if not selection['candidates']:
+            self.log.info("No stakeholder candidates found locally; reading the full report")
+            return None
+        if selection['coverage'] > self.max_coverage:
+            self.log.info("Candidate windows cover %.0f%% of the report; reading the full report",
+                          selection['coverage'] * 100)
+            return None
+        return selection
+
+    def extract(self, report: str, selection: dict = None) -> list:
+        """
+        Extract the stakeholders named in the candidate windows of a report.
+
+        Args:
+            report: Extracted report text
+            selection: Result of select() when the caller already ran it
+
+        Returns:
+            Validated stakeholder list, or None if the windows would not shrink the prompt
+            or the response is unusable (the caller then reads the full report)
+        """
+        selection = selection or self.select(report)
+        if selection is None:
+            return None
+        self.log.info("Extracting stakeholders from %d candidate windows (%d of %d characters, %d candidate lines)",
+                      len(selection['windows']), len(selection['text']), len(report), selection['candidates'],
+                      category="stage")
+        prompt = CANDIDATE_STAKEHOLDER_EXTRACTION_PROMPT.format(candidate_windows=selection['text'])
+        response = self.llm_client.get_completion([{"role": "user", "content": prompt}], max_tokens=4096)
+        parsed = parse_json_response(response)
+        if isinstance(parsed, dict):
+            parsed = parsed.get('stakeholders')
+        errors = []
+        stakeholders = validate_stakeholders(parsed, errors)
+        if not stakeholders:
+            self.log.warning("Candidate extraction returned no stakeholders (%s); reading the full report",
+                             "; ".join(errors[:3]) or "empty response")
+            return None
+        return stakeholders
+
+
+# Set CANDIDATE_EXTRACTION=0 to always send the full report to stakeholder extraction
+CANDIDATE_EXTRACTION_ENABLED = os.getenv('CANDIDATE_EXTRACTION', '1') != '0'
@@ -0,0 +1,174 @@
+"""
+Workflow Checkpoint Store
+Persists each stakeholder's stage outputs so an interrupted generation run can resume
+
+The bridge runs one process per action; if it dies (or one LLM call hangs) late in a
+large roster, every finished email used to be lost. Stage outputs are written to a JSON
+file per workflow as they complete, and a re-run for the same workflow skips the work
+that is already done.
+
+Stages:
+    context     The prepared task (stakeholder fields and extracted relevant context)
+    draft       The initial email from the generate stage
+    evaluation  The evaluation of the initial draft
+    final       The finished email (error results are never checkpointed)
+"""
+import json
+import os
+import tempfile
+import threading
+
+from utils.section_cache import report_fingerprint
+from utils.structured_logger import get_logger
+
+_log = get_logger("Checkpoints")
+
+CHECKPOINT_STAGES = ("context", "draft", "evaluation", "final")
+
+
+def run_fingerprint(report: str, company_summary: str, generation_mode: str, mode_config: dict) -> str:
+    """Hash of the inputs that shape every stage; checkpoints from other inputs are discarded."""
+    return report_fingerprint(
+        report,
+        company_summary,
+        generation_mode,
+        json.dumps(mode_config or {}, sort_keys=True, default=str)
+    )
+
+
+def checkpoint_key(stakeholder: dict, index: int) -> str:
+    """Stakeholder identity within a workflow: its id, else name and title, else its position."""
+    if stakeholder.get('id') is not None:
+        return f"id:{stakeholder['id']}"
+    if stakeholder.get('name'):
+        return f"name:{stakeholder.get('name', '')}|{stakeholder.get('title', '')}"
+    return f"index:{index}"
+
+
+class StakeholderCheckpoint:
+    """View of one stakeholder's checkpointed stages within a WorkflowCheckpoint."""
+
+    def __init__(self, workflow: 'WorkflowCheckpoint', key: str):
+        self.workflow = workflow
+        self.key = key
+
+    def get(self, stage: str):
+        """Return the checkpointed output of a stage, or None."""
+        return self.workflow.get(self.key, stage)
+
+    def put(self, stage: str, value):
+        """Checkpoint the output of a stage."""
+        self.workflow.put(self.key, stage, value)
+
+
+class WorkflowCheckpoint:
+    """
+    Stage outputs of every stakeholder in one workflow, persisted as one JSON file.
+
+    Usage:
+        checkpoints = CHECKPOINT_STORE.open(workflow_id, fingerprint)
+        checkpoint = checkpoints.for_stakeholder(stakeholder, index)
+        task = checkpoint.get("context")
+    """
+
+    def __init__(self, path: str, fingerprint: str, stakeholders: dict = None):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.stakeholders = stakeholders or {}
+        self._lock = threading.Lock()
+        self.resumed = sum(1 for stages in self.stakeholders.values() if 'final' in stages)
+
+    def for_stakeholder(self, stakeholder: dict, index: int) -> StakeholderCheckpoint:
+        return StakeholderCheckpoint(self, checkpoint_key(stakeholder, index))
+
+    def get(self, key: str, stage: str):
+        with self._lock:
+            return self.stakeholders.get(key, {}).get(stage)
+
+    def put(self, key: str, stage: str, value):
+        if stage not in CHECKPOINT_STAGES:
+            raise ValueError(f"Unknown checkpoint stage: {stage}")
+        with self._lock:
+            self.stakeholders.setdefault(key, {})[stage] = value
+            data = {"fingerprint": self.fingerprint, "stakeholders": self.stakeholders}
+            self._write(data)
+
+    def missing(self, stakeholders: list, stage: str) -> list:
+        """Stakeholders without a checkpoint for a stage."""
+        return [s for i, s in enumerate(stakeholders)
+                if self.get(checkpoint_key(s, i), stage) is None]
+
+    def _write(self, data: dict):
+        """Write atomically (caller holds the lock) so a crash never leaves a partial file."""
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, default=str)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            _log.warning("Could not persist checkpoint: %s", e)
+
+
+class CheckpointStore:
+    """Directory of per-workflow checkpoint files."""
+
+    def __init__(self, checkpoint_dir: str = None):
+        self.checkpoint_dir = checkpoint_dir
+
+    def open(self, workflow_id, fingerprint: str) -> WorkflowCheckpoint:
+        """
+        Load (or start) the checkpoint of a workflow.
+
+        Args:
+            workflow_id: Webapp workflow id
+            fingerprint: run_fingerprint() of the current inputs
+
+        Returns:
+            WorkflowCheckpoint; empty if nothing was saved or the inputs changed
+        """
+        path = self._path(workflow_id)
+        data = self._read(path)
+        if data is not None and data.get('fingerprint') != fingerprint:
+            _log.info("Inputs changed since the last run of workflow %s; starting over", workflow_id)
+            self.clear(workflow_id)
+            data = None
+        checkpoint = WorkflowCheckpoint(path, fingerprint, (data or {}).get('stakeholders'))
+        if checkpoint.resumed:
+            _log.info("Resuming workflow %s with %d finished emails", workflow_id, checkpoint.resumed,
+                      category="stage")
+        return checkpoint
+
+    def clear(self, workflow_id):
+        """Remove the checkpoint of a workflow."""
+        path = self._path(workflow_id)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def _path(self, workflow_id) -> str:
+        if not self.checkpoint_dir:
+            return None
+        safe_id = "".join(c for c in str(workflow_id) if c.isalnum() or c in "-_")
+        return os.path.join(self.checkpoint_dir, f"workflow_{safe_id}.json")
+
+    @staticmethod
+    def _read(path: str) -> dict:
+        if not path:
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data if isinstance(data, dict) else None
+
+
+# Shared store; set WORKFLOW_CHECKPOINT_DIR="" to disable persistence
+CHECKPOINT_STORE = CheckpointStore(
+    checkpoint_dir=os.getenv(
+        'WORKFLOW_CHECKPOINT_DIR',
+        os.path.join(tempfile.gettempdir(), 'stakeholder_workflow_checkpoints')
+    ) or None
+)
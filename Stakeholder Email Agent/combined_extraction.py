@@ -0,0 +1,155 @@
+"""
+Combined Extraction for the Orchestrator Agent
+Extracts the stakeholders and the company summary from one read of the report
+
+Stakeholder extraction and the company summary used to be two LLM calls that each sent
+the full report. The combined call returns both in one JSON object, which is validated
+against the expected schema before use; if the response is missing or invalid the
+caller falls back to the separate calls.
+"""
+import json
+import os
+import re
+
+from prompts.orchestrator_prompts import COMBINED_EXTRACTION_PROMPT
+from utils.structured_logger import get_logger
+
+
+class ExtractionSchemaError(ValueError):
+    """Raised when an extraction response does not match the expected schema."""
+
+    def __init__(self, errors: list):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def validate_stakeholders(stakeholders, errors: list, path: str = "stakeholders") -> list:
+    """
+    Validate a stakeholder array, collecting problems in `errors`.
+
+    Entries must be objects with a non-empty string "name"; "title" and "details" must be
+    strings when present (missing or null becomes ""). Invalid entries are dropped.
+
+    Returns:
+        The valid stakeholders with name, title and details normalized to stripped strings
+    """
+    if not isinstance(stakeholders, list):
+        errors.append(f"{path} must be an array")
+        return []
+    valid = []
+    for index, stakeholder in enumerate(stakeholders):
+        if not isinstance(stakeholder, dict):
+            errors.append(f"{path}[{index}] must be an object")
+            continue
+        name = stakeholder.get('name')
+        if not isinstance(name, str) or not name.strip():
+            errors.append(f"{path}[{index}].name must be a non-empty string")
+            continue
+        entry = dict(stakeholder, name=name.strip())
+        for field in ('title', 'details'):
+            value = stakeholder.get(field)
+            if value is None:
+                value = ""
+            if not isinstance(value, str):
+                errors.append(f"{path}[{index}].{field} must be a string")
+                value = str(value)
+            entry[field] = value.strip()
+        valid.append(entry)
+    return valid
+
+
+def validate_combined_extraction(data) -> dict:
+    """
+    Validate a combined extraction response.
+
+    Schema:
+        {"stakeholders": [{"name": str, "title": str, "details": str}, ...],
+         "company_summary": str (non-empty)}
+
+    Individual malformed stakeholders are dropped; a wrong top-level shape or a missing
+    summary is an error.
+
+    Returns:
+        Normalized {"stakeholders": [...], "company_summary": str, "dropped": int}
+
+    Raises:
+        ExtractionSchemaError: If the response cannot be used
+    """
+    if not isinstance(data, dict):
+        raise ExtractionSchemaError(["response must be a JSON object"])
+    errors = []
+    stakeholders = validate_stakeholders(data.get('stakeholders'), errors)
+    summary = data.get('company_summary')
+    fatal = [e for e in errors if e == "stakeholders must be an array"]
+    if not isinstance(summary, str) or not summary.strip():
+        fatal.append("company_summary must be a non-empty string")
+    if fatal:
+        raise ExtractionSchemaError(fatal)
+    return {
+        "stakeholders": stakeholders,
+        "company_summary": summary.strip(),
+        "dropped": len(data['stakeholders']) - len(stakeholders),
+    }
+
+
+def parse_json_response(response: str):
+    """Parse the JSON value in an LLM response, tolerating code fences and surrounding text."""
+    if not response:
+        return None
+    clean = response.strip()
+    if clean.startswith("```"):
+        clean = clean.split("\n", 1)[1] if "\n" in clean else ""
+        clean = clean.rsplit("```", 1)[0]
+    match = re.search(r"[\[{].*[\]}]", clean, re.DOTALL)
+    if not match:
+        return None
+    try:
+        return json.loads(match.group(0))
+    except ValueError:
+        return None
+
+
+class CombinedExtractor:
+    """
+    One-call stakeholder and company summary extraction.
+
+    Usage:
+        result = CombinedExtractor(llm_client).extract(report)
+        if result is None:
+            ...  # fall back to the separate calls
+    """
+
+    def __init__(self, llm_client, max_tokens: int = 8192, log=None):
+        """
+        Args:
+            llm_client: LLM client used for the combined call
+            max_tokens: Output budget of the combined call
+            log: Logger (defaults to a "CombinedExtraction" logger)
+        """
+        self.llm_client = llm_client
+        self.max_tokens = max_tokens
+        self.log = log or get_logger("CombinedExtraction")
+
+    def extract(self, report: str) -> dict:
+        """
+        Extract stakeholders and the company summary in one call.
+
+        Returns:
+            Validated {"stakeholders": [...], "company_summary": str, "dropped": int},
+            or None if the response is missing or does not match the schema
+        """
+        prompt = COMBINED_EXTRACTION_PROMPT.format(report=report)
+        response = self.llm_client.get_completion([{"role": "user", "content": prompt}], max_tokens=self.max_tokens)
+        try:
+            result = validate_combined_extraction(parse_json_response(response))
+        except ExtractionSchemaError as e:
+            self.log.warning("Combined extraction response rejected (%s); using separate calls", e)
+            return None
+        if result['dropped']:
+            self.log.warning("Dropped %d malformed stakeholders from the combined extraction", result['dropped'])
+        self.log.info("Combined extraction found %d stakeholders", len(result['stakeholders']), category="stage")
+        return result
+
+
+# Set COMBINED_EXTRACTION=0 to always use the separate stakeholder and summary calls
+COMBINED_EXTRACTION_ENABLED = os.getenv('COMBINED_EXTRACTION', '1') != '0'
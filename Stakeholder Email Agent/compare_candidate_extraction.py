@@ -0,0 +1,152 @@
+"""
+Candidate Extraction Comparison
+Compares stakeholder extraction over the full report with extraction over candidate windows
+
+Usage:
+    python compare_candidate_extraction.py REPORT [REPORT ...] [--stakeholders STAKEHOLDERS.json] [--offline]
+
+REPORT may be a .txt/.md/.pdf/.html file. With --offline only the local pre-pass runs:
+the size of the candidate windows is reported and, when STAKEHOLDERS.json (a list of
+{"name", ...} objects, or a {report file name: list} mapping for several reports) is
+given, the share of those names that survive into the windows. Without --offline both
+prompts are sent to the LLM and the names found in the full report are the reference
+that the window extraction is scored against.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from agents.candidate_extraction import CandidateExtractor, select_candidate_windows
+from agents.combined_extraction import parse_json_response, validate_stakeholders
+from compare_context_retrieval import load_report
+from prompts.orchestrator_prompts import COMBINED_EXTRACTION_PROMPT
+from utils.stakeholder_dedupe import normalize_name
+from utils.tokens import estimate_tokens
+
+
+def name_recall(reference: list, found: list) -> float:
+    """Share of the reference names (compared by normalized first and last name) that were found."""
+    reference_names = {normalize_name(name) for name in reference}
+    if not reference_names:
+        return 1.0
+    return len(reference_names & {normalize_name(name) for name in found}) / len(reference_names)
+
+
+def window_recall(reference: list, text: str) -> float:
+    """Share of the reference last names that appear in the candidate window text."""
+    words = {normalize_name(word)[1] for word in text.split()}
+    last_names = [normalize_name(name)[1] for name in reference if normalize_name(name)[1]]
+    if not last_names:
+        return 1.0
+    return sum(1 for last in last_names if last in words) / len(last_names)
+
+
+def extract_full(client, report: str) -> tuple:
+    """Extract stakeholders from the whole report; returns (names, seconds, prompt_tokens)."""
+    prompt = COMBINED_EXTRACTION_PROMPT.format(report=report)
+    started = time.perf_counter()
+    response = client.get_completion([{"role": "user", "content": prompt}], max_tokens=8192)
+    seconds = time.perf_counter() - started
+    parsed = parse_json_response(response)
+    stakeholders = validate_stakeholders(parsed.get('stakeholders') if isinstance(parsed, dict) else parsed, [])
+    return [s['name'] for s in stakeholders], seconds, estimate_tokens(prompt)
+
+
+def compare(path: str, reference: list = None, client=None) -> dict:
+    """
+    Run the comparison for one report.
+
+    Args:
+        path: Report file
+        reference: Known stakeholder names (optional)
+        client: LLMClient (None for an offline run)
+
+    Returns:
+        Result dictionary
+    """
+    report = load_report(path)
+    started = time.perf_counter()
+    selection = select_candidate_windows(report)
+    result = {
+        "report": os.path.basename(path),
+        "report_chars": len(report),
+        "window_chars": len(selection['text']),
+        "candidates": selection['candidates'],
+        "coverage": round(selection['coverage'], 3),
+        "select_seconds": round(time.perf_counter() - started, 4),
+    }
+    if reference:
+        result["window_recall"] = round(window_recall(reference, selection['text']), 3)
+
+    if client is not None:
+        full_names, full_seconds, full_tokens = extract_full(client, report)
+        extractor = CandidateExtractor(client)
+        started = time.perf_counter()
+        stakeholders = extractor.extract(report)
+        window_seconds = time.perf_counter() - started
+        window_names = [s['name'] for s in stakeholders or []]
+        result.update({
+            "full": {"seconds": round(full_seconds, 2), "prompt_tokens": full_tokens, "names": len(full_names)},
+            "windows": {
+                "seconds": round(window_seconds, 2),
+                "prompt_tokens": estimate_tokens(selection['text']),
+                "names": len(window_names),
+                "used": stakeholders is not None,
+                "recall_vs_full": round(name_recall(full_names, window_names), 3),
+            },
+        })
+        if reference:
+            result["full"]["recall"] = round(name_recall(reference, full_names), 3)
+            result["windows"]["recall"] = round(name_recall(reference, window_names), 3)
+    return result
+
+
+def print_summary(results: list):
+    for result in results:
+        line = (f"{result['report'][:40]:40}  windows {result['window_chars']:>6}/{result['report_chars']} chars"
+                f" ({result['coverage']:.0%}, {result['candidates']} candidate lines)"
+                f"  select {result['select_seconds'] * 1000:.1f}ms")
+        if "window_recall" in result:
+            line += f"  names kept {result['window_recall']:.2f}"
+        if "full" in result:
+            line += (f"  full {result['full']['seconds']:.2f}s/{result['full']['prompt_tokens']}tok"
+                     f"  windows {result['windows']['seconds']:.2f}s/{result['windows']['prompt_tokens']}tok"
+                     f" recall {result['windows']['recall_vs_full']:.2f}")
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument("reports", nargs="+", help="Report files (.txt, .md, .pdf, .html)")
+    parser.add_argument("--stakeholders", help="JSON file with the known stakeholders")
+    parser.add_argument("--offline", action="store_true", help="Only measure the local pre-pass (no LLM calls)")
+    parser.add_argument("--json", action="store_true", help="Print raw JSON results")
+    args = parser.parse_args(argv)
+
+    known = {}
+    if args.stakeholders:
+        with open(args.stakeholders, 'r', encoding='utf-8') as f:
+            known = json.load(f)
+    if isinstance(known, list):
+        known = {os.path.basename(path): known for path in args.reports}
+
+    client = None
+    if not args.offline:
+        from utils.llm_api import LLMClient
+        client = LLMClient()
+
+    results = []
+    for path in args.reports:
+        reference = [s['name'] if isinstance(s, dict) else s for s in known.get(os.path.basename(path), [])]
+        results.append(compare(path, reference, client))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_summary(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Context Retrieval Comparison
+Compares full-report context extraction with BM25-retrieved passages for quality and latency
+
+Usage:
+    python compare_context_retrieval.py REPORT STAKEHOLDERS.json [--top-k 4] [--offline]
+
+REPORT may be a .txt/.md/.pdf/.html file. STAKEHOLDERS.json holds a list of
+{"name", "title", "details"} objects. Without --offline every stakeholder is run
+through CONTEXT_EXTRACTION_PROMPT three ways (full report, retrieved passages sent
+to the LLM, retrieved passages returned locally); the full-report extraction is the
+reference that the other two are scored against.
+"""
+import argparse
+import json
+import sys
+import time
+
+from prompts.task_planner_prompts import CONTEXT_EXTRACTION_PROMPT
+from utils.report_index import ContextRetriever, tokenize
+from utils.tokens import estimate_message_tokens
+
+
+def term_recall(reference: str, candidate: str) -> float:
+    """Share of the reference extraction's distinct terms that also appear in the candidate."""
+    reference_terms = set(tokenize(reference))
+    if not reference_terms:
+        return 1.0
+    return len(reference_terms & set(tokenize(candidate))) / len(reference_terms)
+
+
+def load_report(path: str) -> str:
+    if path.lower().endswith(('.pdf', '.html', '.htm')):
+        from utils.text_extraction import extract_text_from_file
+        return extract_text_from_file(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def extract_with_llm(client, stakeholder: dict, report_text: str) -> tuple:
+    """Run CONTEXT_EXTRACTION_PROMPT and return (context, seconds, prompt_tokens)."""
+    prompt = CONTEXT_EXTRACTION_PROMPT.format(
+        stakeholder_name=stakeholder['name'],
+        stakeholder_title=stakeholder['title'],
+        stakeholder_details=stakeholder['details'],
+        report=report_text
+    )
+    messages = [{"role": "user", "content": prompt}]
+    started = time.perf_counter()
+    context = client.get_completion(messages, max_tokens=1024) or ""
+    return context, time.perf_counter() - started, estimate_message_tokens(messages)
+
+
+def compare(report: str, stakeholders: list, top_k: int = 4, client=None) -> list:
+    """
+    Run the comparison for every stakeholder.
+
+    Args:
+        report: Full report text
+        stakeholders: List of stakeholder dictionaries
+        top_k: Passages retrieved per stakeholder
+        client: LLMClient (None for a retrieval-only run)
+
+    Returns:
+        List of per-stakeholder result dictionaries
+    """
+    retriever = ContextRetriever(mode="retrieve", top_k=top_k, min_report_chars=0)
+    started = time.perf_counter()
+    retriever.get_index(report)
+    index_seconds = time.perf_counter() - started
+
+    results = []
+    for stakeholder in stakeholders:
+        started = time.perf_counter()
+        passages = retriever.select_passages(stakeholder, report)
+        result = {
+            "stakeholder": stakeholder['name'],
+            "index_seconds": round(index_seconds, 4),
+            "retrieval_seconds": round(time.perf_counter() - started, 4),
+            "passage_chars": len(passages),
+            "report_chars": len(report)
+        }
+
+        if client is not None:
+            full_context, full_seconds, full_tokens = extract_with_llm(client, stakeholder, report)
+            retrieved_context, retrieved_seconds, retrieved_tokens = extract_with_llm(client, stakeholder, passages)
+            result.update({
+                "full": {"seconds": round(full_seconds, 2), "prompt_tokens": full_tokens},
+                "retrieve": {
+                    "seconds": round(retrieved_seconds, 2),
+                    "prompt_tokens": retrieved_tokens,
+                    "recall_vs_full": round(term_recall(full_context, retrieved_context), 3)
+                },
+                "local": {
+                    "seconds": result["retrieval_seconds"],
+                    "prompt_tokens": 0,
+                    "recall_vs_full": round(term_recall(full_context, passages), 3)
+                }
+            })
+        results.append(result)
+    return results
+
+
+def print_summary(results: list):
+    for result in results:
+        line = (f"{result['stakeholder'][:30]:30}  passages {result['passage_chars']:>6}/"
+                f"{result['report_chars']} chars  retrieval {result['retrieval_seconds'] * 1000:.1f}ms")
+        if "full" in result:
+            line += (f"  full {result['full']['seconds']:.2f}s/{result['full']['prompt_tokens']}tok"
+                     f"  retrieve {result['retrieve']['seconds']:.2f}s/{result['retrieve']['prompt_tokens']}tok"
+                     f" recall {result['retrieve']['recall_vs_full']:.2f}"
+                     f"  local recall {result['local']['recall_vs_full']:.2f}")
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument("report", help="Report file (.txt, .md, .pdf, .html)")
+    parser.add_argument("stakeholders", help="JSON file with a list of stakeholders")
+    parser.add_argument("--top-k", type=int, default=4, help="Passages retrieved per stakeholder")
+    parser.add_argument("--offline", action="store_true", help="Only measure local retrieval (no LLM calls)")
+    parser.add_argument("--json", action="store_true", help="Print raw JSON results")
+    args = parser.parse_args(argv)
+
+    report = load_report(args.report)
+    with open(args.stakeholders, 'r', encoding='utf-8') as f:
+        stakeholders = json.load(f)
+
+    client = None
+    if not args.offline:
+        from utils.llm_api import LLMClient
+        client = LLMClient()
+
+    results = compare(report, stakeholders, args.top_k, client)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_summary(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Batched Context Extraction for the Task Planner Agent
+Ships the report once per batch of stakeholders instead of once per stakeholder
+"""
+import asyncio
+import json
+import os
+
+from prompts.task_planner_prompts import BATCH_CONTEXT_EXTRACTION_PROMPT
+from utils.report_index import CONTEXT_RETRIEVER
+from utils.structured_logger import get_logger
+
+
+def stakeholder_key(stakeholder: dict) -> tuple:
+    """Identity used to match batched results back to stakeholders."""
+    return (stakeholder.get('name', ''), stakeholder.get('title', ''))
+
+
+class BatchContextExtractor:
+    """
+    Extracts relevant report context for a whole stakeholder roster with few LLM calls.
+
+    The roster is split into batches sized to the output token budget. A batch whose
+    response cannot be parsed (typically truncated output) is split in half and retried;
+    a batch whose call fails is not retried. Stakeholders still missing afterwards are
+    left out of the result so the caller can extract them individually.
+    """
+
+    def __init__(self, llm_client, max_output_tokens: int = 8192, tokens_per_stakeholder: int = 450,
+                 retriever=CONTEXT_RETRIEVER, log=None):
+        """
+        Args:
+            llm_client: LLM client used for the batched calls
+            max_output_tokens: Output budget of one batched call
+            tokens_per_stakeholder: Expected output tokens for one stakeholder's excerpts
+            retriever: ContextRetriever that trims the report sent with each batch
+            log: Logger (defaults to a "ContextExtraction" logger)
+        """
+        self.llm_client = llm_client
+        self.max_output_tokens = max_output_tokens
+        self.tokens_per_stakeholder = tokens_per_stakeholder
+        self.retriever = retriever
+        self.log = log or get_logger("ContextExtraction")
+        self.llm_calls = 0
+
+    @property
+    def batch_size(self) -> int:
+        return max(1, self.max_output_tokens // self.tokens_per_stakeholder)
+
+    def extract(self, stakeholders: list, report: str) -> dict:
+        """
+        Extract context for every stakeholder.
+
+        Args:
+            stakeholders: List of stakeholder dictionaries
+            report: Full report text
+
+        Returns:
+            Dictionary of stakeholder_key -> extracted context (missing entries omitted)
+        """
+        results = {}
+        for start in range(0, len(stakeholders), self.batch_size):
+            batch = stakeholders[start:start + self.batch_size]
+            results.update(self._extract_batch(batch, report))
+
+        missing = len(stakeholders) - len(results)
+        self.log.info("Batched context extraction: %d/%d stakeholders in %d LLM calls (%d missing)",
+                      len(results), len(stakeholders), self.llm_calls, missing, category="stage")
+        return results
+
+    async def extract_async(self, stakeholders: list, report: str) -> dict:
+        """Non-blocking variant of extract() for use on the event loop."""
+        return await asyncio.to_thread(self.extract, stakeholders, report)
+
+    def _extract_batch(self, batch: list, report: str) -> dict:
+        ids = [f"S{i + 1}" for i in range(len(batch))]
+        roster = "\n".join(
+            f"{sid}: {s.get('name', '')} - {s.get('title', '')}. {s.get('details', '')}".strip()
+            for sid, s in zip(ids, batch)
+        )
+        prompt = BATCH_CONTEXT_EXTRACTION_PROMPT.format(
+            stakeholder_roster=roster,
+            report=self.retriever.select_passages_for_group(batch, report)
+        )
+        messages = [{"role": "user", "content": prompt}]
+
+        self.llm_calls += 1
+        try:
+            response = self.llm_client.get_completion(
+                messages,
+                max_tokens=min(self.max_output_tokens, len(batch) * self.tokens_per_stakeholder + 256)
+            )
+        except Exception as e:
+            self.log.warning("Batched extraction call failed for %d stakeholders; extracting them individually: %s",
+                             len(batch), e)
+            return {}
+        parsed = self._parse(response)
+
+        if parsed is None:
+            if len(batch) == 1:
+                return {}
+            self.log.warning("Batched extraction response unusable for %d stakeholders; splitting batch", len(batch))
+            middle = len(batch) // 2
+            results = self._extract_batch(batch[:middle], report)
+            results.update(self._extract_batch(batch[middle:], report))
+            return results
+
+        results = {}
+        for sid, stakeholder in zip(ids, batch):
+            context = parsed.get(sid)
+            if isinstance(context, list):
+                context = "\n\n".join(str(part) for part in context)
+            if isinstance(context, str) and context.strip():
+                results[stakeholder_key(stakeholder)] = context.strip()
+        return results
+
+    @staticmethod
+    def _parse(response: str) -> dict:
+        if not response:
+            return None
+        clean = response.strip()
+        if clean.startswith("```"):
+            clean = clean.split("\n", 1)[1] if "\n" in clean else ""
+            clean = clean.rsplit("```", 1)[0]
+        try:
+            parsed = json.loads(clean)
+        except ValueError:
+            return None
+        return parsed if isinstance(parsed, dict) else None
+
+
+# Set CONTEXT_EXTRACTION_BATCH=0 to extract every stakeholder with its own LLM call
+BATCH_EXTRACTION_ENABLED = os.getenv('CONTEXT_EXTRACTION_BATCH', '1') != '0'
+
+# Stakeholders per batched call when pipelined, so early emails do not wait for the whole roster
+PIPELINE_BATCH_SIZE = int(os.getenv('CONTEXT_PIPELINE_BATCH_SIZE', '4'))
@@ -0,0 +1,194 @@
+"""
+Context Packer
+Fits the stakeholder context, company summary, product report and role context into a token budget
+
+The writer prompts used to concatenate these sources at fixed character lengths, so
+the product report was cut at an arbitrary offset and sentences repeated between the
+extracted context and the company summary were sent twice. The packer keeps all of the
+stakeholder evidence (minus near-duplicate sentences) and fills the rest of the budget
+with the product and role snippets that add the most new stakeholder-relevant terms
+per token.
+"""
+import math
+import os
+import re
+from functools import lru_cache
+
+from utils.report_index import chunk_report, tokenize
+from utils.tokens import estimate_tokens
+
+# Packed context budget (tokens) per model; CONTEXT_TOKEN_BUDGET overrides for every model
+MODEL_CONTEXT_BUDGETS = {
+    "google/gemini-2.5-flash": 2000,
+    "google/gemini-2.5-pro": 4000,
+}
+DEFAULT_CONTEXT_BUDGET = 2000
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def get_context_budget(model: str = None) -> int:
+    """Return the packed context token budget for a model."""
+    override = os.getenv('CONTEXT_TOKEN_BUDGET')
+    if override:
+        return int(override)
+    return MODEL_CONTEXT_BUDGETS.get(model, DEFAULT_CONTEXT_BUDGET)
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+@lru_cache(maxsize=64)
+def _split_snippets(text: str, max_chars: int) -> tuple:
+    """Split reference text into (snippet, terms, tokens) tuples; cached for static sources."""
+    chunks = []
+    for section in re.split(r"\n(?=#{1,6} )", text):
+        chunks.extend(chunk_report(section, max_chars))
+
+    snippets = []
+    pending_header = ""
+    for chunk in chunks:
+        # Attach bare markdown headers to the snippet that follows them
+        if chunk.lstrip().startswith('#') and '\n' not in chunk.strip():
+            pending_header = f"{pending_header}\n{chunk}".strip()
+            continue
+        if pending_header:
+            chunk = f"{pending_header}\n{chunk}"
+            pending_header = ""
+        snippets.append((chunk, frozenset(tokenize(chunk)), estimate_tokens(chunk)))
+    return tuple(snippets)
+
+
+class ContextPacker:
+    """
+    Token-budgeted context packing with near-duplicate removal and marginal-value ranking.
+
+    Usage:
+        packer = ContextPacker(get_context_budget(model))
+        packed = packer.pack(task, product_report, role_context_section, style_hint)
+    """
+
+    def __init__(self, budget_tokens: int = DEFAULT_CONTEXT_BUDGET, min_reference_tokens: int = 300,
+                 duplicate_threshold: float = 0.8, snippet_chars: int = 400, covered_discount: float = 0.25):
+        """
+        Args:
+            budget_tokens: Token budget for all four packed sources together
+            min_reference_tokens: Reference budget kept even when the evidence fills the budget
+            duplicate_threshold: Jaccard similarity above which two sentences are duplicates
+            snippet_chars: Target size of product/role snippets
+            covered_discount: Weight of query terms already covered by packed snippets
+        """
+        self.budget_tokens = budget_tokens
+        self.min_reference_tokens = min_reference_tokens
+        self.duplicate_threshold = duplicate_threshold
+        self.snippet_chars = snippet_chars
+        self.covered_discount = covered_discount
+
+    def pack(self, task: dict, product_report: str, role_context: str, style_hint: str = "") -> dict:
+        """
+        Pack the context for one stakeholder.
+
+        Args:
+            task: Task dictionary (relevant_context, company_summary, stakeholder fields)
+            product_report: Full product report text
+            role_context: Role section for the stakeholder's title
+            style_hint: Style or template description used as a weak relevance signal
+
+        Returns:
+            Dictionary with relevant_context, company_summary, product_report_excerpt,
+            role_context_excerpt and the estimated total tokens
+        """
+        seen = []
+        relevant_context = self._dedupe_text(task.get('relevant_context', ''), seen)
+        company_summary = self._dedupe_text(task.get('company_summary', ''), seen)
+        evidence_tokens = estimate_tokens(relevant_context) + estimate_tokens(company_summary)
+
+        query = self._build_query(task, style_hint)
+        reference_budget = max(self.budget_tokens - evidence_tokens, self.min_reference_tokens)
+        candidates = []
+        for source, text, prior in (("role", role_context, 1.0), ("product", product_report, 0.0)):
+            for position, (snippet, terms, tokens) in enumerate(_split_snippets(text or "", self.snippet_chars)):
+                candidates.append({"source": source, "position": position, "text": snippet,
+                                   "terms": terms, "tokens": tokens, "prior": prior})
+
+        selected = self._select(candidates, query, reference_budget, seen)
+        excerpts = {}
+        for source in ("product", "role"):
+            chosen = sorted((c for c in selected if c["source"] == source), key=lambda c: c["position"])
+            excerpts[source] = "\n\n".join(c["text"] for c in chosen)
+
+        packed = {
+            "relevant_context": relevant_context,
+            "company_summary": company_summary,
+            "product_report_excerpt": excerpts["product"],
+            "role_context_excerpt": excerpts["role"],
+        }
+        packed["tokens"] = sum(estimate_tokens(value) for value in packed.values())
+        return packed
+
+    def _build_query(self, task: dict, style_hint: str) -> dict:
+        """Weighted query terms: stakeholder role first, then evidence and style."""
+        query = {}
+        for text, weight in ((task.get('stakeholder_title', ''), 1.0),
+                             (task.get('stakeholder_details', ''), 1.0),
+                             (task.get('relevant_context', ''), 0.5),
+                             (style_hint, 0.5)):
+            for term in tokenize(text):
+                query[term] = max(query.get(term, 0.0), weight)
+        return query
+
+    def _select(self, candidates: list, query: dict, budget: int, seen: list) -> list:
+        """Greedily pick the snippet with the best marginal value per token until the budget is full."""
+        doc_freq = {}
+        for candidate in candidates:
+            for term in candidate["terms"]:
+                doc_freq[term] = doc_freq.get(term, 0) + 1
+        total = len(candidates) or 1
+        weights = {term: weight * math.log(1 + total / doc_freq[term])
+                   for term, weight in query.items() if term in doc_freq}
+
+        covered = set()
+        selected = []
+        remaining = list(candidates)
+        while remaining and budget > 0:
+            fitting = [c for c in remaining if c["tokens"] <= budget]
+            if not fitting:
+                break
+            # Terms already packed still count, at a discount, so related snippets rank
+            # above unrelated ones; zero-value snippets fill what is left in document order
+            best = max(fitting, key=lambda c: (self._gain(c, weights, covered) / max(c["tokens"], 1),
+                                              c["source"] == "role", -c["position"]))
+            remaining.remove(best)
+            best["text"] = self._dedupe_text(best["text"], seen)
+            if not best["text"]:
+                continue
+            selected.append(best)
+            covered |= best["terms"]
+            budget -= estimate_tokens(best["text"]) + 1  # Separator between snippets
+        return selected
+
+    def _gain(self, candidate: dict, weights: dict, covered: set) -> float:
+        gain = candidate["prior"]
+        for term in candidate["terms"]:
+            weight = weights.get(term, 0.0)
+            gain += weight * self.covered_discount if term in covered else weight
+        return gain
+
+    def _dedupe_text(self, text: str, seen: list) -> str:
+        """Drop sentences that near-duplicate a sentence already packed; record the rest."""
+        kept_lines = []
+        for line in (text or "").split("\n"):
+            kept = []
+            for sentence in _SENTENCE_RE.split(line):
+                terms = frozenset(tokenize(sentence))
+                if len(terms) >= 3 and any(_jaccard(terms, other) >= self.duplicate_threshold for other in seen):
+                    continue
+                if len(terms) >= 3:
+                    seen.append(terms)
+                kept.append(sentence)
+            if kept or not line.strip():
+                kept_lines.append(" ".join(kept))
+        return re.sub(r"\n{3,}", "\n\n", "\n".join(kept_lines)).strip()
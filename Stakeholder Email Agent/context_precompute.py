@@ -0,0 +1,155 @@
+"""
+Speculative Context Precomputation
+Extracts and stores the relevant context of every stakeholder while the user is still
+selecting who to email
+
+Stakeholder selection in the webapp takes minutes, during which nothing runs. Started
+right after extraction, a ContextPrecomputer works through the whole roster at low
+concurrency and stores each context in the report artifact store (see
+utils/artifact_store.py). generate_emails then finds the selected stakeholders' contexts
+warm through TaskPlannerAgent._load_context_artifacts and goes straight to writing.
+
+Precomputation is best effort: it stops before its next LLM call once its deadline
+passes or it is cancelled (the user started generation or left the workflow), and
+whatever it finished so far stays stored.
+
+Environment:
+    CONTEXT_PRECOMPUTE               "0" disables precomputation (default on)
+    CONTEXT_PRECOMPUTE_CONCURRENCY   Context extractions in flight at once (default 1)
+    CONTEXT_PRECOMPUTE_SECONDS       Time precomputation may take (default 600, 0 = none)
+"""
+import asyncio
+import os
+
+from agents.context_extraction import (
+    BATCH_EXTRACTION_ENABLED, PIPELINE_BATCH_SIZE, BatchContextExtractor, stakeholder_key
+)
+from utils.deadlines import Deadline
+from utils.mention_index import MentionIndex
+from utils.report_index import CONTEXT_RETRIEVER
+from utils.structured_logger import get_logger
+
+
+class ContextPrecomputer:
+    """
+    Low-priority context extraction for a whole roster ahead of generation.
+
+    Usage:
+        precomputer = ContextPrecomputer(TaskPlannerAgent())
+        stats = await precomputer.run(stakeholders, report)
+        # from a signal handler or another task:
+        precomputer.cancel("generation started")
+    """
+
+    def __init__(self, task_planner, concurrency: int = 1, deadline_seconds: float = None,
+                 batch: bool = None, log=None):
+        """
+        Args:
+            task_planner: TaskPlannerAgent whose context extraction and artifact store are used
+            concurrency: Context extractions in flight at once
+            deadline_seconds: Time allowed (None or 0 for no limit)
+            batch: Extract in batched calls first (defaults to CONTEXT_BATCH_EXTRACTION)
+            log: Logger (defaults to a "ContextPrecompute" logger)
+        """
+        self.task_planner = task_planner
+        self.concurrency = max(1, concurrency)
+        self.deadline = Deadline(deadline_seconds)
+        if batch is None:
+            batch = BATCH_EXTRACTION_ENABLED and not CONTEXT_RETRIEVER.skip_llm
+        self.batch = batch
+        self.log = log or get_logger("ContextPrecompute")
+
+    def cancel(self, reason: str = "cancelled"):
+        """Stop before the next extraction; safe to call from signal handlers and threads."""
+        self.deadline.cancel(reason)
+
+    @property
+    def stopped(self) -> bool:
+        return self.deadline.cancelled or self.deadline.expired
+
+    async def run(self, stakeholders: list, report: str) -> dict:
+        """
+        Extract and store the context of every stakeholder that has none stored yet.
+
+        Returns:
+            {"stakeholders", "warm", "computed", "remaining", "stopped"}: contexts found
+            already stored, newly stored, still missing, and why work stopped early (None
+            when it finished)
+        """
+        planner = self.task_planner
+        planner._mention_index = MentionIndex(report, stakeholders)
+        planner._prefetched_contexts = {}
+        warm = planner._load_context_artifacts(stakeholders, report)
+        pending = [s for s in stakeholders if stakeholder_key(s) not in warm]
+        self.log.info("Precomputing context for %d of %d stakeholders (%d already stored)",
+                      len(pending), len(stakeholders), len(warm), category="stage")
+
+        computed = 0
+        if self.batch and len(pending) > 1:
+            computed += await self._run_batches(pending, report)
+            pending = [s for s in pending if stakeholder_key(s) not in planner._prefetched_contexts]
+        computed += await self._run_single(pending, report)
+
+        remaining = len(stakeholders) - len(warm) - computed
+        stopped = self.deadline.reason or ("deadline exceeded" if self.deadline.expired else None)
+        if stopped:
+            self.log.info("Context precomputation stopped (%s): %d stored, %d left for generation",
+                          stopped, computed, remaining, category="stage")
+        else:
+            self.log.info("Context precomputation finished: %d stored", computed, category="stage")
+        return {"stakeholders": len(stakeholders), "warm": len(warm), "computed": computed,
+                "remaining": remaining, "stopped": stopped}
+
+    async def _run_batches(self, pending: list, report: str) -> int:
+        """Batched extraction, one call at a time; returns the contexts stored."""
+        planner = self.task_planner
+        extractor = BatchContextExtractor(planner.llm_client, log=self.log)
+        extractor.max_output_tokens = PIPELINE_BATCH_SIZE * extractor.tokens_per_stakeholder
+        size = extractor.batch_size
+        stored = 0
+        for start in range(0, len(pending), size):
+            if self.stopped:
+                break
+            batch = pending[start:start + size]
+            contexts = await asyncio.to_thread(extractor.extract, batch, report)
+            planner._prefetched_contexts.update(contexts)
+            for stakeholder in batch:
+                stored += self._store(stakeholder, report, contexts.get(stakeholder_key(stakeholder)))
+        return stored
+
+    async def _run_single(self, pending: list, report: str) -> int:
+        """Per-stakeholder extraction with at most `concurrency` calls in flight."""
+        planner = self.task_planner
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def extract(stakeholder):
+            async with semaphore:
+                if self.stopped:
+                    return 0
+                context = await asyncio.to_thread(planner._extract_relevant_context, stakeholder, report)
+                return self._store(stakeholder, report, context)
+
+        results = await asyncio.gather(*(extract(s) for s in pending), return_exceptions=True)
+        for stakeholder, result in zip(pending, results):
+            if isinstance(result, Exception):
+                self.log.warning("Could not precompute context for %s: %s", stakeholder.get('name', ''), result)
+        return sum(r for r in results if isinstance(r, int))
+
+    def _store(self, stakeholder: dict, report: str, context: str) -> int:
+        if not context:
+            return 0
+        self.task_planner._store_context_artifact(stakeholder, report, {"relevant_context": context})
+        return 1
+
+
+def precompute_enabled() -> bool:
+    return os.getenv('CONTEXT_PRECOMPUTE', '1') != '0'
+
+
+def precompute_concurrency() -> int:
+    return int(os.getenv('CONTEXT_PRECOMPUTE_CONCURRENCY', '1'))
+
+
+def precompute_timeout() -> float:
+    """Default precomputation time limit in seconds (0 = none)."""
+    return float(os.getenv('CONTEXT_PRECOMPUTE_SECONDS', '600'))
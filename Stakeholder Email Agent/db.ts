@@ -1,4 +1,4 @@
-import { eq, desc } from "drizzle-orm";
+import { and, eq, desc, inArray } from "drizzle-orm";
 import { drizzle } from "drizzle-orm/mysql2";
 import { 
   InsertUser, users, 
@@ -172,6 +172,30 @@ export async function createEmails(emailList: InsertEmail[]): Promise<void> {
   }
 }
 
+/**
+ * Save emails, replacing any earlier email of the same stakeholder in the workflow.
+ * A resumed generation re-reports emails persisted before the interruption, and
+ * regenerated stakeholders supersede their earlier (error) rows.
+ */
+export async function replaceStakeholderEmails(workflowId: number, emailList: InsertEmail[]): Promise<void> {
+  const db = await getDb();
+  if (!db) throw new Error("Database not available");
+
+  if (emailList.length === 0) {
+    return;
+  }
+  const stakeholderIds = Array.from(new Set(emailList.map(email => email.stakeholderId).filter(id => id)));
+  await db.transaction(async (tx) => {
+    if (stakeholderIds.length > 0) {
+      await tx.delete(emails).where(and(
+        eq(emails.workflowId, workflowId),
+        inArray(emails.stakeholderId, stakeholderIds)
+      ));
+    }
+    await tx.insert(emails).values(emailList);
+  });
+}
+
 export async function getWorkflowEmails(workflowId: number): Promise<(Email & { templateName?: string })[]> {
   const db = await getDb();
   if (!db) return [];
@@ -0,0 +1,82 @@
+"""
+Deadlines and Cooperative Cancellation
+Time limits for a workflow and for each stakeholder within it
+
+Blocking LLM calls run in worker threads, which cannot be interrupted. A Deadline carries
+a thread-safe cancelled flag instead: when a deadline passes (or it is cancelled), the
+agent stops before its next LLM call and drops the result of the call already in flight.
+
+Environment:
+    STAKEHOLDER_DEADLINE_SECONDS  Time one stakeholder may take (default 180, 0 = none)
+    WORKFLOW_DEADLINE_SECONDS     Time the whole roster may take (default 900, 0 = none)
+"""
+import os
+import threading
+import time
+
+
+class DeadlineExceeded(Exception):
+    """Raised by Deadline.check() once the deadline has passed or was cancelled."""
+
+
+class Deadline:
+    """
+    A point in time after which work should stop, optionally bounded by a parent deadline.
+
+    Usage:
+        workflow = Deadline(900)
+        stakeholder = Deadline(180, parent=workflow)
+        await asyncio.wait_for(writer.run(task), timeout=stakeholder.remaining())
+    """
+
+    def __init__(self, seconds: float = None, parent: 'Deadline' = None):
+        """
+        Args:
+            seconds: Time allowed from now (None or 0 for no limit of its own)
+            parent: Enclosing deadline; this one expires no later than its parent
+        """
+        self.expires_at = time.monotonic() + seconds if seconds else None
+        self.parent = parent
+        self._cancelled = threading.Event()
+        self.reason = None
+
+    def remaining(self) -> float:
+        """Seconds left (None when unbounded, 0.0 once expired or cancelled)."""
+        if self.cancelled:
+            return 0.0
+        candidates = []
+        if self.expires_at is not None:
+            candidates.append(max(0.0, self.expires_at - time.monotonic()))
+        if self.parent is not None and self.parent.remaining() is not None:
+            candidates.append(self.parent.remaining())
+        return min(candidates) if candidates else None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set() or (self.parent is not None and self.parent.cancelled)
+
+    @property
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def cancel(self, reason: str = "cancelled"):
+        """Cancel this deadline (and every deadline nested in it)."""
+        if self.reason is None:
+            self.reason = reason
+        self._cancelled.set()
+
+    def check(self):
+        """Raise DeadlineExceeded if work should stop; safe to call from worker threads."""
+        if self.expired:
+            raise DeadlineExceeded(self.reason or "deadline exceeded")
+
+
+def stakeholder_timeout() -> float:
+    """Default per-stakeholder time limit in seconds (0 = none)."""
+    return float(os.getenv('STAKEHOLDER_DEADLINE_SECONDS', '180'))
+
+
+def workflow_timeout() -> float:
+    """Default per-workflow time limit in seconds (0 = none)."""
+    return float(os.getenv('WORKFLOW_DEADLINE_SECONDS', '900'))
@@ -0,0 +1,261 @@
+"""
+Report Document Model
+Headings, sections, pages, tables and metrics of a report, by character offset
+
+Ingestion used to hand downstream stages one flat string, so anything that needed "the
+Quality section" or "page 12" had to re-read the whole report. The model is built once
+from the extracted text (plus page boundaries and heading hints from the extractor when
+it has them) and only records offsets into that text, so a section or page is a slice.
+It is stored with the report artifacts under the hash of the text it indexes.
+
+Usage:
+    document = load_document_model(report)
+    quality = document.section_text("Quality")
+    page = document.page_text(12)
+"""
+import re
+
+DOCUMENT_MODEL_VERSION = "1"
+
+_MARKDOWN_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_NUMBERED_HEADING_RE = re.compile(r"^(\d{1,2}(?:\.\d{1,2}){0,3})\.?\s+([A-Z][^.!?]{2,80})$")
+_PIPE_ROW_RE = re.compile(r"^\s*\|?[^|]+(?:\|[^|]*){2,}\|?\s*$")
+_LAYOUT_GAP_RE = re.compile(r"\S(?: {2,}|\t+)(?=\S)")
+_TABLE_RULE_RE = re.compile(r"^[\s|:\-+]+$")
+METRIC_RE = re.compile(
+    r"(?:\$\s?\d[\d,]*(?:\.\d+)?(?:\s?(?:[kKmMbB]\b|million|billion))?"
+    r"|\b\d[\d,]*(?:\.\d+)?\s?(?:%|percent\b|hours?\b|hrs?\b|minutes?\b|mins?\b|days?\b|beds?\b|"
+    r"patients?\b|cases?\b|deaths?\b|admissions?\b|visits?\b|encounters?\b|weeks?\b|months?\b|years?\b)"
+    r"|\b(?:SEP-1|CMS|HCAHPS|Leapfrog)\b[^.\n]{0,40}?\b\d[\d,]*(?:\.\d+)?\b)",
+    re.IGNORECASE
+)
+_MAX_METRICS_PER_SECTION = 20
+_MAX_TABLE_ROWS = 50
+
+
+def _line_spans(text: str) -> list:
+    """(start, end) offsets of every line, without the newline."""
+    spans = []
+    start = 0
+    for line in text.split("\n"):
+        spans.append((start, start + len(line)))
+        start += len(line) + 1
+    return spans
+
+
+def _heading_level(line: str, previous_blank: bool, next_line: str, hints: set) -> int:
+    """Heading level of a line (0 when it is not a heading)."""
+    stripped = line.strip().lstrip("\f")
+    if not stripped or len(stripped) > 90:
+        return 0
+    if hints and stripped.lower() in hints:
+        return 1
+    match = _MARKDOWN_HEADING_RE.match(stripped)
+    if match:
+        return len(match.group(1))
+    match = _NUMBERED_HEADING_RE.match(stripped)
+    if match and ',' not in stripped:
+        return match.group(1).count('.') + 1
+    if stripped[-1] in ".,;!?" or ',' in stripped or '|' in stripped:
+        return 0
+    words = stripped.rstrip(':').split()
+    letters = [c for c in stripped if c.isalpha()]
+    if len(letters) >= 4 and len(words) <= 10 and all(c.isupper() for c in letters):
+        return 1
+    title_words = [w for w in words if w[0].isalpha()]
+    if 2 <= len(words) <= 8 and title_words and \
+            sum(w[0].isupper() for w in title_words) >= 0.75 * len(title_words) and \
+            (stripped.endswith(':') or (previous_blank and len(next_line.strip()) > 60)):
+        return 2
+    return 0
+
+
+def _is_table_row(line: str) -> bool:
+    if _PIPE_ROW_RE.match(line) and not _TABLE_RULE_RE.match(line):
+        return True
+    return len(_LAYOUT_GAP_RE.findall(line.strip())) >= 2
+
+
+def _table_cells(line: str) -> list:
+    if '|' in line:
+        return [cell.strip() for cell in line.strip().strip('|').split('|')]
+    return [cell.strip() for cell in re.split(r" {2,}|\t+", line.strip())]
+
+
+def find_metrics(text: str, offset: int = 0, limit: int = _MAX_METRICS_PER_SECTION) -> list:
+    """Numeric findings (rates, counts, durations, amounts) with their offset and sentence."""
+    metrics = []
+    for match in METRIC_RE.finditer(text):
+        sentence_start = text.rfind(". ", 0, match.start())
+        start = max(sentence_start + 2 if sentence_start != -1 else 0, text.rfind("\n", 0, match.start()) + 1)
+        end_candidates = [i for i in (text.find(". ", match.end()), text.find("\n", match.end())) if i != -1]
+        end = min(end_candidates) if end_candidates else len(text)
+        metrics.append({
+            "value": match.group(0).strip(),
+            "offset": offset + match.start(),
+            "context": text[start:end].strip()[:160],
+        })
+        if len(metrics) >= limit:
+            break
+    return metrics
+
+
+class DocumentModel:
+    """
+    Offsets of the headings, sections, pages and tables of one report text.
+
+    sections: [{"heading", "level", "start", "end", "page", "metrics"}] in document order;
+              text before the first heading is a section with an empty heading
+    pages:    Start offset of every page (page n starts at pages[n - 1]); one page when
+              the extractor had no page boundaries
+    tables:   [{"start", "end", "page", "rows"}]
+    """
+
+    def __init__(self, text: str, sections: list, pages: list, tables: list):
+        self.text = text
+        self.sections = sections
+        self.pages = pages or [0]
+        self.tables = tables
+
+    @classmethod
+    def build(cls, text: str, page_starts: list = None, heading_hints: list = None) -> 'DocumentModel':
+        """
+        Build the model of an extracted text.
+
+        Args:
+            text: Extracted report text (offsets refer to it)
+            page_starts: Start offset of every page, from the extractor; form feeds in the
+                         text mark pages otherwise
+            heading_hints: Heading texts known from the source format (e.g. HTML <h1>-<h6>)
+        """
+        text = text or ""
+        if page_starts:
+            # Pages without text share their start with the next page, keeping page numbers aligned
+            pages = sorted(page_starts)
+        else:
+            pages = [0] + [m.end() for m in re.finditer("\f", text) if m.end() < len(text)]
+        hints = {h.strip().lower() for h in heading_hints or [] if h and h.strip()}
+
+        spans = _line_spans(text)
+        lines = [text[s:e] for s, e in spans]
+        headings = []
+        tables = []
+        table_rows = []
+        for i, (start, end) in enumerate(spans):
+            line = lines[i]
+            if _is_table_row(line) or (table_rows and line.strip() and _TABLE_RULE_RE.match(line)):
+                table_rows.append(i)
+                continue
+            if len(table_rows) >= 2:
+                tables.append(table_rows)
+            table_rows = []
+            previous_blank = i == 0 or not lines[i - 1].strip()
+            next_line = lines[i + 1] if i + 1 < len(lines) else ""
+            level = _heading_level(line, previous_blank, next_line, hints)
+            if level:
+                heading = _MARKDOWN_HEADING_RE.sub(r"\2", line.strip().lstrip("\f")).rstrip(':').strip()
+                headings.append((heading, level, start))
+        if len(table_rows) >= 2:
+            tables.append(table_rows)
+
+        model = cls(text, [], pages, [])
+        bounds = list(headings)
+        if not bounds or text[:bounds[0][2]].strip():
+            bounds.insert(0, ("", 0, 0))
+        for index, (heading, level, start) in enumerate(bounds):
+            end = bounds[index + 1][2] if index + 1 < len(bounds) else len(text)
+            model.sections.append({
+                "heading": heading, "level": level, "start": start, "end": end,
+                "page": model.page_of(start), "metrics": find_metrics(text[start:end], start),
+            })
+        for rows in tables:
+            start, end = spans[rows[0]][0], spans[rows[-1]][1]
+            cells = [_table_cells(lines[r]) for r in rows if not _TABLE_RULE_RE.match(lines[r])]
+            model.tables.append({"start": start, "end": end, "page": model.page_of(start),
+                                 "rows": cells[:_MAX_TABLE_ROWS]})
+        return model
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    def page_of(self, offset: int) -> int:
+        """1-based page number of a text offset."""
+        page = 1
+        for number, start in enumerate(self.pages, 1):
+            if start > offset:
+                break
+            page = number
+        return page
+
+    def page_text(self, page: int) -> str:
+        """Text of a 1-based page ("" when out of range)."""
+        if not 1 <= page <= len(self.pages):
+            return ""
+        end = self.pages[page] if page < len(self.pages) else len(self.text)
+        return self.text[self.pages[page - 1]:end].strip("\f\n")
+
+    def find_section(self, name: str) -> dict:
+        """First section whose heading contains `name` (case-insensitive), or None."""
+        name = name.lower()
+        for section in self.sections:
+            if name in section['heading'].lower():
+                return section
+        return None
+
+    def section_text(self, name_or_section, include_subsections: bool = True) -> str:
+        """
+        Text of a section, found by heading (see find_section) or given as a section dict.
+
+        With include_subsections the text runs to the next heading of the same or a higher level.
+        """
+        section = self.find_section(name_or_section) if isinstance(name_or_section, str) else name_or_section
+        if section is None:
+            return ""
+        end = section['end']
+        if include_subsections and section['level']:
+            following = self.sections[self.sections.index(section) + 1:]
+            end = next((s['start'] for s in following if 0 < s['level'] <= section['level']), len(self.text))
+        return self.text[section['start']:end].strip()
+
+    def sections_on_page(self, page: int) -> list:
+        """Sections that start on, or run across, a 1-based page."""
+        start = self.pages[page - 1] if 1 <= page <= len(self.pages) else len(self.text)
+        end = self.pages[page] if page < len(self.pages) else len(self.text)
+        return [s for s in self.sections if s['start'] < end and s['end'] > start]
+
+    def outline(self) -> str:
+        """Indented heading list with page numbers, for logs and prompts."""
+        return "\n".join(f"{'  ' * max(0, s['level'] - 1)}{s['heading']} (p. {s['page']})"
+                         for s in self.sections if s['heading'])
+
+    def to_dict(self) -> dict:
+        return {"sections": self.sections, "pages": self.pages, "tables": self.tables}
+
+    @classmethod
+    def from_dict(cls, text: str, data: dict) -> 'DocumentModel':
+        return cls(text, data.get('sections', []), data.get('pages', [0]), data.get('tables', []))
+
+
+def store_document_model(document: DocumentModel, store=None):
+    """Store a model built at ingestion under the hash of its text."""
+    from utils.artifact_store import ARTIFACT_STORE, content_hash
+
+    (store or ARTIFACT_STORE).put(content_hash(document.text), "document", DOCUMENT_MODEL_VERSION,
+                                  document.to_dict())
+
+
+def load_document_model(text: str, store=None) -> DocumentModel:
+    """
+    The model of a report text: the one stored at ingestion (with pages and heading
+    hints from the extractor), or one built from the text alone and stored.
+    """
+    from utils.artifact_store import ARTIFACT_STORE, content_hash
+
+    store = store or ARTIFACT_STORE
+    data = store.get(content_hash(text), "document", DOCUMENT_MODEL_VERSION)
+    if data is not None:
+        return DocumentModel.from_dict(text, data)
+    document = DocumentModel.build(text)
+    store_document_model(document, store)
+    return document
@@ -40,11 +40,9 @@ What if you could:
 **CRITICAL: Use healthcare-appropriate language. Say "patients" NOT "customers". Reference specific challenges from the hospital report.**
 
 User has provided:
-- Subject: {subject}
 - Opening: {opening}
 - Benefits: {benefit_1}, {benefit_2}, {benefit_3}
 - Call to Action: {call_to_action}
-- Closing: {closing}
 
 Your task: Generate the two [AI_CONTEXT] sections:
 
@@ -98,6 +96,7 @@ TEMPLATE_CASUAL_BROY = {
         "your_solution": "Your solution description in plain language",
         "timeframe": "Timeframe (e.g., '60 days', '2 weeks')"
     },
+    # User fields that shape the AI sections; the rest are only used at assembly time
     "structure": """Subject: {subject}
 
 {stakeholder_first_name}
@@ -120,7 +119,6 @@ here's what they're actually struggling with:
 **CRITICAL: Use healthcare language. Say "patients" NOT "customers". Reference SPECIFIC challenges from the hospital report.**
 
 User has provided:
-- Subject: {subject}
 - Achievement: {your_achievement}
 - Solution: {your_solution}
 - Timeframe: {timeframe}
@@ -186,6 +184,7 @@ TEMPLATE_PARTNERSHIP = {
         "next_step": "Proposed next step",
         "closing": "Closing and signature"
     },
+    # User fields that shape the AI sections; the rest are only used at assembly time
     "structure": """Subject: {subject}
 
 {stakeholder_name},
@@ -209,11 +208,9 @@ I see potential for mutual value in several areas:
 **CRITICAL: Use healthcare language. Say "patients" NOT "customers". Reference SPECIFIC initiatives or challenges from the hospital report.**
 
 User has provided:
-- Subject: {subject}
 - Partnership Vision: {partnership_vision}
 - Value Points: {mutual_value_1}, {mutual_value_2}, {mutual_value_3}
 - Next Step: {next_step}
-- Closing: {closing}
 
 Your task: Generate the two [AI_CONTEXT] sections:
 
@@ -111,3 +111,33 @@ Format your response as JSON:
 }}
 
 Return ONLY the JSON, no additional text."""
+
+EMAIL_SPECULATIVE_REFINEMENT_PROMPT = """You are a professional cold email expert. Tighten this email into a high-performing cold email. No reviewer feedback is available yet, so apply standard cold email best practices.
+
+Original Email:
+Subject: {subject}
+Body: {body}
+
+Email Style: {email_style}
+
+Stakeholder Context:
+Name: {stakeholder_name}
+Title: {stakeholder_title}
+
+**Refinement Priorities:**
+1. **Cut ruthlessly**: Remove any sentence that doesn't add direct value
+2. **Keep hospital-specific evidence**: Preserve every concrete fact from the hospital report and lead with one
+3. **Use healthcare language**: Replace "customer" with "patient" if present
+4. **Include data**: Add 1-2 specific IntelliSep metrics if missing (97.5% NPV, 8-min TAT, 40% mortality reduction)
+5. **Strengthen CTA**: Make the next step clear and simple
+6. **Target under 150 words**: Ideally 100-120 words
+
+Keep the facts and the voice of the original email. Do not invent new hospital facts.
+
+Format your response as JSON:
+{{
+    "subject": "Refined email subject line (under 60 characters)",
+    "body": "Refined email body (under 150 words)"
+}}
+
+Return ONLY the JSON, no additional text."""
@@ -0,0 +1,224 @@
+"""
+Engagement Suggestions Index for the Task Planner Agent
+Parses the report's stakeholder engagement recommendations once per report
+
+Every style, template and custom prompt carries a "KEY STAKEHOLDER ENGAGEMENT
+SUGGESTIONS" block that asks the writer to look for engagement recommendations in the
+report, so each email call repeats that search. The index extracts them once: a local
+pre-pass keeps the report lines that talk about engagement, one LLM call turns them
+into a per-person entry (communication style, decision triggers, pain points,
+priorities), and the result is stored with the other report artifacts. Each prompt then
+gets only its stakeholder's compact entry in place of the instruction block, or no block
+when the report has no recommendations for that person.
+"""
+import os
+import re
+
+from agents.combined_extraction import parse_json_response
+from prompts.task_planner_prompts import ENGAGEMENT_INDEX_PROMPT
+from utils.stakeholder_dedupe import normalize_name
+from utils.structured_logger import get_logger
+
+ENGAGEMENT_FIELDS = ("communication_style", "decision_triggers", "pain_points", "priorities")
+FIELD_LABELS = {
+    "communication_style": "Communication style",
+    "decision_triggers": "Decision triggers",
+    "pain_points": "Pain points",
+    "priorities": "Priorities",
+}
+ENGAGEMENT_RE = re.compile(
+    r"\b(engag\w*|outreach|recommend\w*|prefer\w*|communicat\w*|decision[- ]mak\w*|triggers?|"
+    r"pain points?|priorit\w*|motivat\w*|talking points?|messaging|resonate\w*)\b",
+    re.IGNORECASE
+)
+# The instruction block of the writer prompts, up to and including its closing blank line
+ENGAGEMENT_BLOCK_RE = re.compile(r"\*\*KEY STAKEHOLDER ENGAGEMENT SUGGESTIONS:\*\*.*?(?:\n[ \t]*\n|\Z)", re.S)
+_MAX_ITEMS = 5
+_MAX_ITEM_CHARS = 120
+
+
+def engagement_excerpts(report: str, context_lines: int = 3, max_chars: int = 24000) -> str:
+    """
+    The report lines that talk about engagement, with `context_lines` around each.
+
+    Returns:
+        Excerpts joined with "[...]" markers ("" when the report has no such lines)
+    """
+    lines = (report or "").split("\n")
+    keep = set()
+    for i, line in enumerate(lines):
+        if ENGAGEMENT_RE.search(line):
+            keep.update(range(max(0, i - context_lines), min(len(lines), i + context_lines + 1)))
+    excerpts = []
+    current = []
+    for i in range(len(lines)):
+        if i in keep:
+            current.append(lines[i])
+        elif current:
+            excerpts.append("\n".join(current))
+            current = []
+    if current:
+        excerpts.append("\n".join(current))
+    return "\n\n[...]\n\n".join(e for e in excerpts if e.strip())[:max_chars]
+
+
+def _clean_items(value) -> list:
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        return []
+    items = [str(item).strip()[:_MAX_ITEM_CHARS] for item in value if str(item).strip()]
+    return items[:_MAX_ITEMS]
+
+
+def validate_entries(parsed) -> list:
+    """Keep well-formed entries that name a person and say something about them."""
+    if isinstance(parsed, dict):
+        parsed = parsed.get('stakeholders', [])
+    entries = []
+    for item in parsed if isinstance(parsed, list) else []:
+        if not isinstance(item, dict) or not str(item.get('name', '')).strip():
+            continue
+        style = item.get('communication_style')
+        if isinstance(style, list):
+            style = " ".join(map(str, style))
+        entry = {
+            "name": str(item['name']).strip(),
+            "communication_style": str(style or "").strip()[:_MAX_ITEM_CHARS],
+            "decision_triggers": _clean_items(item.get('decision_triggers')),
+            "pain_points": _clean_items(item.get('pain_points')),
+            "priorities": _clean_items(item.get('priorities')),
+        }
+        if any(entry[field] for field in ENGAGEMENT_FIELDS):
+            entries.append(entry)
+    return entries
+
+
+def format_entry(entry: dict) -> str:
+    """Compact prompt text of one index entry."""
+    lines = []
+    for field in ENGAGEMENT_FIELDS:
+        value = entry.get(field)
+        if value:
+            lines.append(f"{FIELD_LABELS[field]}: {'; '.join(value) if isinstance(value, list) else value}")
+    return "\n".join(lines)
+
+
+def apply_engagement_entry(prompt: str, entry_text: str) -> str:
+    """
+    Replace the engagement instruction block of a writer prompt with the stakeholder's entry.
+
+    An empty entry removes the block; prompts without the block are returned unchanged.
+    """
+    if not entry_text:
+        return ENGAGEMENT_BLOCK_RE.sub("", prompt, count=1)
+    block = ("**KEY STAKEHOLDER ENGAGEMENT SUGGESTIONS:**\n"
+             "The research report recommends the following for this stakeholder. Match the tone, "
+             "value framing and subject line to it:\n"
+             f"{entry_text}\n\n")
+    return ENGAGEMENT_BLOCK_RE.sub(lambda _: block, prompt, count=1)
+
+
+class EngagementIndex:
+    """Engagement entries of one report, looked up by stakeholder name."""
+
+    def __init__(self, entries: list):
+        self.entries = list(entries)
+        self._by_name = {}
+        self._by_last = {}
+        for entry in self.entries:
+            first, last = normalize_name(entry['name'])
+            self._by_name.setdefault((first, last), entry)
+            self._by_last.setdefault(last, []).append(entry)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, stakeholder: dict) -> dict:
+        """The stakeholder's entry by full name, or by last name when that is unambiguous."""
+        first, last = normalize_name(stakeholder.get('name', ''))
+        entry = self._by_name.get((first, last))
+        if entry is not None:
+            return entry
+        candidates = self._by_last.get(last, []) if last else []
+        if len(candidates) == 1:
+            candidate_first = normalize_name(candidates[0]['name'])[0]
+            if not first or not candidate_first or candidate_first[0] == first[0]:
+                return candidates[0]
+        return None
+
+    def entry_text(self, stakeholder: dict) -> str:
+        """Compact prompt text for the stakeholder ("" when the report has no recommendations for them)."""
+        entry = self.lookup(stakeholder)
+        return format_entry(entry) if entry else ""
+
+
+class EngagementIndexer:
+    """
+    Builds the EngagementIndex of a report, reusing the stored one for an identical report.
+
+    Usage:
+        index = EngagementIndexer(llm_client).build(report)
+        if index is not None:
+            task['engagement'] = index.entry_text(stakeholder)
+    """
+
+    def __init__(self, llm_client, max_excerpt_chars: int = 24000, store=None, log=None):
+        """
+        Args:
+            llm_client: LLM client used for the one indexing call
+            max_excerpt_chars: Largest excerpt text sent to the LLM
+            store: ReportArtifactStore of built indexes (defaults to ARTIFACT_STORE)
+            log: Logger (defaults to an "EngagementIndex" logger)
+        """
+        if store is None:
+            from utils.artifact_store import ARTIFACT_STORE
+            store = ARTIFACT_STORE
+        self.llm_client = llm_client
+        self.store = store
+        self.max_excerpt_chars = max_excerpt_chars
+        self.log = log or get_logger("EngagementIndex")
+
+    def artifact_version(self) -> str:
+        from utils.artifact_store import artifact_version
+
+        return artifact_version(getattr(self.llm_client, 'model', ''), ENGAGEMENT_INDEX_PROMPT)
+
+    def build(self, report: str) -> EngagementIndex:
+        """
+        Index the engagement recommendations of a report.
+
+        Returns:
+            EngagementIndex (empty when the report has no recommendations), or None if the
+            LLM response could not be parsed (prompts then keep their instruction block)
+        """
+        from utils.artifact_store import content_hash
+
+        report_hash = content_hash(report)
+        version = self.artifact_version()
+        stored = self.store.get(report_hash, "engagement", version)
+        if stored is not None:
+            return EngagementIndex(stored)
+
+        entries = self._extract(report)
+        if entries is None:
+            return None
+        self.store.put(report_hash, "engagement", version, entries)
+        self.log.info("Indexed engagement suggestions for %d stakeholders", len(entries), category="stage",
+                      names=[e['name'] for e in entries])
+        return EngagementIndex(entries)
+
+    def _extract(self, report: str) -> list:
+        excerpts = engagement_excerpts(report, max_chars=self.max_excerpt_chars)
+        if not excerpts:
+            return []
+        prompt = ENGAGEMENT_INDEX_PROMPT.format(engagement_excerpts=excerpts)
+        response = self.llm_client.get_completion([{"role": "user", "content": prompt}], max_tokens=2048)
+        parsed = parse_json_response(response)
+        if parsed is None:
+            self.log.warning("Could not parse the engagement index; prompts keep the full instructions")
+            return None
+        return validate_entries(parsed)
+
+
+ENGAGEMENT_INDEX_ENABLED = os.getenv('ENGAGEMENT_INDEX', '1') != '0'
@@ -0,0 +1,127 @@
+"""
+Incremental Stakeholder Extraction for the Orchestrator Agent
+Re-extracts only the sections of a report revision that changed
+
+When a revised version of a report arrives, its sections are compared with the previous
+version (see utils/near_duplicates.py). Only the changed sections that contain
+stakeholder candidates are sent to the LLM; the people found there are merged into the
+previous stakeholder list (the revision's title and details take precedence), and
+previous stakeholders the revision no longer mentions are dropped. Every stakeholder
+records its provenance:
+
+    {"source": "previous_version", "report_hash": ...}              unchanged
+    {"source": "previous_version", "report_hash": ..., "updated_in": ...}
+    {"source": "revision", "report_hash": ..., "sections": [...]}   new in the revision
+"""
+from agents.candidate_extraction import select_candidate_windows
+from agents.combined_extraction import parse_json_response, validate_stakeholders
+from prompts.orchestrator_prompts import CANDIDATE_STAKEHOLDER_EXTRACTION_PROMPT
+from utils.stakeholder_dedupe import dedupe_stakeholders, merge_text
+from utils.structured_logger import get_logger
+
+
+class IncrementalExtractor:
+    """
+    Stakeholder extraction over the changed sections of a report revision.
+
+    Usage:
+        fingerprint = NEAR_DUPLICATE_INDEX.add(report_hash, report)
+        match = NEAR_DUPLICATE_INDEX.find(report_hash, fingerprint)
+        stakeholders = IncrementalExtractor(llm_client).extract(report_hash, fingerprint, match, previous)
+    """
+
+    def __init__(self, llm_client, log=None):
+        """
+        Args:
+            llm_client: LLM client used for the changed-section call
+            log: Logger (defaults to an "IncrementalExtraction" logger)
+        """
+        self.llm_client = llm_client
+        self.log = log or get_logger("IncrementalExtraction")
+
+    def extract(self, report_hash: str, fingerprint, match: dict, previous: list) -> list:
+        """
+        Update the previous stakeholder list for a report revision.
+
+        Args:
+            report_hash: content_hash() of the revised report text
+            fingerprint: ReportFingerprint of the revised report
+            match: NearDuplicateIndex.find() result for the previous version
+            previous: Stakeholders extracted from the previous version
+
+        Returns:
+            Merged stakeholder list with provenance, or None if the changed sections could
+            not be extracted (the caller then extracts the whole report)
+        """
+        previous_hashes = set(match['section_hashes'])
+        changed = [(section, digest) for section, digest in zip(fingerprint.sections, fingerprint.section_hashes)
+                   if digest not in previous_hashes]
+        found = self._extract_changed(changed)
+        if found is None:
+            return None
+
+        changed_hashes = {digest for _, digest in changed}
+        kept = []
+        dropped = []
+        for stakeholder in previous:
+            if not fingerprint.stakeholder_sections(stakeholder):
+                dropped.append(stakeholder.get('name', ''))
+                continue
+            entry = dict(stakeholder)
+            entry['provenance'] = stakeholder.get('provenance') or {
+                "source": "previous_version", "report_hash": match['report_hash']
+            }
+            kept.append(entry)
+        for stakeholder in found:
+            stakeholder['provenance'] = {
+                "source": "revision",
+                "report_hash": report_hash,
+                "sections": [d for d in fingerprint.stakeholder_sections(stakeholder) if d in changed_hashes],
+            }
+
+        revision_entries = {s['name']: s for s in found}
+        # Carried-over entries (from the previous version or an earlier revision) by identity
+        kept_entries = {(s.get('id'), s.get('name')): s for s in kept}
+        merged, dedupe_report = dedupe_stakeholders(kept + found)
+        updated = 0
+        for stakeholder in merged:
+            revised = [revision_entries[name] for name in map(str, stakeholder.get('merged_from', []))
+                       if name in revision_entries]
+            original = kept_entries.get((stakeholder.get('id'), stakeholder.get('name')))
+            if original is not None and revised:
+                self._apply_revision(stakeholder, original, revised[0])
+                stakeholder['provenance'] = dict(stakeholder['provenance'], updated_in=report_hash)
+                updated += 1
+
+        self.log.info("Incremental extraction: %d of %d sections changed; %d stakeholders kept, %d updated, "
+                      "%d new, %d no longer mentioned", len(changed), len(fingerprint.sections),
+                      len(kept) - updated, updated, len(found) - dedupe_report['merged'], len(dropped),
+                      category="stage", dropped=dropped)
+        return merged
+
+    @staticmethod
+    def _apply_revision(stakeholder: dict, original: dict, revised: dict):
+        """
+        Let the revision's title and details replace those of the carried-over entry
+        (`original`, before dedupe merged them); the entry keeps its id and name.
+        """
+        if revised.get('title'):
+            stakeholder['title'] = revised['title']
+        if revised.get('details'):
+            stakeholder['details'] = merge_text(revised['details'], original.get('details'))
+
+    def _extract_changed(self, changed: list) -> list:
+        """Extract the stakeholders of the changed sections that name somebody (no LLM call when none do)."""
+        sections = [section for section, _ in changed if select_candidate_windows(section)['candidates']]
+        if not sections:
+            return []
+        excerpts = "\n\n[...]\n\n".join(sections)
+        prompt = CANDIDATE_STAKEHOLDER_EXTRACTION_PROMPT.format(candidate_windows=excerpts)
+        response = self.llm_client.get_completion([{"role": "user", "content": prompt}], max_tokens=4096)
+        parsed = parse_json_response(response)
+        if isinstance(parsed, dict):
+            parsed = parsed.get('stakeholders')
+        if not isinstance(parsed, list):
+            self.log.warning("Could not parse the changed-section extraction; extracting the whole report")
+            return None
+        return validate_stakeholders(parsed, [])
@@ -13,7 +13,9 @@ class LLMClient:
         self.model = model
         self.client = OpenAI(
             base_url="https://openrouter.ai/api/v1",
-            api_key=os.getenv("OPENROUTER_API_KEY")
+            api_key=os.getenv("OPENROUTER_API_KEY"),
+            # A hung request must not outlive the stakeholder deadline (see utils/deadlines.py)
+            timeout=float(os.getenv("LLM_REQUEST_TIMEOUT", "120"))
         )
 
     def get_completion(self, messages, conversation_history=None, max_tokens=2048, temperature=0.7):
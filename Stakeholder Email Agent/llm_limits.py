@@ -0,0 +1,140 @@
+"""
+Process-wide LLM Limits
+One concurrency limit and one token budget shared by every agent in the process
+
+Stage limits (see agents/pipeline.py) bound one workflow. When several reports run in
+one process (see agents/batch_orchestrator.py), their pipelines must also share a cap on
+calls in flight and a spending budget. Every agent's client goes through LLM_GATE:
+calls beyond the limit wait for a slot, and once the budget is spent new calls raise
+LLMBudgetExceeded, which the agents handle like any other failed call.
+
+Usage is attributed to the current unit of work (e.g. one report) with track(), which
+follows asyncio tasks and the worker threads started from them.
+
+Environment:
+    LLM_MAX_CONCURRENCY  Calls in flight across the process (default 0 = no limit)
+    LLM_TOKEN_BUDGET     Estimated prompt plus completion tokens (default 0 = no budget)
+"""
+import contextvars
+import os
+import threading
+from contextlib import contextmanager
+
+from utils.tokens import estimate_message_tokens, estimate_tokens
+
+_current_usage = contextvars.ContextVar('llm_usage', default=None)
+
+
+class LLMBudgetExceeded(Exception):
+    """Raised instead of starting an LLM call once the process-wide token budget is spent."""
+
+
+def _empty_usage() -> dict:
+    return {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "failed": 0}
+
+
+class LLMGate:
+    """
+    Shared concurrency limit and token budget for blocking LLM calls.
+
+    Usage:
+        LLM_GATE.configure(max_concurrency=16, token_budget=5_000_000)
+        client = LLM_GATE.wrap(LLMClient())
+        with LLM_GATE.track() as usage:
+            ...  # usage counts the calls made here
+    """
+
+    def __init__(self, max_concurrency: int = 0, token_budget: int = 0):
+        """
+        Args:
+            max_concurrency: Calls in flight at once (0 for no limit)
+            token_budget: Estimated tokens allowed (0 for no budget)
+        """
+        self._lock = threading.Lock()
+        self.configure(max_concurrency, token_budget)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_concurrency=int(os.getenv('LLM_MAX_CONCURRENCY', '0')),
+            token_budget=int(os.getenv('LLM_TOKEN_BUDGET', '0'))
+        )
+
+    def configure(self, max_concurrency: int = 0, token_budget: int = 0):
+        """Set the limits and reset the usage; call before any client is in use."""
+        self.max_concurrency = max_concurrency
+        self.token_budget = token_budget
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self.usage = _empty_usage()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def tokens_used(self) -> int:
+        return self.usage['prompt_tokens'] + self.usage['completion_tokens']
+
+    @property
+    def exhausted(self) -> bool:
+        return bool(self.token_budget) and self.tokens_used >= self.token_budget
+
+    def wrap(self, client) -> 'GatedLLMClient':
+        return GatedLLMClient(client, self)
+
+    @contextmanager
+    def track(self):
+        """Collect the usage of the calls made in this context (and tasks/threads started from it)."""
+        usage = _empty_usage()
+        token = _current_usage.set(usage)
+        try:
+            yield usage
+        finally:
+            _current_usage.reset(token)
+
+    def call(self, func, messages, *args, **kwargs):
+        """Run one blocking LLM call under the limits and record its usage."""
+        if self.exhausted:
+            raise LLMBudgetExceeded(f"LLM token budget of {self.token_budget} spent")
+        if self._slots is not None:
+            self._slots.acquire()
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        response = None
+        try:
+            response = func(messages, *args, **kwargs)
+            return response
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            if self._slots is not None:
+                self._slots.release()
+            self._record(estimate_message_tokens(messages),
+                         estimate_tokens(response if isinstance(response, str) else ""),
+                         failed=response is None)
+
+    def _record(self, prompt_tokens: int, completion_tokens: int, failed: bool):
+        with self._lock:
+            for usage in (self.usage, _current_usage.get()):
+                if usage is None:
+                    continue
+                usage['calls'] += 1
+                usage['prompt_tokens'] += prompt_tokens
+                usage['completion_tokens'] += completion_tokens
+                usage['failed'] += int(failed)
+
+
+class GatedLLMClient:
+    """LLM client proxy whose get_completion goes through an LLMGate; other attributes pass through."""
+
+    def __init__(self, client, gate: LLMGate):
+        self._client = client
+        self._gate = gate
+
+    def get_completion(self, messages, *args, **kwargs):
+        return self._gate.call(self._client.get_completion, messages, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+LLM_GATE = LLMGate.from_env()
@@ -0,0 +1,218 @@
+"""
+Stakeholder Mention Index
+Finds every stakeholder name variant, last name and title alias in a report in one pass
+
+Direct mentions (quotes, initiatives, the name with credentials) are the most valuable
+context for a personalized email. An Aho-Corasick automaton over the variants of the
+whole roster scans the report once in linear time; each mention keeps its offsets so
+the surrounding window is a slice rather than another read of the document.
+"""
+import re
+from collections import deque
+
+from utils.report_index import NAME_AFFIXES
+
+NAME_PREFIXES = ("dr", "mr", "mrs", "ms")
+DOCTORAL_CREDENTIALS = frozenset("md do phd dnp".split())
+
+# Kinds ordered from strongest to weakest evidence that the passage is about the stakeholder
+MENTION_KINDS = ("name", "last_name", "title")
+
+
+def _fold(text: str) -> str:
+    """Lowercase while keeping offsets aligned with the original text."""
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+def name_variants(stakeholder: dict) -> list:
+    """
+    Build the (variant, kind) patterns for one stakeholder.
+
+    "Dr. Kim Schwenk, MSN, RN" yields the full name as written, "Kim Schwenk",
+    "Dr. Schwenk", "Dr Schwenk" and the last name "Schwenk"; the title contributes
+    itself and, for C-suite titles, its acronym ("Chief Nursing Officer" -> "CNO").
+    """
+    raw_name = (stakeholder.get('name') or '').strip()
+    variants = []
+    if raw_name:
+        variants.append((raw_name, "name"))
+
+    head, _, credentials = raw_name.partition(',')
+    words = [w for w in re.split(r"\s+", head.strip()) if w]
+    has_prefix = bool(words) and words[0].rstrip('.').lower() in NAME_PREFIXES
+    core = [w for w in words if w.rstrip('.').lower() not in NAME_AFFIXES]
+    credential_set = {c.strip().rstrip('.').lower() for c in credentials.split(',')}
+
+    if len(core) >= 2:
+        first, last = core[0], core[-1]
+        variants.append((" ".join(core), "name"))
+        variants.append((f"{first} {last}", "name"))
+        if has_prefix or credential_set & DOCTORAL_CREDENTIALS:
+            prefix = words[0].rstrip('.') if has_prefix else "Dr"
+            variants.append((f"{prefix}. {last}", "name"))
+            variants.append((f"{prefix} {last}", "name"))
+        if len(last) >= 3:
+            variants.append((last, "last_name"))
+
+    title = (stakeholder.get('title') or '').strip()
+    if title:
+        variants.append((title, "title"))
+        title_words = [w for w in re.split(r"[\s\-]+", title) if w and w.lower() not in ("of", "and", "the", "&")]
+        if len(title_words) >= 2 and title_words[0].lower() == "chief":
+            variants.append(("".join(w[0].upper() for w in title_words), "title"))
+
+    seen = set()
+    unique = []
+    for variant, kind in variants:
+        if variant.lower() not in seen:
+            seen.add(variant.lower())
+            unique.append((variant, kind))
+    return unique
+
+
+class AhoCorasickAutomaton:
+    """Case-insensitive multi-pattern matcher with whole-word matches."""
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self._built = False
+
+    def add(self, pattern: str, value):
+        """Add a pattern; `value` is reported for every match of it."""
+        node = 0
+        for char in _fold(pattern):
+            if char not in self._goto[node]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[node][char] = len(self._goto) - 1
+            node = self._goto[node][char]
+        self._output[node].append((len(pattern), value))
+        self._built = False
+
+    def build(self):
+        """Compute failure links (breadth-first)."""
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+        self._built = True
+
+    def find_all(self, text: str):
+        """
+        Scan text once.
+
+        Yields:
+            (start, end, value) for every whole-word occurrence of every pattern
+        """
+        if not self._built:
+            self.build()
+        folded = _fold(text)
+        node = 0
+        for position, char in enumerate(folded):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for length, value in self._output[node]:
+                end = position + 1
+                start = end - length
+                if (start == 0 or not folded[start - 1].isalnum()) and (end == len(text) or not folded[end].isalnum()):
+                    yield start, end, value
+
+
+class MentionIndex:
+    """
+    Offsets of every stakeholder mention in a report.
+
+    Usage:
+        index = MentionIndex(report, stakeholders)
+        windows = index.context_windows(stakeholders[0])
+    """
+
+    def __init__(self, report: str, stakeholders: list):
+        self.report = report or ""
+        self.stakeholders = stakeholders
+        self._mentions = {i: [] for i in range(len(stakeholders))}
+
+        automaton = AhoCorasickAutomaton()
+        for i, stakeholder in enumerate(stakeholders):
+            for variant, kind in name_variants(stakeholder):
+                automaton.add(variant, (i, kind))
+
+        for start, end, (i, kind) in automaton.find_all(self.report):
+            self._mentions[i].append({"start": start, "end": end, "text": self.report[start:end], "kind": kind})
+
+        for mentions in self._mentions.values():
+            # Keep the longest match where variants overlap ("Dr. Schwenk" over "Schwenk")
+            mentions.sort(key=lambda m: (m["start"], -(m["end"] - m["start"])))
+            deduped = []
+            for mention in mentions:
+                if deduped and mention["start"] < deduped[-1]["end"]:
+                    continue
+                deduped.append(mention)
+            mentions[:] = deduped
+
+    def _position(self, stakeholder: dict) -> int:
+        for i, candidate in enumerate(self.stakeholders):
+            if candidate is stakeholder:
+                return i
+        for i, candidate in enumerate(self.stakeholders):
+            if (candidate.get('name'), candidate.get('title')) == (stakeholder.get('name'), stakeholder.get('title')):
+                return i
+        return None
+
+    def mentions(self, stakeholder: dict, kinds=MENTION_KINDS) -> list:
+        """Mentions of a stakeholder in document order ({"start", "end", "text", "kind"})."""
+        position = self._position(stakeholder)
+        if position is None:
+            return []
+        return [m for m in self._mentions[position] if m["kind"] in kinds]
+
+    def window(self, mention: dict, radius: int = 300) -> tuple:
+        """(start, end) of the text around a mention, widened to whitespace boundaries."""
+        start = max(0, mention["start"] - radius)
+        end = min(len(self.report), mention["end"] + radius)
+        while start > 0 and not self.report[start - 1].isspace():
+            start -= 1
+        while end < len(self.report) and not self.report[end].isspace():
+            end += 1
+        return start, end
+
+    def context_windows(self, stakeholder: dict, radius: int = 300, max_windows: int = 5) -> list:
+        """
+        Text windows around a stakeholder's mentions, overlapping windows merged.
+
+        Name mentions are used when present; title aliases only when the person is
+        never mentioned by name.
+
+        Returns:
+            List of window strings in document order
+        """
+        mentions = self.mentions(stakeholder, kinds=("name", "last_name")) or self.mentions(stakeholder, kinds=("title",))
+        spans = []
+        for mention in mentions:
+            start, end = self.window(mention, radius)
+            if spans and start <= spans[-1][1]:
+                spans[-1] = (spans[-1][0], max(spans[-1][1], end))
+            else:
+                spans.append((start, end))
+        return [self.report[start:end].strip() for start, end in spans[:max_windows]]
+
+
+def merge_mention_windows(windows: list, passages: str) -> str:
+    """Prepend mention windows that the retrieved passages do not already contain."""
+    extra = [w for w in windows if w and w not in passages]
+    if not extra:
+        return passages
+    return "\n\n".join(extra + [passages]) if passages else "\n\n".join(extra)
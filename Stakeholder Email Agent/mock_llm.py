@@ -65,3 +65,19 @@ class MockLLMClient:
         """Reset call count and last messages."""
         self.call_count = 0
         self.last_messages = None
+
+
+class ScriptedLLMClient:
+    """
+    Mock LLM client that returns one fixed response and records the prompts it was sent.
+    """
+    def __init__(self, response, model="test-model"):
+        self.model = model
+        self.response = response
+        self.prompts = []
+        self.call_count = 0
+    
+    def get_completion(self, messages, max_tokens=2048, temperature=0.7):
+        self.call_count += 1
+        self.prompts.append(messages[0]["content"])
+        return self.response
@@ -0,0 +1,259 @@
+"""
+Near-Duplicate Report Index
+Finds earlier reports that differ from a new one only in a few sections
+
+Reports for the same hospital are often re-exported with small differences (a new date,
+one edited section, another PDF producer), so their content hashes never match. Each
+ingested report gets a 64-bit SimHash over word shingles of its normalized text and a
+list of section hashes. Sections are cut at content-defined sentence boundaries, so an
+edit only changes the sections around it and line wrapping does not matter. A banded
+index finds reports within a few bits of a new one; comparing section hashes then tells
+which artifacts derived from unchanged sections can be reused.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from utils.mention_index import name_variants
+from utils.structured_logger import get_logger
+
+_log = get_logger("NearDuplicates")
+
+SIMHASH_BITS = 64
+_BANDS = 8  # 8 bands of 8 bits: any two reports within 7 bits share a band
+_BAND_BITS = SIMHASH_BITS // _BANDS
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Fold case, accents, punctuation (except sentence ends) and whitespace."""
+    text = unicodedata.normalize('NFKD', text or "").encode('ascii', 'ignore').decode('ascii').lower()
+    text = re.sub(r"[^a-z0-9.!?]+", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(text: str, shingle_words: int = 3) -> int:
+    """64-bit SimHash over the word shingles of the normalized text."""
+    words = normalize_text(text).replace('.', ' ').replace('!', ' ').replace('?', ' ').split()
+    shingles = [" ".join(words[i:i + shingle_words]) for i in range(max(1, len(words) - shingle_words + 1))]
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        value = _hash64(shingle)
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit in range(SIMHASH_BITS) if weights[bit] > 0)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def content_sections(text: str, average_sentences: int = 8, max_sentences: int = 32) -> list:
+    """
+    Split text into sections at content-defined sentence boundaries.
+
+    A section ends after a sentence whose normalized hash is divisible by
+    `average_sentences` (or after `max_sentences`), so boundaries depend only on nearby
+    text: inserting or editing a sentence changes its own section and leaves the others
+    intact. Sections keep the original wording with whitespace collapsed.
+    """
+    sections = []
+    current = []
+    for sentence in _SENTENCE_RE.split(re.sub(r"\s+", " ", text or "").strip()):
+        normalized = normalize_text(sentence)
+        if not normalized:
+            continue
+        current.append(sentence)
+        if _hash64(normalized) % average_sentences == 0 or len(current) >= max_sentences:
+            sections.append(" ".join(current))
+            current = []
+    if current:
+        sections.append(" ".join(current))
+    return sections
+
+
+def section_hash(section: str) -> str:
+    """Hash of a section's normalized text."""
+    return hashlib.sha256(normalize_text(section).encode('utf-8')).hexdigest()[:16]
+
+
+class ReportFingerprint:
+    """SimHash and section hashes of one report text."""
+
+    def __init__(self, text: str):
+        self.sections = content_sections(text)
+        self.section_hashes = [section_hash(s) for s in self.sections]
+        self.simhash = simhash(text)
+
+    def changed_sections(self, previous_hashes) -> list:
+        """Sections of this report that the previous report does not contain."""
+        previous = set(previous_hashes)
+        return [s for s, h in zip(self.sections, self.section_hashes) if h not in previous]
+
+    def stakeholder_sections(self, stakeholder: dict) -> list:
+        """Hashes of the sections that mention the stakeholder by name or last name."""
+        variants = [normalize_text(v) for v, kind in name_variants(stakeholder) if kind != "title"]
+        patterns = [re.compile(rf"\b{re.escape(v)}\b") for v in variants if v]
+        return [h for s, h in zip(self.sections, self.section_hashes)
+                if any(p.search(normalize_text(s)) for p in patterns)]
+
+
+    def sections_in(self, text: str) -> list:
+        """Hashes of the sections with a sentence that appears in `text` (e.g. retrieved passages)."""
+        normalized = normalize_text(text)
+        found = []
+        for section, digest in zip(self.sections, self.section_hashes):
+            sentences = (normalize_text(sentence) for sentence in _SENTENCE_RE.split(section))
+            if any(len(sentence) >= 20 and sentence in normalized for sentence in sentences):
+                found.append(digest)
+        return found
+
+
+class NearDuplicateIndex:
+    """
+    Local index of ingested reports by SimHash, persisted as one JSON file.
+
+    Usage:
+        fingerprint = NEAR_DUPLICATE_INDEX.add(report_hash, report)
+        match = NEAR_DUPLICATE_INDEX.find(report_hash, fingerprint)
+        if match:
+            unchanged = match["section_hashes"]
+    """
+
+    def __init__(self, path: str = None, max_distance: int = 6, min_shared: float = 0.5,
+                 max_reports: int = 500):
+        """
+        Args:
+            path: JSON file of the index (None keeps it in memory)
+            max_distance: Largest SimHash Hamming distance of a near duplicate (at most 7)
+            min_shared: Smallest share of a new report's sections an earlier report must contain
+            max_reports: Reports kept (least recently ingested are dropped)
+        """
+        self.path = path
+        self.max_distance = min(max_distance, _BANDS - 1)
+        self.min_shared = min_shared
+        self.max_reports = max_reports
+        self._lock = threading.Lock()
+        self._reports = None
+        self._bands = {}
+        self._fingerprints = OrderedDict()
+
+    def add(self, report_hash: str, text: str) -> ReportFingerprint:
+        """
+        Fingerprint a report at ingestion and record it in the index.
+
+        Reports already added by this process return their fingerprint without rehashing.
+        """
+        with self._lock:
+            fingerprint = self._fingerprints.get(report_hash)
+        if fingerprint is not None:
+            return fingerprint
+        fingerprint = ReportFingerprint(text)
+        with self._lock:
+            self._fingerprints[report_hash] = fingerprint
+            while len(self._fingerprints) > 8:
+                self._fingerprints.popitem(last=False)
+            self._load()
+            self._reports.pop(report_hash, None)
+            self._reports[report_hash] = {
+                "simhash": fingerprint.simhash,
+                "section_hashes": fingerprint.section_hashes,
+            }
+            while len(self._reports) > self.max_reports:
+                self._reports.popitem(last=False)
+            self._rebuild_bands()
+            self._save()
+        return fingerprint
+
+    def find(self, report_hash: str, fingerprint: ReportFingerprint) -> dict:
+        """
+        Find the closest earlier report to a new one.
+
+        Returns:
+            {"report_hash", "distance", "shared", "section_hashes"} of the best match, or None
+        """
+        with self._lock:
+            self._load()
+            candidates = set()
+            for band, value in self._band_values(fingerprint.simhash):
+                candidates.update(self._bands.get((band, value), ()))
+            candidates.discard(report_hash)
+
+            best = None
+            new_hashes = fingerprint.section_hashes
+            for candidate in candidates:
+                entry = self._reports[candidate]
+                distance = hamming_distance(fingerprint.simhash, entry['simhash'])
+                if distance > self.max_distance:
+                    continue
+                previous = set(entry['section_hashes'])
+                shared = sum(1 for h in new_hashes if h in previous) / max(1, len(new_hashes))
+                if shared < self.min_shared:
+                    continue
+                if best is None or (shared, -distance) > (best['shared'], -best['distance']):
+                    best = {"report_hash": candidate, "distance": distance, "shared": shared,
+                            "section_hashes": list(entry['section_hashes'])}
+            return best
+
+    @staticmethod
+    def _band_values(value: int):
+        mask = (1 << _BAND_BITS) - 1
+        for band in range(_BANDS):
+            yield band, value >> (band * _BAND_BITS) & mask
+
+    def _rebuild_bands(self):
+        """Re-index the band buckets (caller holds the lock)."""
+        self._bands = {}
+        for report_hash, entry in self._reports.items():
+            for key in self._band_values(entry['simhash']):
+                self._bands.setdefault(key, []).append(report_hash)
+
+    def _load(self):
+        """Read the index file once (caller holds the lock)."""
+        if self._reports is not None:
+            return
+        self._reports = OrderedDict()
+        if self.path:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    self._reports.update((k, v) for k, v in data.items() if isinstance(v, dict))
+            except (OSError, ValueError):
+                pass
+        self._rebuild_bands()
+
+    def _save(self):
+        """Write atomically (caller holds the lock)."""
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._reports, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            _log.warning("Could not persist near-duplicate index: %s", e)
+
+
+def _default_index_path() -> str:
+    from utils.artifact_store import ARTIFACT_STORE
+    if not ARTIFACT_STORE.artifact_dir:
+        return None
+    return os.path.join(ARTIFACT_STORE.artifact_dir, "near_duplicates.json")
+
+
+# Lives next to the report artifacts; NEAR_DUPLICATE_MAX_DISTANCE=0 only matches identical wording
+NEAR_DUPLICATE_INDEX = NearDuplicateIndex(
+    path=_default_index_path(),
+    max_distance=int(os.getenv('NEAR_DUPLICATE_MAX_DISTANCE', '6'))
+)
@@ -2,32 +2,260 @@
         Returns:
             List of generated email dictionaries
         """
-        print(f"[{self.name}] Starting email generation for {len(selected_stakeholders)} pre-selected stakeholders...")
-        print(f"[{self.name}] Generation Mode: {generation_mode}")
+        self.log.info("Starting email generation for %d pre-selected stakeholders (mode: %s)...",
+                      len(selected_stakeholders), generation_mode, category="stage")
         
         # Load report content for context
         try:
             report = self._load_report(report_input)
-            print(f"[{self.name}] Report loaded successfully ({len(report)} characters)")
+            self.log.info("Report loaded successfully (%d characters)", len(report))
         except Exception as e:
-            print(f"[{self.name}] ERROR: Failed to load report: {e}")
+            self.log.error("Failed to load report: %s", e)
             return []
         
+        selected_stakeholders = self._dedupe_stakeholders(selected_stakeholders)
+        
         # Delegate to Task Planner Agent
-        print(f"[{self.name}] Delegating to Task Planner Agent...")
+        self.log.info("Delegating to Task Planner Agent...", category="stage")
         task_planner = TaskPlannerAgent()
-        emails = await task_planner.run(
+        emails = await task_planner.generate_emails(
             selected_stakeholders,
             self.report_content,
             company_summary,
             generation_mode,
             mode_config,
-            user_id
+            user_id,
+            workflow_id=getattr(self, 'workflow_id', None)
         )
         
-        print(f"[{self.name}] Email generation complete. Generated {len(emails)} emails.")
+        self.log.info("Email generation complete. Generated %d emails.", len(emails), category="stage")
         return emails
     
+    async def stream_emails_for_selected_stakeholders(self, report_input: dict, selected_stakeholders: list,
+                                                      company_summary: str, generation_mode: str,
+                                                      mode_config: dict, user_id: int = None):
+        """
+        Streaming variant of generate_emails_for_selected_stakeholders.
+        
+        Yields:
+            Each email (or error result) as soon as it is finished, in completion order,
+            tagged with 'stakeholder_id' (the stakeholder's 'id' or its position in the list)
+        
+        When workflow_id is set on the orchestrator, stage outputs are checkpointed and a
+        re-run of the same workflow only generates what is missing or failed.
+        """
+        self.log.info("Streaming email generation for %d pre-selected stakeholders (mode: %s)...",
+                      len(selected_stakeholders), generation_mode, category="stage")
+        
+        try:
+            report = self._load_report(report_input)
+            self.log.info("Report loaded successfully (%d characters)", len(report))
+        except Exception as e:
+            self.log.error("Failed to load report: %s", e)
+            return
+        
+        selected_stakeholders = self._dedupe_stakeholders(selected_stakeholders)
+        task_planner = TaskPlannerAgent()
+        completed = 0
+        async for email in task_planner.stream_emails(
+            selected_stakeholders,
+            self.report_content,
+            company_summary,
+            generation_mode,
+            mode_config,
+            user_id,
+            workflow_id=getattr(self, 'workflow_id', None)
+        ):
+            completed += 1
+            yield email
+        
+        self.log.info("Email generation complete. Streamed %d emails.", completed, category="stage")
+
+    async def precompute_contexts(self, report_input: dict, stakeholders: list, precomputer=None) -> dict:
+        """
+        Store the relevant context of every extracted stakeholder ahead of generation.
+
+        Runs while the user selects stakeholders; a later generate_emails on the same
+        report finds the contexts stored and skips context extraction for them.
+
+        Args:
+            report_input: Dictionary with 'type' and either 'url' or 'content'
+            stakeholders: All extracted stakeholders of the workflow
+            precomputer: ContextPrecomputer to use, so the caller can cancel it
+
+        Returns:
+            Precomputation stats (see ContextPrecomputer.run), or None if the report failed to load
+        """
+        from agents.context_precompute import (
+            ContextPrecomputer, precompute_concurrency, precompute_timeout
+        )
+
+        try:
+            report = self._load_report(report_input)
+        except Exception as e:
+            self.log.error("Failed to load report: %s", e)
+            return None
+
+        # Same identities as generate_emails, so its artifact lookups hit
+        stakeholders = self._dedupe_stakeholders(stakeholders)
+        if precomputer is None:
+            precomputer = ContextPrecomputer(TaskPlannerAgent(), concurrency=precompute_concurrency(),
+                                             deadline_seconds=precompute_timeout(), log=self.log)
+        return await precomputer.run(stakeholders, report)
+
+    async def extract_stakeholders_and_summary(self, report: str) -> tuple:
+        """
+        Extract the stakeholders and the company summary of a report.
+        
+        Results are stored in the report artifact store (see utils/artifact_store.py), so
+        a later workflow on an identical report text reuses them without LLM calls as long
+        as the extraction prompts and the model are unchanged. A revision of an earlier
+        report (a near duplicate, see utils/near_duplicates.py) is extracted incrementally:
+        only its changed sections go to the LLM and the results are merged into the
+        earlier stakeholder list with provenance (see agents/incremental_extraction.py);
+        the company summary is recomputed from the full revision.
+        
+        Args:
+            report: Extracted report text
+        
+        Returns:
+            Tuple of (stakeholder list, company summary)
+        """
+        from utils.artifact_store import ARTIFACT_STORE, content_hash
+        
+        report_hash = content_hash(report)
+        version = self._extraction_artifact_version()
+        cached = ARTIFACT_STORE.get(report_hash, "extraction", version)
+        if cached is not None:
+            self.log.info("Reusing %d stakeholders and the summary extracted from an identical report",
+                          len(cached['stakeholders']), category="stage")
+            return cached['stakeholders'], cached['company_summary']
+        
+        revised = await self._extract_revision(report, report_hash, version)
+        if revised is not None:
+            stakeholders, summary = revised
+        else:
+            stakeholders, summary = await self._run_extraction(report)
+        if stakeholders and summary:
+            ARTIFACT_STORE.put(report_hash, "extraction", version,
+                               {"stakeholders": stakeholders, "company_summary": summary})
+        return stakeholders, summary
+    
+    async def _extract_revision(self, report: str, report_hash: str, version: str):
+        """
+        Extract a revision of an earlier report from its changed sections only.
+        
+        Returns:
+            (merged stakeholders, recomputed company summary), or None when no earlier
+            version has an extraction or the changed sections could not be extracted
+        """
+        import asyncio
+        from agents.incremental_extraction import IncrementalExtractor
+        from utils.artifact_store import ARTIFACT_STORE
+        from utils.near_duplicates import NEAR_DUPLICATE_INDEX
+        
+        fingerprint = NEAR_DUPLICATE_INDEX.add(report_hash, report)
+        match = NEAR_DUPLICATE_INDEX.find(report_hash, fingerprint)
+        if match is None:
+            return None
+        previous = ARTIFACT_STORE.get(match['report_hash'], "extraction", version)
+        if previous is None:
+            return None
+        
+        self.log.info("Report is a revision of an earlier report (%.0f%% of sections unchanged)",
+                      match['shared'] * 100, category="stage", distance=match['distance'])
+        extractor = IncrementalExtractor(self.llm_client, log=self.log)
+        stakeholders, summary = await asyncio.gather(
+            asyncio.to_thread(extractor.extract, report_hash, fingerprint, match, previous['stakeholders']),
+            asyncio.to_thread(self._get_company_summary, report)
+        )
+        if stakeholders is None:
+            return None
+        return stakeholders, summary
+    
+    def _extraction_artifact_version(self) -> str:
+        """Artifact version of the extraction: every extraction prompt and the model."""
+        from prompts import orchestrator_prompts
+        from utils.artifact_store import artifact_version
+        
+        return artifact_version(
+            getattr(self.llm_client, 'model', ''),
+            orchestrator_prompts.STAKEHOLDER_EXTRACTION_PROMPT,
+            orchestrator_prompts.COMPANY_SUMMARY_PROMPT,
+            orchestrator_prompts.CHUNK_EXTRACTION_PROMPT,
+            orchestrator_prompts.COMPANY_SUMMARY_REDUCE_PROMPT,
+            orchestrator_prompts.COMBINED_EXTRACTION_PROMPT,
+            orchestrator_prompts.CANDIDATE_STAKEHOLDER_EXTRACTION_PROMPT
+        )
+    
+    async def _run_extraction(self, report: str) -> tuple:
+        """
+        Extract the stakeholders and the company summary of a report with the LLM.
+        
+        Reports longer than MAP_REDUCE_MIN_CHARS are split into overlapping chunks that
+        are extracted concurrently and merged (see agents/report_map_reduce.py), so the
+        latency depends on the chunk size rather than the report length. For shorter
+        reports a local pre-pass first looks for the lines that can name a stakeholder
+        (see agents/candidate_extraction.py); when those windows are a small part of the
+        report, stakeholders are extracted from the windows alone while the company summary
+        reads the full text in parallel. Otherwise the report is read once by a combined,
+        schema-validated extraction call; if that response is unusable the separate
+        _extract_stakeholders and _get_company_summary calls run side by side instead.
+        
+        Args:
+            report: Extracted report text
+        
+        Returns:
+            Tuple of (stakeholder list, company summary)
+        """
+        import asyncio
+        from agents.candidate_extraction import CANDIDATE_EXTRACTION_ENABLED, CandidateExtractor
+        from agents.combined_extraction import COMBINED_EXTRACTION_ENABLED, CombinedExtractor
+        from agents.report_map_reduce import MAP_REDUCE_MIN_CHARS, MapReduceExtractor
+        
+        if MAP_REDUCE_MIN_CHARS and len(report) > MAP_REDUCE_MIN_CHARS:
+            return await MapReduceExtractor(self.llm_client, log=self.log).extract(report)
+        if CANDIDATE_EXTRACTION_ENABLED:
+            extractor = CandidateExtractor(self.llm_client, log=self.log)
+            selection = extractor.select(report)
+            if selection is not None:
+                stakeholders, summary = await asyncio.gather(
+                    asyncio.to_thread(extractor.extract, report, selection),
+                    asyncio.to_thread(self._get_company_summary, report)
+                )
+                if stakeholders is not None:
+                    return stakeholders, summary
+                stakeholders = await asyncio.to_thread(self._extract_stakeholders, report)
+                return stakeholders, summary
+        if COMBINED_EXTRACTION_ENABLED:
+            combined = await asyncio.to_thread(CombinedExtractor(self.llm_client, log=self.log).extract, report)
+            if combined is not None:
+                return combined['stakeholders'], combined['company_summary']
+        stakeholders, summary = await asyncio.gather(
+            asyncio.to_thread(self._extract_stakeholders, report),
+            asyncio.to_thread(self._get_company_summary, report)
+        )
+        return stakeholders, summary
+    
+    def _dedupe_stakeholders(self, stakeholders: list) -> list:
+        """
+        Merge duplicate stakeholders (same person under several spellings) so that
+        each person gets exactly one email.
+        
+        Args:
+            stakeholders: List of stakeholder dictionaries
+        
+        Returns:
+            De-duplicated list in the original order
+        """
+        from utils.stakeholder_dedupe import dedupe_stakeholders
+        
+        unique, report = dedupe_stakeholders(stakeholders)
+        if report['merged']:
+            self.log.info("Merged %d duplicate stakeholders (%d -> %d): %s", report['merged'], report['input'],
+                          report['unique'], report['groups'], category="stage", merges_by_kind=report['merges_by_kind'])
+        return unique
+    
     def _load_report(self, report_input: dict) -> str:
         """
         Load report content from either file URL or text content.
@@ -43,18 +271,37 @@
             
         if report_input['type'] == 'file_url':
             # Download and extract text from PDF/HTML files
+            from utils.artifact_store import ARTIFACT_STORE, TEXT_EXTRACTION_VERSION, content_hash
+            from utils.document_model import store_document_model
+            from utils.near_duplicates import NEAR_DUPLICATE_INDEX
+            from utils.pdf_extractor import (
+                download_file, extract_document_from_html_bytes, extract_document_from_pdf_bytes
+            )
+            
             url = report_input['url']
-            print(f"[{self.name}] Downloading and extracting text from: {url}")
+            self.log.info("Downloading and extracting text from: %s", url)
             
             try:
-                if url.lower().endswith('.pdf'):
-                    text_content = extract_text_from_pdf_url(url)
-                elif url.lower().endswith(('.html', '.htm')):
-                    text_content = extract_text_from_html_url(url)
+                content = download_file(url)
+                file_hash = content_hash(content)
+                # The same file uploaded again reuses the text extracted the first time
+                text_content = ARTIFACT_STORE.get(file_hash, "text", TEXT_EXTRACTION_VERSION)
+                if text_content is not None:
+                    self.log.info("Reusing text extracted from an identical file", category="stage")
                 else:
-                    # Try PDF extraction as default
-                    text_content = extract_text_from_pdf_url(url)
+                    if url.lower().endswith(('.html', '.htm')):
+                        document = extract_document_from_html_bytes(content)
+                    else:
+                        # Try PDF extraction as default
+                        document = extract_document_from_pdf_bytes(content)
+                    text_content = document.text
+                    ARTIFACT_STORE.put(file_hash, "text", TEXT_EXTRACTION_VERSION, text_content)
+                    # Sections and pages are indexed once here; later stages load them by text hash
+                    store_document_model(document)
+                    self.log.info("Indexed %d sections, %d pages and %d tables", len(document.sections),
+                                  document.page_count, len(document.tables), category="stage")
+                    NEAR_DUPLICATE_INDEX.add(content_hash(text_content), text_content)
                 
-                print(f"[{self.name}] Extracted {len(text_content)} characters from file")
+                self.log.info("Extracted %d characters from file", len(text_content))
                 self.report_content = text_content
                 return text_content
\ No newline at end of file
@@ -35,3 +35,46 @@ Focus on:
 - Market position and competitive landscape
 
 Provide a 2-3 paragraph summary that captures the essential information about this company. Write in a clear, professional tone suitable for use in business communications."""
+
+CHUNK_EXTRACTION_PROMPT = """You are an expert research analyst. Below is part {chunk_number} of {chunk_count} of a research report about a customer/company. Neighbouring parts overlap slightly.
+
+From THIS PART ONLY, extract:
+1. Every stakeholder explicitly named in the text, with their job title/role and 1-2 sentences of key responsibilities or outreach-relevant information. Extract ONLY names written in the text. DO NOT invent names.
+2. Up to 8 short facts about the company: name and industry, key products/services, strategic priorities, recent developments or challenges, market position.
+
+Report part:
+{report_chunk}
+
+Return ONLY a JSON object with no markdown formatting:
+{{"stakeholders": [{{"name": "Full Name", "title": "Job Title", "details": "Key information..."}}], "facts": ["fact 1", "fact 2"]}}
+
+Use empty lists when the part contains no stakeholders or facts."""
+
+COMPANY_SUMMARY_REDUCE_PROMPT = """You are an expert research analyst. The facts below were collected from every part of a long research report about a customer/company.
+
+Facts:
+{facts}
+
+Write a 2-3 paragraph summary of the company covering its name and industry, key products/services, strategic priorities, recent developments or challenges, and market position. Use only the facts above. Write in a clear, professional tone suitable for use in business communications."""
+
+COMBINED_EXTRACTION_PROMPT = """You are an expert research analyst. Your task is to read a research report about a customer/company once and extract both the key stakeholders and a company summary for email outreach.
+
+Research Report:
+{report}
+
+Stakeholders: for every person explicitly named in the report, extract their full name, job title/role and 2-3 sentences of key responsibilities and outreach-relevant information. Extract ONLY names written in the report. DO NOT invent names.
+
+Company summary: a 2-3 paragraph summary covering the company name and industry, key products/services, strategic priorities, recent developments or challenges, and market position, in a clear, professional tone.
+
+Return ONLY a JSON object with no markdown formatting or additional text:
+{{"stakeholders": [{{"name": "Full Name", "title": "Job Title", "details": "Key information about this person and their role..."}}], "company_summary": "Summary paragraphs..."}}"""
+
+CANDIDATE_STAKEHOLDER_EXTRACTION_PROMPT = """You are an expert research analyst. The excerpts below are the passages of a research report about a customer/company that mention people, titles or credentials. Omitted text is marked [...].
+
+Report excerpts:
+{candidate_windows}
+
+For every stakeholder explicitly named in the excerpts, extract their full name, job title/role and 2-3 sentences of key responsibilities and outreach-relevant information. Extract ONLY names written in the excerpts. DO NOT invent names. Skip authors of cited references.
+
+Return ONLY a JSON array with no markdown formatting or additional text:
+[{{"name": "Full Name", "title": "Job Title", "details": "Key information about this person and their role..."}}]"""
@@ -7,8 +7,11 @@ from io import BytesIO
 import subprocess
 import tempfile
 import os
+import re
 from bs4 import BeautifulSoup
 
+from utils.document_model import DocumentModel
+
 
 def _is_garbled_text(text: str) -> bool:
     """
@@ -32,6 +35,24 @@ def _is_garbled_text(text: str) -> bool:
     return special_chars > 100  # More than 10% special chars in first 1000 chars
 
 
+def download_file(url: str) -> bytes:
+    """
+    Download a report file.
+    
+    Args:
+        url: URL to the file
+        
+    Returns:
+        Raw file content
+        
+    Raises:
+        requests.RequestException: If the download fails
+    """
+    response = requests.get(url, timeout=30)
+    response.raise_for_status()
+    return response.content
+
+
 def extract_text_from_pdf_url(url: str) -> str:
     """
     Download a PDF from a URL and extract all text content.
@@ -47,31 +68,72 @@ def extract_text_from_pdf_url(url: str) -> str:
         Exception: If download or extraction fails
     """
     try:
-        # Download the PDF
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
+        content = download_file(url)
+    except Exception as e:
+        raise Exception(f"Failed to extract text from PDF: {str(e)}")
+    return extract_text_from_pdf_bytes(content)
+
+
+def extract_text_from_pdf_bytes(content: bytes) -> str:
+    """
+    Extract all text content from a downloaded PDF.
+    Uses multiple extraction methods and falls back if text is garbled.
+    
+    Args:
+        content: Raw PDF file content
+        
+    Returns:
+        Extracted text content as a string
+        
+    Raises:
+        Exception: If extraction fails
+    """
+    return extract_document_from_pdf_bytes(content).text
+
+
+def extract_document_from_pdf_bytes(content: bytes) -> DocumentModel:
+    """
+    Extract the text of a downloaded PDF together with its document model.
+    
+    The text is the same as extract_text_from_pdf_bytes returns; the model adds the
+    page boundaries (pypdf pages, or pdftotext form feeds), headings, sections and tables.
+    
+    Args:
+        content: Raw PDF file content
         
+    Returns:
+        DocumentModel whose .text is the extracted text
+        
+    Raises:
+        Exception: If extraction fails
+    """
+    try:
         # Save to temporary file for pdftotext
         with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
-            tmp_file.write(response.content)
+            tmp_file.write(content)
             tmp_path = tmp_file.name
         
         try:
             # Method 1: Try pypdf first
-            pdf_file = BytesIO(response.content)
+            pdf_file = BytesIO(content)
             reader = PdfReader(pdf_file)
             
             text_content = []
+            page_starts = []
+            offset = 0
             for page in reader.pages:
                 text = page.extract_text()
+                # Pages are joined with a blank line; a page without text starts where the next one does
+                page_starts.append(offset + (2 if text_content else 0))
                 if text:
                     text_content.append(text)
+                    offset = page_starts[-1] + len(text)
             
             full_text = "\n\n".join(text_content)
             
             # Check if text is garbled
             if not _is_garbled_text(full_text) and full_text.strip():
-                return full_text
+                return DocumentModel.build(full_text, page_starts=page_starts)
             
             # Method 2: Fall back to pdftotext command-line tool
             print("[PDF Extractor] pypdf produced garbled text, trying pdftotext...")
@@ -84,12 +146,13 @@ def extract_text_from_pdf_url(url: str) -> str:
             
             if result.returncode == 0 and result.stdout.strip():
                 # pdftotext output may still have some encoding issues but is usually better
-                return result.stdout
+                # (its form feeds mark the pages)
+                return DocumentModel.build(result.stdout)
             
             # If both methods fail, return the pypdf output anyway
             if full_text.strip():
                 print("[PDF Extractor] WARNING: Text may be garbled")
-                return full_text
+                return DocumentModel.build(full_text, page_starts=page_starts)
             
             raise ValueError("No text content extracted from PDF")
             
@@ -119,24 +182,61 @@ def extract_text_from_html_url(url: str) -> str:
         Exception: If download fails
     """
     try:
-        from bs4 import BeautifulSoup
+        content = download_file(url)
+    except Exception as e:
+        raise Exception(f"Failed to download/parse HTML: {str(e)}")
+    return extract_text_from_html_bytes(content)
+
+
+def extract_text_from_html_bytes(content: bytes) -> str:
+    """
+    Extract clean text content from downloaded HTML.
+    Uses BeautifulSoup to strip HTML tags and extract readable text.
+    
+    Args:
+        content: Raw HTML file content
         
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
+    Returns:
+        Clean text content extracted from HTML
         
+    Raises:
+        Exception: If parsing fails
+    """
+    return extract_document_from_html_bytes(content).text
+
+
+def extract_document_from_html_bytes(content: bytes) -> DocumentModel:
+    """
+    Extract the text of downloaded HTML together with its document model.
+    
+    The text is the same as extract_text_from_html_bytes returns; the <h1>-<h6> elements
+    mark the headings of the model.
+    
+    Args:
+        content: Raw HTML file content
+        
+    Returns:
+        DocumentModel whose .text is the extracted text
+        
+    Raises:
+        Exception: If parsing fails
+    """
+    try:
         # Parse HTML and extract text
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(content, 'html.parser')
         
         # Remove script and style elements
         for script in soup(["script", "style"]):
             script.decompose()
         
+        headings = [h.get_text(" ", strip=True) for h in soup.find_all(re.compile(r"^h[1-6]$"))]
+        
         # Get text and clean up whitespace
         text = soup.get_text()
         lines = (line.strip() for line in text.splitlines())
         chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
         text = '\n'.join(chunk for chunk in chunks if chunk)
         
-        return text
+        return DocumentModel.build(text, heading_hints=headings)
     except Exception as e:
-        raise Exception(f"Failed to download/parse HTML: {str(e)}")
+        raise Exception(f"Failed to parse HTML: {str(e)}")
@@ -0,0 +1,342 @@
+"""
+Stakeholder Pipeline
+Moves each stakeholder through context → generate → evaluate → refine independently
+
+Preparing every task before any EmailWriterAgent starts makes the slowest context
+extraction delay every email. In the pipeline each stakeholder advances as soon as its
+own inputs are ready; a per-stage concurrency limit keeps any one stage from flooding
+the LLM provider, and the blocking LLM calls run in worker threads so stakeholders
+really overlap.
+
+Scheduling: every stage has its own concurrency limit and a FIFO queue of callers
+waiting for a slot. Stakeholders are admitted into the pipeline only while the
+generation stage can hold them (running plus queued), so context extraction never
+runs far ahead of the writers and large rosters wait in the intake queue instead of
+all starting at once. Queue depths are tracked per stage for metrics.
+"""
+import asyncio
+import os
+import time
+
+from utils.deadlines import Deadline, DeadlineExceeded, stakeholder_timeout, workflow_timeout
+from utils.structured_logger import get_logger
+
+STAGES = ("context", "generate", "evaluate", "refine")
+
+# Default concurrent calls per stage; generation matches the documented 20 concurrent emails
+DEFAULT_STAGE_LIMITS = {"context": 4, "generate": 20, "evaluate": 20, "refine": 20}
+
+
+def _parse_limits(spec: str) -> dict:
+    """Parse "stage=limit,..." (e.g. "generate=4,refine=2")."""
+    limits = {}
+    for item in (spec or "").split(','):
+        if '=' not in item:
+            continue
+        stage, limit = item.split('=', 1)
+        try:
+            limits[stage.strip()] = max(1, int(limit))
+        except ValueError:
+            continue
+    return limits
+
+
+class StageLimiter:
+    """
+    Per-stage concurrency limits and wait queues for blocking work run off the event loop.
+
+    Callers beyond a stage's limit wait in that stage's queue (first come, first served).
+    Each stage also has a queue bound; capacity(stage) (limit plus queue bound) is how many
+    stakeholders the pipeline lets in ahead of that stage, which is what applies
+    backpressure to the stages before it. Semaphores are created lazily so a limiter can
+    be built outside a running loop.
+    """
+
+    def __init__(self, limits: dict = None, default_limit: int = 4, queue_limits: dict = None):
+        """
+        Args:
+            limits: Concurrent calls per stage
+            default_limit: Concurrent calls for stages without an explicit limit
+            queue_limits: Queue bound per stage (defaults to the stage's limit)
+        """
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self.queue_limits = dict(queue_limits or {})
+        self._semaphores = {}
+        self.stats = {stage: self._empty_stats() for stage in STAGES}
+        self._in_flight = {}
+        self._queued = {}
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build limits from the environment.
+
+        PIPELINE_CONCURRENCY ("generate=20,context=4") overrides DEFAULT_STAGE_LIMITS,
+        PIPELINE_DEFAULT_CONCURRENCY applies to other stages and PIPELINE_QUEUE_LIMITS
+        sets queue bounds in the same format.
+        """
+        limits = dict(DEFAULT_STAGE_LIMITS)
+        limits.update(_parse_limits(os.getenv('PIPELINE_CONCURRENCY')))
+        return cls(
+            limits=limits,
+            default_limit=int(os.getenv('PIPELINE_DEFAULT_CONCURRENCY', '4')),
+            queue_limits=_parse_limits(os.getenv('PIPELINE_QUEUE_LIMITS'))
+        )
+
+    @staticmethod
+    def _empty_stats() -> dict:
+        return {"calls": 0, "seconds": 0.0, "queue_seconds": 0.0, "max_in_flight": 0, "max_queue_depth": 0}
+
+    def limit(self, stage: str) -> int:
+        return self.limits.get(stage, self.default_limit)
+
+    def queue_limit(self, stage: str) -> int:
+        return self.queue_limits.get(stage, self.limit(stage))
+
+    def capacity(self, stage: str) -> int:
+        """Calls a stage can hold at once, running plus queued."""
+        return self.limit(stage) + self.queue_limit(stage)
+
+    def queue_depth(self, stage: str) -> int:
+        """Callers currently waiting for a slot in a stage."""
+        return self._queued.get(stage, 0)
+
+    def in_flight(self, stage: str) -> int:
+        return self._in_flight.get(stage, 0)
+
+    def snapshot(self) -> dict:
+        """Current and peak load per stage, for metrics."""
+        return {
+            stage: dict(stats, limit=self.limit(stage), in_flight=self.in_flight(stage),
+                        queue_depth=self.queue_depth(stage))
+            for stage, stats in self.stats.items()
+        }
+
+    def _semaphore(self, stage: str) -> asyncio.Semaphore:
+        if stage not in self._semaphores:
+            self._semaphores[stage] = asyncio.Semaphore(self.limit(stage))
+        return self._semaphores[stage]
+
+    async def run(self, stage: str, func, *args):
+        """Run a blocking callable in a worker thread once the stage has a free slot."""
+        stats = self.stats.setdefault(stage, self._empty_stats())
+        semaphore = self._semaphore(stage)
+        if semaphore.locked():
+            self._queued[stage] = self._queued.get(stage, 0) + 1
+            stats["max_queue_depth"] = max(stats["max_queue_depth"], self._queued[stage])
+            queued_at = time.monotonic()
+            try:
+                await semaphore.acquire()
+            finally:
+                self._queued[stage] -= 1
+            stats["queue_seconds"] += time.monotonic() - queued_at
+        else:
+            await semaphore.acquire()
+
+        self._in_flight[stage] = self._in_flight.get(stage, 0) + 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], self._in_flight[stage])
+        started = time.monotonic()
+
+        def finished(worker):
+            self._in_flight[stage] -= 1
+            stats["calls"] += 1
+            stats["seconds"] += time.monotonic() - started
+            semaphore.release()
+            if not worker.cancelled():
+                worker.exception()  # Retrieve it so an abandoned call's failure is not reported as unhandled
+
+        # A cancelled caller cannot stop the thread, so the slot is held until the thread returns
+        worker = asyncio.ensure_future(asyncio.to_thread(func, *args))
+        worker.add_done_callback(finished)
+        return await asyncio.shield(worker)
+
+
+class StakeholderPipeline:
+    """
+    Runs every stakeholder through its own chain of stages concurrently.
+
+    Usage:
+        pipeline = StakeholderPipeline(prepare_task, lambda i: EmailWriterAgent(f"EmailWriter-{i}"))
+        emails = await pipeline.run(stakeholders)
+
+        async for email in pipeline.stream(stakeholders):
+            save(email)
+    """
+
+    def __init__(self, prepare_task, writer_factory, limiter: StageLimiter = None, log=None,
+                 admission_stage: str = "generate", max_active: int = None, checkpoints=None,
+                 stakeholder_seconds: float = None, workflow_seconds: float = None):
+        """
+        Args:
+            prepare_task: Async callable (index, stakeholder, limiter) -> task dictionary
+            writer_factory: Callable (index) -> EmailWriterAgent
+            limiter: Stage limits shared by all stakeholders (defaults to StageLimiter.from_env())
+            log: Logger (defaults to a "Pipeline" logger)
+            admission_stage: Stage whose capacity bounds how many stakeholders are in flight
+            max_active: Explicit bound on stakeholders in flight (overrides admission_stage)
+            checkpoints: WorkflowCheckpoint to resume from and record stage outputs in
+            stakeholder_seconds: Time limit per stakeholder (defaults to STAKEHOLDER_DEADLINE_SECONDS)
+            workflow_seconds: Time limit for the whole roster (defaults to WORKFLOW_DEADLINE_SECONDS)
+        """
+        self.prepare_task = prepare_task
+        self.writer_factory = writer_factory
+        self.limiter = limiter or StageLimiter.from_env()
+        self.log = log or get_logger("Pipeline")
+        self.admission_stage = admission_stage
+        self.max_active = max_active
+        self.checkpoints = checkpoints
+        self.stakeholder_seconds = stakeholder_timeout() if stakeholder_seconds is None else stakeholder_seconds
+        self.workflow_seconds = workflow_timeout() if workflow_seconds is None else workflow_seconds
+        self.deadline = None
+        self.started_at = None
+        self.first_result_seconds = None
+        self.max_intake_depth = 0
+
+    @property
+    def admission_window(self) -> int:
+        """Stakeholders allowed in flight at once; the rest wait in the intake queue."""
+        return max(1, self.max_active or self.limiter.capacity(self.admission_stage))
+
+    async def run(self, stakeholders: list) -> list:
+        """
+        Process all stakeholders.
+
+        Returns:
+            One result per stakeholder, in input order
+        """
+        results = [None] * len(stakeholders)
+        async for index, result in self._stream_indexed(stakeholders):
+            results[index] = result
+        return results
+
+    async def stream(self, stakeholders: list):
+        """
+        Process all stakeholders, yielding each result as soon as it is finished.
+
+        Results (emails or error results) arrive in completion order and carry a
+        'stakeholder_id' (the stakeholder's 'id', or its roster position). Finished
+        results are not retained, so large batches can be persisted incrementally.
+        If the consumer stops early, the remaining stakeholders are cancelled.
+        """
+        async for _, result in self._stream_indexed(stakeholders):
+            yield result
+
+    async def _stream_indexed(self, stakeholders: list):
+        self.started_at = time.monotonic()
+        self.first_result_seconds = None
+        self.max_intake_depth = 0
+        self.deadline = Deadline(self.workflow_seconds)
+        intake = list(enumerate(stakeholders))
+        intake.reverse()
+        window = self.admission_window
+        pending = set()
+        try:
+            while intake or pending:
+                # Admit stakeholders only while the admission stage can take them
+                while intake and len(pending) < window:
+                    index, stakeholder = intake.pop()
+                    pending.add(asyncio.ensure_future(self._process_indexed(index, stakeholder)))
+                self.max_intake_depth = max(self.max_intake_depth, len(intake))
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for finished in done:
+                    yield finished.result()
+        finally:
+            self.deadline.cancel("pipeline stopped")
+            for unfinished in pending:
+                unfinished.cancel()
+        self.log.info("Pipeline finished %d stakeholders in %.1fs (first email after %.1fs)",
+                      len(stakeholders), time.monotonic() - self.started_at, self.first_result_seconds or 0.0,
+                      category="stage", max_intake_depth=self.max_intake_depth,
+                      queue_peaks={stage: stats["max_queue_depth"] for stage, stats in self.limiter.stats.items()})
+
+    async def _process_indexed(self, index: int, stakeholder: dict) -> tuple:
+        result = await self.process(index, stakeholder)
+        result["stakeholder_id"] = stakeholder.get('id', index)
+        return index, result
+
+    async def process(self, index: int, stakeholder: dict) -> dict:
+        """
+        Run one stakeholder through every stage within its deadline.
+
+        Failures become error results. When the stakeholder or workflow deadline passes,
+        the writer is cancelled and its best draft so far is returned (status "partial"),
+        or a "timed_out" result if there is none. The same happens when a step shared
+        with other stakeholders is cancelled; only cancelling the pipeline itself raises.
+        """
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+        if self.deadline is None:
+            self.deadline = Deadline(self.workflow_seconds)
+        checkpoint = self.checkpoints.for_stakeholder(stakeholder, index) if self.checkpoints is not None else None
+        if checkpoint is not None and checkpoint.get("final") is not None:
+            self.log.debug("Using checkpointed email for %s", stakeholder.get('name', index), category="stage")
+            return dict(checkpoint.get("final"))
+
+        deadline = Deadline(self.stakeholder_seconds, parent=self.deadline)
+        task = None
+        writer = None
+        try:
+            deadline.check()
+            task = checkpoint.get("context") if checkpoint is not None else None
+            if task is None:
+                task = await asyncio.wait_for(self.prepare_task(index, stakeholder, self.limiter),
+                                              timeout=deadline.remaining())
+                if checkpoint is not None:
+                    checkpoint.put("context", task)
+            writer = self.writer_factory(index)
+            writer.stage_limiter = self.limiter
+            writer.checkpoint = checkpoint
+            writer.deadline = deadline
+            result = await asyncio.wait_for(writer.run(task), timeout=deadline.remaining())
+            result.setdefault("status", "complete")
+            if checkpoint is not None and result["status"] == "complete":
+                checkpoint.put("final", result)
+        except (asyncio.TimeoutError, DeadlineExceeded):
+            scope = "workflow" if self.deadline.expired else "stakeholder"
+            deadline.cancel(f"{scope} deadline exceeded")
+            self.log.warning("%s deadline exceeded for %s", scope.capitalize(), stakeholder.get('name', index),
+                             category="stage")
+            result = self._timeout_result(stakeholder, task, writer, deadline.reason)
+        except asyncio.CancelledError:
+            current = asyncio.current_task()
+            if self.deadline.cancelled or (current is not None and current.cancelling()):
+                raise
+            # A step shared with other stakeholders was cancelled by another stakeholder's deadline
+            deadline.cancel("shared step cancelled")
+            self.log.warning("Shared step cancelled for %s", stakeholder.get('name', index), category="stage")
+            result = self._timeout_result(stakeholder, task, writer, deadline.reason)
+        except Exception as e:
+            self.log.error("Pipeline failed for %s: %s", stakeholder.get('name', index), e)
+            result = self._error_result(stakeholder, task, str(e))
+
+        if self.first_result_seconds is None:
+            self.first_result_seconds = time.monotonic() - self.started_at
+        return result
+
+    def _timeout_result(self, stakeholder: dict, task: dict, writer, reason: str) -> dict:
+        """Best available draft of a stakeholder whose deadline passed, else a timed-out result."""
+        partial = writer.partial_result(task, reason) if writer is not None else None
+        if partial is not None:
+            return partial
+        result = self._error_result(stakeholder, task, reason)
+        result["status"] = "timed_out"
+        return result
+
+    @staticmethod
+    def _error_result(stakeholder: dict, task: dict, error_message: str) -> dict:
+        task = task or {}
+        return {
+            "stakeholder_name": task.get('stakeholder_name', stakeholder.get('name', '')),
+            "stakeholder_title": task.get('stakeholder_title', stakeholder.get('title', '')),
+            "email_subject": "ERROR",
+            "email_body": f"Failed to generate email: {error_message}",
+            "quality_score": 0.0,
+            "reflection_notes": error_message,
+            "generation_mode": task.get('generation_mode', 'unknown'),
+            "status": "failed"
+        }
+
+
+# Set STAKEHOLDER_PIPELINE=0 to prepare every task before the writers start
+PIPELINE_ENABLED = os.getenv('STAKEHOLDER_PIPELINE', '1') != '0'
@@ -0,0 +1,71 @@
+"""
+Context Precompute Bridge
+Background entry point the webapp starts after stakeholder extraction
+
+Reads {"workflowId", "reportInput", "stakeholders"} as JSON from stdin and stores the
+relevant context of every stakeholder (see agents/context_precompute.py), so the
+generate_emails action of bridge.py starts from warm context. The process lowers its own
+CPU priority by CONTEXT_PRECOMPUTE_NICE (default 10). SIGTERM or SIGINT (sent when generation starts or the workflow is
+abandoned) stops it before its next LLM call; a second signal stops it at once. The
+stats are printed as JSON on stdout.
+"""
+import asyncio
+import json
+import os
+import signal
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from agents.context_precompute import (
+    ContextPrecomputer, precompute_concurrency, precompute_enabled, precompute_timeout
+)
+from agents.orchestrator import OrchestratorAgent
+from agents.task_planner import TaskPlannerAgent
+from utils import structured_logger
+
+
+async def precompute(input_data: dict) -> dict:
+    orchestrator = OrchestratorAgent()
+    precomputer = ContextPrecomputer(TaskPlannerAgent(), concurrency=precompute_concurrency(),
+                                     deadline_seconds=precompute_timeout(), log=orchestrator.log)
+    task = asyncio.current_task()
+    loop = asyncio.get_running_loop()
+
+    def on_signal(signum):
+        if precomputer.stopped:
+            task.cancel()
+        else:
+            precomputer.cancel(f"stopped by {signal.Signals(signum).name}")
+
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, on_signal, signum)
+
+    try:
+        stats = await orchestrator.precompute_contexts(input_data['reportInput'], input_data['stakeholders'],
+                                                       precomputer=precomputer)
+    except asyncio.CancelledError:
+        return {"success": True, "stopped": precomputer.deadline.reason or "cancelled"}
+    if stats is None:
+        return {"success": False, "error": "Failed to load report"}
+    return dict(stats, success=True)
+
+
+def main() -> int:
+    input_data = json.loads(sys.stdin.read())
+    if not precompute_enabled():
+        print(json.dumps({"success": True, "skipped": True}))
+        return 0
+    try:
+        os.nice(int(os.getenv('CONTEXT_PRECOMPUTE_NICE', '10')))
+    except (AttributeError, OSError):
+        pass
+
+    result = asyncio.run(precompute(input_data))
+    structured_logger.flush()
+    print(json.dumps(result))
+    return 0 if result.get('success') else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""
+Reflection Controls for the Email Writer Agent
+Policies that decide how much work the Generate → Evaluate → Refine loop does
+"""
+import json
+import os
+import threading
+import time
+
+
+class SpeculativeRefinementPolicy:
+    """
+    Decides whether a generic refinement should be started in parallel with evaluation.
+
+    A speculative refinement only pays off when the draft fails the quality threshold
+    by a small margin: the generic rewrite is then accepted as-is and the targeted
+    refinement round trip is skipped. Drafts that pass waste the speculative tokens,
+    and drafts that fail badly still need targeted feedback.
+
+    Because acceptance depends only on the evaluation score, every evaluated email
+    updates the acceptance rate - whether or not it was speculated on - so the
+    statistic stays current even while speculation is switched off.
+    """
+
+    def __init__(self, min_acceptance_rate: float = 0.35, acceptance_margin: float = 1.5,
+                 prior_accepted: float = 1.0, prior_observed: float = 2.0, stats_path: str = None):
+        """
+        Args:
+            min_acceptance_rate: Minimum share of drafts whose speculative result would be
+                                 used before speculation activates (tokens vs latency trade-off)
+            acceptance_margin: How far below the threshold a score may fall and still use
+                               the generic refinement instead of a targeted one
+            prior_accepted: Pseudo-count of accepted speculations (smooths early decisions)
+            prior_observed: Pseudo-count of observed evaluations
+            stats_path: Optional JSON file used to keep statistics across processes
+        """
+        self.min_acceptance_rate = min_acceptance_rate
+        self.acceptance_margin = acceptance_margin
+        self.prior_accepted = prior_accepted
+        self.prior_observed = prior_observed
+        self.stats_path = stats_path
+        self.observed = 0
+        self.accepted = 0
+        self.speculated = 0
+        self.speculation_used = 0
+        self._lock = threading.Lock()
+        self._load_stats()
+
+    @property
+    def acceptance_rate(self) -> float:
+        """Smoothed share of evaluated drafts whose speculative refinement would be used."""
+        return (self.accepted + self.prior_accepted) / (self.observed + self.prior_observed)
+
+    def should_speculate(self) -> bool:
+        """Return True when expected latency savings justify the extra refinement tokens."""
+        return self.acceptance_rate >= self.min_acceptance_rate
+
+    def accepts(self, score: float, threshold: float) -> bool:
+        """Return True when a failing score is close enough to use the speculative result."""
+        return threshold - self.acceptance_margin <= score < threshold
+
+    def record_evaluation(self, score: float, threshold: float):
+        """Update the acceptance statistic with a new evaluation score."""
+        with self._lock:
+            self.observed += 1
+            if self.accepts(score, threshold):
+                self.accepted += 1
+        self._save_stats()
+
+    def record_speculation(self, used: bool):
+        """Track how many speculative refinements were started and actually used."""
+        with self._lock:
+            self.speculated += 1
+            if used:
+                self.speculation_used += 1
+        self._save_stats()
+
+    def get_stats(self) -> dict:
+        """Return a snapshot of the policy statistics."""
+        return {
+            "observed": self.observed,
+            "accepted": self.accepted,
+            "acceptance_rate": round(self.acceptance_rate, 3),
+            "speculated": self.speculated,
+            "speculation_used": self.speculation_used,
+            "active": self.should_speculate()
+        }
+
+    def _load_stats(self):
+        """Load persisted statistics, ignoring missing or unreadable files."""
+        if not self.stats_path or not os.path.exists(self.stats_path):
+            return
+        try:
+            with open(self.stats_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.observed = int(data.get('observed', 0))
+            self.accepted = int(data.get('accepted', 0))
+            self.speculated = int(data.get('speculated', 0))
+            self.speculation_used = int(data.get('speculation_used', 0))
+        except (OSError, ValueError):
+            pass
+
+    def _save_stats(self):
+        """Persist statistics when a stats file is configured."""
+        if not self.stats_path:
+            return
+        with self._lock:
+            data = {
+                "observed": self.observed,
+                "accepted": self.accepted,
+                "speculated": self.speculated,
+                "speculation_used": self.speculation_used
+            }
+        try:
+            with open(self.stats_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+        except OSError:
+            pass
+
+
+# Shared by every EmailWriterAgent in the process so the statistic spans stakeholders
+SPECULATION_POLICY = SpeculativeRefinementPolicy(
+    stats_path=os.getenv('SPECULATION_STATS_PATH')
+)
+
+
+class ReflectionLoopController:
+    """
+    Budgeted controller for the Evaluate → Refine loop.
+
+    The loop keeps refining while the score is below `target_score` and stops at the
+    first of: `max_iterations` refinements, the wall-clock or token budget (including
+    the projected cost of one more round), or a plateau where a refinement improved
+    the score by less than `min_improvement`.
+
+    Every evaluation is recorded with its score delta so the number of rounds worth
+    their latency can be tuned from real traces.
+    """
+
+    def __init__(self, max_iterations: int = 1, target_score: float = 7.0,
+                 time_budget_seconds: float = None, token_budget: int = None,
+                 min_improvement: float = 0.3, evaluate_final: bool = None, token_source=None):
+        """
+        Args:
+            max_iterations: Maximum number of refinements per email
+            target_score: Score at which the email is accepted
+            time_budget_seconds: Per-email wall-clock budget (None for unlimited)
+            token_budget: Per-email estimated token budget (None for unlimited)
+            min_improvement: Smallest score gain that counts as progress
+            evaluate_final: Re-evaluate the last permitted refinement; defaults to True
+                            only for multi-round loops (single-round keeps one evaluation)
+            token_source: Callable returning the tokens used so far for this email
+        """
+        self.max_iterations = max_iterations
+        self.target_score = target_score
+        self.time_budget_seconds = time_budget_seconds
+        self.token_budget = token_budget
+        self.min_improvement = min_improvement
+        self.evaluate_final = max_iterations > 1 if evaluate_final is None else evaluate_final
+        self.token_source = token_source or (lambda: 0)
+        self.started_at = time.monotonic()
+        self.iterations = 0
+        self.history = []
+        self.stop_reason = None
+
+    @classmethod
+    def from_config(cls, config: dict, target_score: float, token_source=None):
+        """Build a controller from a mode_config['reflection'] style dictionary."""
+        config = config or {}
+        return cls(
+            max_iterations=int(config.get('max_iterations', 1)),
+            target_score=float(config.get('target_score', target_score)),
+            time_budget_seconds=config.get('time_budget_seconds'),
+            token_budget=config.get('token_budget'),
+            min_improvement=float(config.get('min_improvement', 0.3)),
+            evaluate_final=config.get('evaluate_final'),
+            token_source=token_source
+        )
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def record_evaluation(self, score: float):
+        """Record an evaluation score and its delta against the previous one."""
+        previous = self.history[-1]['score'] if self.history else None
+        self.history.append({
+            "iteration": self.iterations,
+            "score": score,
+            "delta": None if previous is None else round(score - previous, 2),
+            "elapsed_seconds": round(self.elapsed, 2),
+            "tokens": self.token_source()
+        })
+
+    def record_refinement(self):
+        """Count a completed refinement."""
+        self.iterations += 1
+
+    def should_refine(self, score: float) -> bool:
+        """Return True if another refinement round is allowed and worthwhile."""
+        if score >= self.target_score:
+            return self._stop("target_reached")
+        if self.iterations >= self.max_iterations:
+            return self._stop("max_iterations")
+        if self._plateaued():
+            return self._stop("plateau")
+        if self._over_time_budget():
+            return self._stop("time_budget")
+        if self._over_token_budget():
+            return self._stop("token_budget")
+        return True
+
+    def should_evaluate_refinement(self) -> bool:
+        """Return True if the latest refinement should be scored."""
+        if self.iterations < self.max_iterations:
+            return True
+        if not self.evaluate_final:
+            self._stop("max_iterations")
+        return self.evaluate_final
+
+    def stop(self, reason: str):
+        """Record an externally determined stop (e.g. a failed LLM call)."""
+        self._stop(reason)
+
+    def get_trace(self) -> dict:
+        """Summarize the loop for output metadata and tuning."""
+        return {
+            "iterations": self.iterations,
+            "stop_reason": self.stop_reason,
+            "elapsed_seconds": round(self.elapsed, 2),
+            "tokens": self.token_source(),
+            "evaluations": self.history
+        }
+
+    def _stop(self, reason: str) -> bool:
+        if self.stop_reason is None:
+            self.stop_reason = reason
+        return False
+
+    def _plateaued(self) -> bool:
+        if len(self.history) < 2:
+            return False
+        return self.history[-1]['delta'] < self.min_improvement
+
+    def _round_cost(self):
+        """Average (seconds, tokens) of a refine + evaluate round so far."""
+        if self.iterations == 0:
+            return 0.0, 0
+        return self.elapsed / (self.iterations + 1), self.token_source() / (self.iterations + 1)
+
+    def _over_time_budget(self) -> bool:
+        if self.time_budget_seconds is None:
+            return False
+        round_seconds, _ = self._round_cost()
+        return self.elapsed + round_seconds >= self.time_budget_seconds
+
+    def _over_token_budget(self) -> bool:
+        if self.token_budget is None:
+            return False
+        _, round_tokens = self._round_cost()
+        return self.token_source() + round_tokens >= self.token_budget
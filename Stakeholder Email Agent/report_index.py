@@ -0,0 +1,241 @@
+"""
+Report Index
+Chunks a research report once and retrieves stakeholder-relevant passages locally with BM25
+
+Context extraction used to send the whole report to the LLM once per stakeholder. The
+report is now split into paragraph-aligned passages and indexed in memory; each
+stakeholder's name, title and details form the query, and only the top passages are
+sent to CONTEXT_EXTRACTION_PROMPT (or returned directly in "local" mode).
+"""
+import math
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+
+from utils.section_cache import report_fingerprint
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by for from has have he her his in is it its of on or
+our she that the their them they this to was were will with who whom you your
+""".split())
+
+# Credentials and honorifics in stakeholder names carry no retrieval signal
+NAME_AFFIXES = frozenset("dr mr mrs ms md do rn bsn msn dnp phd mba mph mha facep fache jr sr".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:['\-][a-z0-9]+)*")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def tokenize(text: str) -> list:
+    """Lowercase word tokens without stopwords or single characters."""
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def chunk_report(report: str, max_chars: int = 800) -> list:
+    """
+    Split a report into passages of roughly `max_chars`.
+
+    Paragraphs (blank-line separated) are merged until the limit is reached; longer
+    paragraphs are split on sentence boundaries so no passage cuts a sentence.
+
+    Args:
+        report: Full report text
+        max_chars: Target passage size in characters
+
+    Returns:
+        List of passage strings in document order
+    """
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", report or ""):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        current = ""
+        for sentence in _SENTENCE_RE.split(paragraph):
+            if current and len(current) + len(sentence) + 1 > max_chars:
+                pieces.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}".strip()
+        if current:
+            pieces.append(current)
+
+    chunks = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) + 2 > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def build_stakeholder_query(stakeholder: dict, name_weight: float = 2.0) -> dict:
+    """
+    Build a weighted BM25 query from a stakeholder's name, title and details.
+
+    Name tokens are weighted up because passages that mention the person are the
+    most valuable context for a personalized email.
+
+    Returns:
+        Dictionary of term -> query weight
+    """
+    query = Counter()
+    for term in tokenize(stakeholder.get('name', '')):
+        if term not in NAME_AFFIXES:
+            query[term] += name_weight
+    for term in tokenize(stakeholder.get('title', '')) + tokenize(stakeholder.get('details', '')):
+        query[term] += 1.0
+    return dict(query)
+
+
+class BM25Index:
+    """In-memory Okapi BM25 index over report passages."""
+
+    def __init__(self, chunks: list, k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self._term_freqs = [Counter(tokenize(chunk)) for chunk in chunks]
+        self._lengths = [sum(tf.values()) for tf in self._term_freqs]
+        self._avg_length = (sum(self._lengths) / len(chunks)) if chunks else 0.0
+
+        doc_freq = Counter()
+        for tf in self._term_freqs:
+            doc_freq.update(tf.keys())
+        n = len(chunks)
+        self._idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in doc_freq.items()
+        }
+
+    def score(self, query: dict, index: int) -> float:
+        """BM25 score of one passage for a weighted query."""
+        tf = self._term_freqs[index]
+        norm = self.k1 * (1 - self.b + self.b * self._lengths[index] / (self._avg_length or 1.0))
+        total = 0.0
+        for term, weight in query.items():
+            freq = tf.get(term)
+            if freq:
+                total += weight * self._idf[term] * freq * (self.k1 + 1) / (freq + norm)
+        return total
+
+    def search(self, query: dict, top_k: int = 4) -> list:
+        """
+        Rank passages for a query.
+
+        Returns:
+            List of (score, passage_index) tuples with a positive score, best first
+        """
+        scored = [(self.score(query, i), i) for i in range(len(self.chunks))]
+        scored = [item for item in scored if item[0] > 0]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return scored[:top_k]
+
+
+class ContextRetriever:
+    """
+    Selects the report text sent for per-stakeholder context extraction.
+
+    Modes:
+        full      Send the whole report to the LLM (previous behaviour)
+        retrieve  Send only the top-k BM25 passages to the LLM (default)
+        local     Return the top-k passages directly, skipping the LLM call
+    """
+
+    MODES = ("full", "retrieve", "local")
+
+    def __init__(self, mode: str = "retrieve", top_k: int = 4, min_report_chars: int = 6000,
+                 chunk_chars: int = 800, max_indexes: int = 8):
+        """
+        Args:
+            mode: One of MODES
+            top_k: Number of passages retrieved per stakeholder
+            min_report_chars: Reports shorter than this are always sent whole
+            chunk_chars: Target passage size
+            max_indexes: Number of report indexes kept in memory
+        """
+        self.mode = mode if mode in self.MODES else "retrieve"
+        self.top_k = top_k
+        self.min_report_chars = min_report_chars
+        self.chunk_chars = chunk_chars
+        self.max_indexes = max_indexes
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+        self.indexes_built = 0
+
+    @property
+    def skip_llm(self) -> bool:
+        return self.mode == "local"
+
+    def get_index(self, report: str) -> BM25Index:
+        """Get the index for a report, building it on first use."""
+        key = report_fingerprint(report, str(self.chunk_chars))
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = BM25Index(chunk_report(report, self.chunk_chars))
+                self.indexes_built += 1
+                self._indexes[key] = index
+                while len(self._indexes) > self.max_indexes:
+                    self._indexes.popitem(last=False)
+            self._indexes.move_to_end(key)
+            return index
+
+    def retrieve(self, stakeholder: dict, report: str, top_k: int = None) -> list:
+        """
+        Retrieve the passages most relevant to a stakeholder.
+
+        Returns:
+            List of passage strings in document order (empty if nothing matched)
+        """
+        index = self.get_index(report)
+        hits = index.search(build_stakeholder_query(stakeholder), top_k or self.top_k)
+        return [index.chunks[i] for i in sorted(i for _, i in hits)]
+
+    def select_passages(self, stakeholder: dict, report: str) -> str:
+        """
+        Return the report text to use as context for this stakeholder.
+
+        Falls back to the full report in "full" mode, for short reports, or when no
+        passage matches the stakeholder query (the opening passages in "local" mode).
+        """
+        if self.mode == "full" or len(report or "") < self.min_report_chars:
+            return report
+        passages = self.retrieve(stakeholder, report)
+        if not passages:
+            if not self.skip_llm:
+                return report
+            passages = self.get_index(report).chunks[:self.top_k]
+        return "\n\n".join(passages)
+
+    def select_passages_for_group(self, stakeholders: list, report: str) -> str:
+        """
+        Return the union of the passages retrieved for several stakeholders.
+
+        Used by batched extraction so one prompt carries every passage any member of
+        the batch needs, each passage once and in document order.
+        """
+        if self.mode == "full" or len(report or "") < self.min_report_chars:
+            return report
+        index = self.get_index(report)
+        selected = set()
+        for stakeholder in stakeholders:
+            selected.update(i for _, i in index.search(build_stakeholder_query(stakeholder), self.top_k))
+        if not selected:
+            return report
+        return "\n\n".join(index.chunks[i] for i in sorted(selected))
+
+
+# Shared by every TaskPlannerAgent in the process so each report is indexed once
+CONTEXT_RETRIEVER = ContextRetriever(
+    mode=os.getenv('CONTEXT_RETRIEVAL_MODE', 'retrieve'),
+    top_k=int(os.getenv('CONTEXT_RETRIEVAL_TOP_K', '4'))
+)
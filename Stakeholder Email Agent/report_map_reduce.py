@@ -0,0 +1,160 @@
+"""
+Map-Reduce Report Extraction for the Orchestrator Agent
+Extracts stakeholders and company facts from long reports chunk by chunk
+
+Sending a 100+ page report as one request either truncates it or makes a single very
+slow call. In map-reduce mode the extracted text is split into overlapping chunks, every
+chunk is processed by its own (concurrent) LLM call, and the reduce step merges and
+de-duplicates the stakeholders and condenses the collected facts into the company
+summary. Latency is then bounded by the chunk size rather than the document size.
+"""
+import asyncio
+import os
+
+from agents.combined_extraction import parse_json_response, validate_stakeholders
+from agents.pipeline import StageLimiter
+from prompts.orchestrator_prompts import CHUNK_EXTRACTION_PROMPT, COMPANY_SUMMARY_REDUCE_PROMPT
+from utils.report_index import chunk_report, tokenize
+from utils.stakeholder_dedupe import dedupe_stakeholders
+from utils.structured_logger import get_logger
+
+
+def overlapping_chunks(report: str, chunk_chars: int = 30000, overlap_chars: int = 2000) -> list:
+    """
+    Split a report into chunks of about `chunk_chars` that overlap by about `overlap_chars`.
+
+    Chunks are built from whole paragraphs/sentences (see chunk_report), so a name or a
+    sentence cut by one chunk boundary appears intact in the neighbouring chunk.
+    """
+    passages = chunk_report(report, max_chars=max(200, min(2000, overlap_chars)))
+    chunks = []
+    start = 0
+    while start < len(passages):
+        end = start
+        size = 0
+        while end < len(passages) and (end == start or size + len(passages[end]) <= chunk_chars):
+            size += len(passages[end]) + 2
+            end += 1
+        chunks.append("\n\n".join(passages[start:end]))
+        if end >= len(passages):
+            break
+        # Step back over the trailing passages that make up the overlap
+        next_start = end
+        overlap = 0
+        while next_start - 1 > start and overlap + len(passages[next_start - 1]) <= overlap_chars:
+            next_start -= 1
+            overlap += len(passages[next_start])
+        start = next_start
+    return chunks
+
+
+def _dedupe_facts(facts: list, threshold: float = 0.8) -> list:
+    """Drop facts whose terms nearly repeat an earlier fact (overlapping chunks repeat them)."""
+    kept = []
+    seen = []
+    for fact in facts:
+        terms = set(tokenize(fact))
+        if not terms:
+            continue
+        if any(len(terms & other) / len(terms | other) >= threshold for other in seen):
+            continue
+        seen.append(terms)
+        kept.append(fact.strip())
+    return kept
+
+
+class MapReduceExtractor:
+    """
+    Chunked stakeholder and company summary extraction.
+
+    Usage:
+        extractor = MapReduceExtractor(llm_client)
+        stakeholders, summary = await extractor.extract(report_text)
+    """
+
+    def __init__(self, llm_client, chunk_chars: int = None, overlap_chars: int = None,
+                 concurrency: int = None, log=None):
+        """
+        Args:
+            llm_client: LLM client used for the map and reduce calls
+            chunk_chars: Chunk size (defaults to MAP_REDUCE_CHUNK_CHARS or 30000)
+            overlap_chars: Overlap between chunks (defaults to MAP_REDUCE_OVERLAP_CHARS or 2000)
+            concurrency: Concurrent chunk calls (defaults to MAP_REDUCE_CONCURRENCY or 8)
+            log: Logger (defaults to a "MapReduce" logger)
+        """
+        self.llm_client = llm_client
+        self.chunk_chars = chunk_chars or int(os.getenv('MAP_REDUCE_CHUNK_CHARS', '30000'))
+        self.overlap_chars = overlap_chars or int(os.getenv('MAP_REDUCE_OVERLAP_CHARS', '2000'))
+        self.limiter = StageLimiter({"extract": concurrency or int(os.getenv('MAP_REDUCE_CONCURRENCY', '8'))})
+        self.log = log or get_logger("MapReduce")
+        self.failed_chunks = 0
+
+    async def extract(self, report: str) -> tuple:
+        """
+        Extract the stakeholders and company summary of a report.
+
+        Returns:
+            (de-duplicated stakeholder list, company summary string)
+        """
+        chunks = overlapping_chunks(report, self.chunk_chars, self.overlap_chars)
+        self.log.info("Map-reduce extraction over %d chunks (%d characters)", len(chunks), len(report),
+                      category="stage")
+        mapped = await asyncio.gather(*(
+            self.limiter.run("extract", self._map_chunk, chunk, number, len(chunks))
+            for number, chunk in enumerate(chunks, start=1)
+        ))
+        stakeholders, summary = await asyncio.to_thread(self._reduce, mapped)
+        self.log.info("Map-reduce extraction found %d stakeholders (%d chunks failed)", len(stakeholders),
+                      self.failed_chunks, category="stage")
+        return stakeholders, summary
+
+    def _map_chunk(self, chunk: str, number: int, count: int) -> dict:
+        """Extract stakeholders and facts from one chunk; a chunk that fails contributes nothing."""
+        prompt = CHUNK_EXTRACTION_PROMPT.format(chunk_number=number, chunk_count=count, report_chunk=chunk)
+        try:
+            response = self.llm_client.get_completion([{"role": "user", "content": prompt}], max_tokens=4096)
+        except Exception as e:
+            self.failed_chunks += 1
+            self.log.warning("Extraction of chunk %d/%d failed: %s", number, count, e)
+            return {"stakeholders": [], "facts": []}
+        parsed = self._parse(response)
+        if parsed is None:
+            self.failed_chunks += 1
+            self.log.warning("Could not parse extraction of chunk %d/%d", number, count)
+            return {"stakeholders": [], "facts": []}
+        return parsed
+
+    def _reduce(self, mapped: list) -> tuple:
+        stakeholders = [s for result in mapped for s in result["stakeholders"]]
+        unique, report = dedupe_stakeholders(stakeholders)
+        if report['merged']:
+            self.log.info("Merged %d stakeholders found in several chunks", report['merged'],
+                          merges_by_kind=report['merges_by_kind'])
+
+        facts = _dedupe_facts([f for result in mapped for f in result["facts"]])
+        summary = ""
+        if facts:
+            prompt = COMPANY_SUMMARY_REDUCE_PROMPT.format(facts="\n".join(f"- {fact}" for fact in facts))
+            try:
+                summary = (self.llm_client.get_completion([{"role": "user", "content": prompt}],
+                                                          max_tokens=1024) or "").strip()
+            except Exception as e:
+                self.log.warning("Company summary reduce failed; continuing without a summary: %s", e)
+        return unique, summary
+
+    @staticmethod
+    def _parse(response: str) -> dict:
+        """Parse a chunk response; a bare JSON array is read as a stakeholder list."""
+        parsed = parse_json_response(response)
+        if isinstance(parsed, list):
+            parsed = {"stakeholders": parsed, "facts": []}
+        if not isinstance(parsed, dict):
+            return None
+        errors = []
+        stakeholders = validate_stakeholders(parsed.get("stakeholders") or [], errors)
+        facts = [str(f) for f in parsed.get("facts") or [] if str(f).strip()]
+        return {"stakeholders": stakeholders, "facts": facts}
+
+
+# Reports longer than this (characters) are extracted with map-reduce; 0 disables it
+MAP_REDUCE_MIN_CHARS = int(os.getenv('MAP_REDUCE_MIN_CHARS', '60000'))
@@ -0,0 +1,168 @@
+"""
+Template Section Cache
+Caches the AI-generated sections of built-in templates so that edits to
+assembly-only user fields re-assemble the email without an LLM call
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+
+from utils.structured_logger import get_logger
+
+_log = get_logger("SectionCache")
+
+
+def report_fingerprint(*parts: str) -> str:
+    """
+    Compute a stable hash over report-derived text.
+
+    Args:
+        parts: Text fragments (report content, summary, extracted context...)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update((part or "").encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+def get_prompt_fields(template_config: dict) -> list:
+    """
+    Get the user fields that shape a template's AI sections: every user field referenced
+    as a placeholder in the generation prompt. The others (e.g. subject, closing) are
+    only used when the email is assembled.
+
+    Args:
+        template_config: Template configuration dictionary
+
+    Returns:
+        Sorted list of user field names
+    """
+    placeholders = set(re.findall(r'\{(\w+)\}', template_config.get('generation_prompt', '')))
+    return sorted(placeholders & set(template_config.get('user_fields', {})))
+
+
+class TemplateSectionCache:
+    """
+    Two-level cache (in-memory LRU in front of a JSON file per entry) for template AI sections.
+
+    The bridge runs one process per action, so entries are persisted to disk to survive
+    between a generation run and a later re-assembly with edited user fields.
+    """
+
+    def __init__(self, cache_dir: str = None, max_memory_entries: int = 256):
+        self.cache_dir = cache_dir
+        self.max_memory_entries = max_memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, template_key: str, template_config: dict, task: dict, user_fields: dict) -> str:
+        """
+        Build the cache key for a template generation request.
+
+        The key covers the template (name and prompt text), the stakeholder, the report
+        the context came from, the stakeholder's engagement entry and only the user fields
+        the prompt depends on.
+        """
+        report_hash = task.get('report_hash') or report_fingerprint(
+            task.get('company_name', ''),
+            task.get('company_summary', ''),
+            task.get('relevant_context', '')
+        )
+        key_data = {
+            "template_key": template_key,
+            "template_prompt": report_fingerprint(template_config.get('generation_prompt', '')),
+            "stakeholder": [
+                task.get('stakeholder_name', ''),
+                task.get('stakeholder_title', ''),
+                task.get('stakeholder_details', '')
+            ],
+            "report_hash": report_hash,
+            "engagement": task.get('engagement'),
+            "prompt_fields": {
+                field: user_fields.get(field, '')
+                for field in get_prompt_fields(template_config)
+            }
+        }
+        return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> dict:
+        """Return the cached entry ({"ai_sections": ..., "quality_score": ...}) or None."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+        entry = self._read_entry(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, ai_sections: dict, quality_score: float = None):
+        """Store freshly generated AI sections."""
+        entry = {"ai_sections": ai_sections, "quality_score": quality_score}
+        with self._lock:
+            self._remember(key, entry)
+        self._write_entry(key, entry)
+
+    def update_score(self, key: str, quality_score: float):
+        """Attach the evaluation score of the assembled email to an existing entry."""
+        entry = self.get(key)
+        if entry is None:
+            return
+        self.put(key, entry['ai_sections'], quality_score)
+
+    def _remember(self, key: str, entry: dict):
+        """Insert into the in-memory LRU (caller holds the lock)."""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_entry(self, key: str) -> dict:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._entry_path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_entry(self, key: str, entry: dict):
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write atomically so concurrent stakeholders never read a partial file
+            tmp_path = f"{self._entry_path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._entry_path(key))
+        except OSError as e:
+            _log.warning("Could not persist cache entry: %s", e)
+
+
+# Shared across EmailWriterAgents; set TEMPLATE_SECTION_CACHE_DIR="" to keep it in memory only
+SECTION_CACHE = TemplateSectionCache(
+    cache_dir=os.getenv(
+        'TEMPLATE_SECTION_CACHE_DIR',
+        os.path.join(tempfile.gettempdir(), 'stakeholder_template_sections')
+    ) or None
+)
@@ -0,0 +1,195 @@
+"""
+Stakeholder De-duplication
+Merges the same person extracted more than once before any email work is started
+
+LLM extraction often lists one person under several spellings ("Kim Schwenk, MSN, RN"
+and "Kim Schwenk", or a name with and without "Dr."). Every duplicate would cost a full
+context -> generate -> evaluate -> refine chain and produce a second email. Names are
+normalized (prefixes and credentials stripped), candidates are only compared within the
+same last-name block, and matched entries are merged into the first one. An entry only
+joins a group it matches member by member, so a weak match ("Dr. Schwenk") never chains
+two different people ("Kim Schwenk", "Karl Schwenk") together.
+"""
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+from utils.report_index import NAME_AFFIXES
+
+NAME_PREFIXES = frozenset("dr mr mrs ms miss prof".split())
+CREDENTIALS = NAME_AFFIXES | frozenset("np pa aprn crna cns rph pharmd facs fhm mhs msc ms ma bs ba ii iii iv".split())
+TITLE_STOPWORDS = frozenset("of and the for to in".split())
+# Strongest first; a merge is reported under the strongest match with any group member
+MATCH_KINDS = ("exact", "fuzzy", "initial", "last_name_only")
+
+
+def _ascii_fold(text: str) -> str:
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+
+
+def normalize_name(name: str) -> tuple:
+    """
+    Normalize a name to (first, last) without prefixes, credentials or punctuation.
+
+    "Dr. Kim Schwenk, MSN, RN" -> ("kim", "schwenk"); a single word is returned as ("", word).
+    """
+    head = _ascii_fold(name or "").split(',', 1)[0].lower()
+    words = [w.strip(".'") for w in re.split(r"[\s]+", head) if w.strip(".'")]
+    words = [w for w in words if w not in NAME_PREFIXES]
+    # Credentials written without a comma ("Kim Schwenk MSN RN") trail the name
+    while len(words) > 1 and words[-1].replace('.', '') in CREDENTIALS:
+        words.pop()
+    words = [re.sub(r"[^a-z\-]", "", w) for w in words]
+    words = [w for w in words if w]
+    if not words:
+        return ("", "")
+    if len(words) == 1:
+        return ("", words[0])
+    return (words[0], words[-1])
+
+
+def _title_terms(title: str) -> set:
+    return {t for t in re.findall(r"[a-z]+", _ascii_fold(title or "").lower()) if t not in TITLE_STOPWORDS}
+
+
+def _titles_compatible(a: dict, b: dict) -> bool:
+    terms_a, terms_b = _title_terms(a.get('title')), _title_terms(b.get('title'))
+    return not terms_a or not terms_b or bool(terms_a & terms_b)
+
+
+def _first_names_match(first_a: str, first_b: str, similarity: float) -> str:
+    """How two first names within a last-name block match: "exact", "last_name_only", "initial", "fuzzy" or ""."""
+    if first_a == first_b:
+        return "exact"
+    if not first_a or not first_b:
+        return "last_name_only"
+    if (len(first_a) == 1 or len(first_b) == 1) and first_a[0] == first_b[0]:
+        return "initial"
+    if SequenceMatcher(None, first_a, first_b).ratio() >= similarity:
+        return "fuzzy"
+    return ""
+
+
+def merge_text(primary: str, extra: str) -> str:
+    """Append the sentences of `extra` that `primary` does not already contain."""
+    primary = (primary or "").strip()
+    additions = []
+    for sentence in re.split(r"(?<=[.!?])\s+", (extra or "").strip()):
+        if sentence and sentence.lower() not in primary.lower() and sentence not in additions:
+            additions.append(sentence)
+    return " ".join(part for part in [primary] + additions if part)
+
+
+class StakeholderDeduplicator:
+    """
+    Fuzzy de-duplication of a stakeholder roster.
+
+    Exact first-name matches merge whatever the titles; an initial ("K. Schwenk"), a
+    missing first name or a near spelling ("Katherine"/"Katharine") merges only when the
+    titles are compatible (one is empty or they share a word). An entry joins a group
+    only if it matches every member. Entries with a full first name are grouped first;
+    an initial or a lone surname then joins the one group it fits, and stays on its own
+    when it fits none or several (merging it into the wrong person would cost that
+    person their email).
+
+    Usage:
+        unique, report = StakeholderDeduplicator().dedupe(stakeholders)
+    """
+
+    def __init__(self, similarity: float = 0.85):
+        """
+        Args:
+            similarity: Minimum SequenceMatcher ratio for two first names to be a fuzzy match
+        """
+        self.similarity = similarity
+
+    def dedupe(self, stakeholders: list) -> tuple:
+        """
+        Merge duplicate stakeholders.
+
+        Args:
+            stakeholders: List of stakeholder dictionaries (name, title, details, optional id)
+
+        Returns:
+            (unique stakeholders in their original order, report dictionary with the input
+            and output counts, merge counts per match kind and the merged groups)
+        """
+        kinds = {}
+        blocks = {}
+        groups = []
+        names = [normalize_name(s.get('name', '')) for s in stakeholders]
+        for index, (first, last) in enumerate(names):
+            if last:
+                blocks.setdefault(last, []).append(index)
+            else:
+                groups.append([index])
+
+        def match(i, group):
+            """Strongest match kind of entry i with every member of a group ("" if any member does not match)."""
+            found = []
+            for j in group:
+                kind = _first_names_match(names[i][0], names[j][0], self.similarity)
+                if not kind or (kind != "exact" and not _titles_compatible(stakeholders[i], stakeholders[j])):
+                    return ""
+                found.append(kind)
+            return min(found, key=MATCH_KINDS.index)
+
+        for members in blocks.values():
+            block_groups = []
+            full = [i for i in members if len(names[i][0]) > 1]
+            weak = [i for i in members if len(names[i][0]) <= 1]
+            for i in full:
+                for group in block_groups:
+                    kind = match(i, group)
+                    if kind:
+                        group.append(i)
+                        kinds[i] = kind
+                        break
+                else:
+                    block_groups.append([i])
+            for i in weak:
+                candidates = [(group, match(i, group)) for group in block_groups]
+                candidates = [(group, kind) for group, kind in candidates if kind]
+                if len(candidates) == 1:
+                    group, kind = candidates[0]
+                    group.append(i)
+                    kinds[i] = kind
+                else:
+                    block_groups.append([i])
+            groups.extend(block_groups)
+
+        unique = []
+        merged_groups = []
+        for members in sorted((sorted(group) for group in groups), key=lambda group: group[0]):
+            unique.append(self._merge([stakeholders[i] for i in members]))
+            if len(members) > 1:
+                merged_groups.append([stakeholders[i].get('name', '') for i in members])
+
+        merges = {}
+        for kind in kinds.values():
+            merges[kind] = merges.get(kind, 0) + 1
+        report = {
+            "input": len(stakeholders),
+            "unique": len(unique),
+            "merged": len(stakeholders) - len(unique),
+            "merges_by_kind": merges,
+            "groups": merged_groups,
+        }
+        return unique, report
+
+    @staticmethod
+    def _merge(members: list) -> dict:
+        """Merge duplicates into the first entry, keeping its id and name, the longest title and all details."""
+        merged = dict(members[0])
+        for other in members[1:]:
+            if len(other.get('title') or '') > len(merged.get('title') or ''):
+                merged['title'] = other['title']
+            merged['details'] = merge_text(merged.get('details'), other.get('details'))
+        if len(members) > 1:
+            merged['merged_from'] = [m.get('id', m.get('name')) for m in members[1:]]
+        return merged
+
+
+def dedupe_stakeholders(stakeholders: list) -> tuple:
+    """Module-level shortcut for StakeholderDeduplicator().dedupe()."""
+    return StakeholderDeduplicator().dedupe(stakeholders)
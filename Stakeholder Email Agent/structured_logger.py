@@ -0,0 +1,213 @@
+"""
+Structured Logger for the Agentic System
+Leveled, lazily formatted, sampled logging with a queue-backed background sink
+
+Agents used to print() every stage synchronously; with many concurrent stakeholders
+that stdout/stderr traffic (relayed through the bridge) costs real time. Records that
+are filtered out by level or sampling cost one comparison, and emitted records are
+formatted and written by a background thread.
+
+Configuration (environment):
+    AGENT_LOG_LEVEL     DEBUG, INFO (default), WARNING or ERROR
+    AGENT_LOG_SAMPLING  Per-category sample rates, e.g. "llm_payload=0.1,stage=1"
+    AGENT_LOG_FORMAT    "text" (default) or "bridge" (LOG:-prefixed JSON lines that the
+                        webapp's executePythonBridge stores in the workflow debug console)
+"""
+import atexit
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "debug", INFO: "info", WARNING: "warning", ERROR: "error"}
+LEVELS_BY_NAME = {name.upper(): level for level, name in LEVEL_NAMES.items()}
+
+
+def _parse_sampling(spec: str) -> dict:
+    """Parse "category=rate,..." into a dictionary of rates clamped to [0, 1]."""
+    rates = {}
+    for item in (spec or "").split(','):
+        if '=' not in item:
+            continue
+        category, rate = item.split('=', 1)
+        try:
+            rates[category.strip()] = min(1.0, max(0.0, float(rate)))
+        except ValueError:
+            continue
+    return rates
+
+
+class LogSink:
+    """
+    Background writer that drains a bounded queue of log records.
+
+    Records are dropped (and counted) rather than blocking the caller when the
+    queue is full.
+    """
+
+    def __init__(self, stream=None, output_format: str = "text", max_queue: int = 10000):
+        self.stream = stream
+        self.output_format = output_format
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, record: tuple):
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = 5.0):
+        """Wait until every queued record has been written."""
+        if self._thread is None:
+            return
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._drain, name="agent-log-sink", daemon=True)
+                self._thread.start()
+
+    def _drain(self):
+        while True:
+            record = self._queue.get()
+            try:
+                self._write(record)
+            except Exception:
+                pass
+            finally:
+                self._queue.task_done()
+
+    def _write(self, record: tuple):
+        timestamp, level, agent, category, message, args, fields = record
+        if args:
+            # Lazy formatting: callables produce expensive payloads only when emitted
+            args = tuple(arg() if callable(arg) else arg for arg in args)
+            message = message % args
+
+        stream = self.stream or sys.stderr
+        if self.output_format == "bridge":
+            data = {"level": LEVEL_NAMES[level], "agent": agent, "message": message}
+            metadata = dict(fields)
+            if category:
+                metadata["category"] = category
+            if metadata:
+                data["metadata"] = metadata
+            stream.write("LOG:" + json.dumps({"type": "log", "data": data}, default=str) + "\n")
+        else:
+            time_str = datetime.fromtimestamp(timestamp).strftime("%H:%M:%S.%f")[:-3]
+            extra = "".join(f" {key}={value}" for key, value in fields.items())
+            stream.write(f"{time_str} {LEVEL_NAMES[level].upper():7} [{agent}] {message}{extra}\n")
+        stream.flush()
+
+
+class LogConfig:
+    """Process-wide level, sampling rates and sink shared by every AgentLogger."""
+
+    def __init__(self, level: int = INFO, sampling: dict = None, sink: LogSink = None):
+        self.level = level
+        self.sampling = sampling or {}
+        self.sink = sink or LogSink()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            level=LEVELS_BY_NAME.get(os.getenv('AGENT_LOG_LEVEL', 'INFO').upper(), INFO),
+            sampling=_parse_sampling(os.getenv('AGENT_LOG_SAMPLING')),
+            sink=LogSink(output_format=os.getenv('AGENT_LOG_FORMAT', 'text'))
+        )
+
+    def sampled(self, category: str) -> bool:
+        """Deterministically keep `rate` of the records in a category (every 1/rate-th record)."""
+        rate = self.sampling.get(category, 1.0)
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+        with self._lock:
+            count = self._counters.get(category, 0) + 1
+            self._counters[category] = count
+        return int(count * rate) > int((count - 1) * rate)
+
+
+_config = LogConfig.from_env()
+
+
+def configure(level=None, sampling: dict = None, output_format: str = None, stream=None):
+    """Override logging configuration at runtime (e.g. from the bridge or tests)."""
+    if level is not None:
+        _config.level = LEVELS_BY_NAME.get(str(level).upper(), level) if isinstance(level, str) else level
+    if sampling is not None:
+        _config.sampling = dict(sampling)
+    if output_format is not None:
+        _config.sink.output_format = output_format
+    if stream is not None:
+        _config.sink.stream = stream
+
+
+def flush(timeout: float = 5.0):
+    """Block until queued log records are written (call before the process exits)."""
+    _config.sink.flush(timeout)
+
+
+atexit.register(flush)
+
+
+class AgentLogger:
+    """
+    Logger bound to one agent name.
+
+    Usage:
+        log = get_logger("EmailWriter-1")
+        log.info("Generating email for %s", name)
+        log.debug("Response: %s", lambda: repr(response), category="llm_payload")
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def is_enabled(self, level: int) -> bool:
+        """Check the level before building expensive arguments that are not callables."""
+        return level >= _config.level
+
+    def log(self, level: int, message: str, *args, category: str = None, **fields):
+        if level < _config.level:
+            return
+        if category is not None and not _config.sampled(category):
+            return
+        _config.sink.submit((time.time(), level, self.name, category, message, args, fields))
+
+    def debug(self, message: str, *args, category: str = None, **fields):
+        self.log(DEBUG, message, *args, category=category, **fields)
+
+    def info(self, message: str, *args, category: str = None, **fields):
+        self.log(INFO, message, *args, category=category, **fields)
+
+    def warning(self, message: str, *args, category: str = None, **fields):
+        self.log(WARNING, message, *args, category=category, **fields)
+
+    def error(self, message: str, *args, category: str = None, **fields):
+        self.log(ERROR, message, *args, category=category, **fields)
+
+
+def get_logger(name: str) -> AgentLogger:
+    """Get a logger for an agent or utility component."""
+    return AgentLogger(name)
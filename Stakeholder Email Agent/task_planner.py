@@ -6,15 +6,321 @@
         
         return task
     
+    async def generate_emails(self, stakeholders: list, report: str, company_summary: str,
+                              generation_mode: str, mode_config: dict, user_id: int = None,
+                              workflow_id=None) -> list:
+        """
+        Generate an email for every stakeholder.
+
+        Pipelined by default (see run_pipelined). With STAKEHOLDER_PIPELINE=0 the roster's
+        context is prefetched first and the writers start afterwards. Either way the
+        writers go through the stage scheduler (per-stage limits, queues and admission)
+        rather than one unbounded fan-out.
+
+        With a workflow_id, stage outputs are checkpointed and a re-run of the same
+        workflow resumes where the previous run stopped.
+        """
+        from agents.pipeline import PIPELINE_ENABLED
+
+        if PIPELINE_ENABLED:
+            return await self.run_pipelined(stakeholders, report, company_summary, generation_mode, mode_config,
+                                            user_id, workflow_id)
+        pipeline = self._build_pipeline(stakeholders, report, company_summary, generation_mode, mode_config, user_id,
+                                        prefetched=True, workflow_id=workflow_id)
+        pending = stakeholders
+        if pipeline.checkpoints is not None:
+            pending = pipeline.checkpoints.missing(stakeholders, "context")
+        await self.prefetch_relevant_contexts(pending, report)
+        emails = await pipeline.run(stakeholders)
+        self._finish_checkpoints(pipeline, workflow_id, emails)
+        return emails
+
+    async def run_pipelined(self, stakeholders: list, report: str, company_summary: str,
+                            generation_mode: str, mode_config: dict, user_id: int = None,
+                            workflow_id=None) -> list:
+        """
+        Move each stakeholder through context → generate → evaluate → refine on its own.
+
+        Context is extracted in small batches (CONTEXT_PIPELINE_BATCH_SIZE); a stakeholder
+        only waits for its own batch, so the first email no longer waits for the slowest
+        extraction of the roster. Per-stage concurrency comes from PIPELINE_CONCURRENCY.
+        """
+        pipeline = self._build_pipeline(stakeholders, report, company_summary, generation_mode, mode_config, user_id,
+                                        workflow_id=workflow_id)
+        emails = await pipeline.run(stakeholders)
+        self._finish_checkpoints(pipeline, workflow_id, emails)
+        return emails
+
+    async def stream_emails(self, stakeholders: list, report: str, company_summary: str,
+                            generation_mode: str, mode_config: dict, user_id: int = None,
+                            workflow_id=None):
+        """
+        Pipelined generation that yields each email (or error result) as soon as it is done.
+
+        Results arrive in completion order tagged with 'stakeholder_id'.
+        """
+        pipeline = self._build_pipeline(stakeholders, report, company_summary, generation_mode, mode_config, user_id,
+                                        workflow_id=workflow_id)
+        emails = []
+        async for email in pipeline.stream(stakeholders):
+            emails.append(email)
+            yield email
+        self._finish_checkpoints(pipeline, workflow_id, emails)
+
+    def _finish_checkpoints(self, pipeline, workflow_id, emails: list):
+        """Drop the workflow checkpoint once every email completed; keep it for a resume otherwise."""
+        from utils.checkpoint_store import CHECKPOINT_STORE
+
+        if pipeline.checkpoints is None:
+            return
+        unfinished = sum(1 for email in emails if email.get('status', 'complete') != "complete")
+        if unfinished:
+            self.log.info("Keeping checkpoint of workflow %s: %d emails failed or are partial and can be resumed",
+                          workflow_id, unfinished, category="stage")
+        else:
+            CHECKPOINT_STORE.clear(workflow_id)
+
+    def _build_pipeline(self, stakeholders: list, report: str, company_summary: str,
+                        generation_mode: str, mode_config: dict, user_id: int = None, prefetched: bool = False,
+                        workflow_id=None):
+        """
+        Build the StakeholderPipeline for a roster.
+
+        Context is extracted per batch inside the pipeline unless it was already
+        prefetched for the whole roster (prefetched=True). Contexts stored for the same
+        report by an earlier workflow are reused, and new ones are stored. Every task also
+        gets the stakeholder's entry from the report's engagement index. With a
+        workflow_id the pipeline resumes from, and records, the workflow's checkpoint.
+        """
+        from agents.context_extraction import (
+            BATCH_EXTRACTION_ENABLED, PIPELINE_BATCH_SIZE, BatchContextExtractor, stakeholder_key
+        )
+        from agents.engagement_index import ENGAGEMENT_INDEX_ENABLED, EngagementIndexer
+        from agents.pipeline import StakeholderPipeline
+        from utils.checkpoint_store import CHECKPOINT_STORE, run_fingerprint
+        from utils.mention_index import MentionIndex
+        from utils.report_index import CONTEXT_RETRIEVER
+
+        checkpoints = None
+        if workflow_id is not None and CHECKPOINT_STORE.checkpoint_dir:
+            checkpoints = CHECKPOINT_STORE.open(
+                workflow_id, run_fingerprint(report, company_summary, generation_mode, mode_config)
+            )
+        extractor = None
+        pending = stakeholders
+        if not prefetched:
+            self._mention_index = MentionIndex(report, stakeholders)
+            self._prefetched_contexts = self._load_context_artifacts(stakeholders, report)
+            pending = [s for s in stakeholders if stakeholder_key(s) not in self._prefetched_contexts]
+        if not prefetched and BATCH_EXTRACTION_ENABLED and not CONTEXT_RETRIEVER.skip_llm and len(pending) > 1:
+            extractor = BatchContextExtractor(self.llm_client, log=self.log)
+            extractor.max_output_tokens = PIPELINE_BATCH_SIZE * extractor.tokens_per_stakeholder
+        # Batches are cut from the stakeholders without a stored context
+        positions = {stakeholder_key(s): i for i, s in enumerate(pending)}
+        batch_futures = {}
+        # The report's engagement suggestions are indexed once, by the first task that needs them
+        engagement_futures = {}
+
+        async def prepare_task(index, stakeholder, limiter):
+            position = positions.get(stakeholder_key(stakeholder))
+            if extractor is not None and position is not None:
+                size = extractor.batch_size
+                batch_index = position // size
+                if batch_index not in batch_futures:
+                    batch = pending[batch_index * size:(batch_index + 1) * size]
+                    batch_futures[batch_index] = asyncio.ensure_future(
+                        limiter.run("context", extractor.extract, batch, report)
+                    )
+                # Shielded: this stakeholder's deadline must not cancel its batch-mates' extraction
+                self._prefetched_contexts.update(await asyncio.shield(batch_futures[batch_index]))
+            task = await limiter.run(
+                "context", self._create_task_for_stakeholder,
+                stakeholder, report, company_summary, generation_mode, mode_config, user_id
+            )
+            self._store_context_artifact(stakeholder, report, task)
+            if ENGAGEMENT_INDEX_ENABLED:
+                if "index" not in engagement_futures:
+                    engagement_futures["index"] = asyncio.ensure_future(
+                        limiter.run("context", EngagementIndexer(self.llm_client, log=self.log).build, report)
+                    )
+                # Shielded like the batches; an index that was cancelled or failed leaves the
+                # prompts their instruction block (None)
+                try:
+                    engagement_index = await asyncio.shield(engagement_futures["index"])
+                except asyncio.CancelledError:
+                    if not engagement_futures["index"].cancelled():
+                        raise
+                    engagement_index = None
+                except Exception as e:
+                    self.log.warning("Engagement index failed, prompts keep the full instructions: %s", e)
+                    engagement_index = None
+                if engagement_index is not None:
+                    task['engagement'] = engagement_index.entry_text(stakeholder)
+            return task
+
+        return StakeholderPipeline(
+            prepare_task,
+            lambda index: EmailWriterAgent(f"EmailWriter-{index}"),
+            log=self.log,
+            checkpoints=checkpoints
+        )
+
+    async def prefetch_relevant_contexts(self, stakeholders: list, report: str):
+        """
+        Extract context for the whole roster in batched LLM calls before tasks are created.
+        _extract_relevant_context serves these results and only calls the LLM itself for
+        stakeholders missing from the batched responses.
+
+        Also indexes every direct mention of the roster in the report (one pass).
+        """
+        from agents.context_extraction import BATCH_EXTRACTION_ENABLED, BatchContextExtractor
+        from utils.mention_index import MentionIndex
+        from utils.report_index import CONTEXT_RETRIEVER
+
+        from agents.context_extraction import stakeholder_key
+
+        self._mention_index = MentionIndex(report, stakeholders)
+        self._prefetched_contexts = self._load_context_artifacts(stakeholders, report)
+        stakeholders = [s for s in stakeholders if stakeholder_key(s) not in self._prefetched_contexts]
+        if not BATCH_EXTRACTION_ENABLED or CONTEXT_RETRIEVER.skip_llm or len(stakeholders) < 2:
+            return
+        extractor = BatchContextExtractor(self.llm_client, log=self.log)
+        self._prefetched_contexts.update(await extractor.extract_async(stakeholders, report))
+
+    def _context_artifact_version(self) -> str:
+        """Artifact version of extracted contexts: the context prompts, retrieval settings and model."""
+        from prompts.task_planner_prompts import BATCH_CONTEXT_EXTRACTION_PROMPT
+        from utils.artifact_store import artifact_version
+        from utils.report_index import CONTEXT_RETRIEVER
+
+        return artifact_version(
+            getattr(self.llm_client, 'model', ''),
+            CONTEXT_EXTRACTION_PROMPT,
+            BATCH_CONTEXT_EXTRACTION_PROMPT,
+            CONTEXT_RETRIEVER.mode,
+            str(CONTEXT_RETRIEVER.top_k)
+        )
+
+    def _load_context_artifacts(self, stakeholders: list, report: str) -> dict:
+        """
+        Contexts stored for these stakeholders by an earlier workflow on the same report
+        text, or on a near-duplicate report in which every section the context was built
+        from (its retrieved passages) and every section that mentions the stakeholder is
+        unchanged.
+        """
+        from agents.context_extraction import stakeholder_key
+        from utils.artifact_store import ARTIFACT_STORE, content_hash, context_artifact, context_sources_artifact
+        from utils.near_duplicates import NEAR_DUPLICATE_INDEX
+
+        report_hash = content_hash(report)
+        version = self._context_artifact_version()
+        contexts = {}
+        missing = []
+        for stakeholder in stakeholders:
+            context = ARTIFACT_STORE.get(report_hash, context_artifact(stakeholder), version)
+            if context:
+                contexts[stakeholder_key(stakeholder)] = context
+            else:
+                missing.append(stakeholder)
+
+        if missing:
+            fingerprint = NEAR_DUPLICATE_INDEX.add(report_hash, report)
+            self._report_fingerprint = (report_hash, fingerprint)
+            match = NEAR_DUPLICATE_INDEX.find(report_hash, fingerprint)
+            unchanged = set(match['section_hashes']) if match else set()
+            reused = 0
+            for stakeholder in missing if match else []:
+                mentions = fingerprint.stakeholder_sections(stakeholder)
+                # Contexts stored without their sources cannot be checked and are extracted again
+                sources = ARTIFACT_STORE.get(match['report_hash'], context_sources_artifact(stakeholder), version)
+                if not mentions or not sources or not unchanged.issuperset(mentions + sources):
+                    continue
+                context = ARTIFACT_STORE.get(match['report_hash'], context_artifact(stakeholder), version)
+                if context:
+                    contexts[stakeholder_key(stakeholder)] = context
+                    ARTIFACT_STORE.put(report_hash, context_artifact(stakeholder), version, context)
+                    ARTIFACT_STORE.put(report_hash, context_sources_artifact(stakeholder), version, sources)
+                    reused += 1
+            if reused:
+                self.log.info("Reusing context of %d stakeholders whose sections are unchanged in a "
+                              "near-duplicate report", reused, category="stage")
+        self._stored_context_keys = set(contexts)
+        if contexts:
+            self.log.info("Reusing stored context for %d of %d stakeholders", len(contexts), len(stakeholders),
+                          category="stage")
+        return contexts
+
+    def _store_context_artifact(self, stakeholder: dict, report: str, task: dict):
+        """
+        Store a freshly extracted context for later workflows on the same report text,
+        with the hashes of the report sections it was built from (see _context_sources).
+        """
+        from agents.context_extraction import stakeholder_key
+        from utils.artifact_store import ARTIFACT_STORE, content_hash, context_artifact, context_sources_artifact
+
+        context = task.get('relevant_context')
+        if not context or stakeholder_key(stakeholder) in getattr(self, '_stored_context_keys', ()):
+            return
+        report_hash = content_hash(report)
+        version = self._context_artifact_version()
+        ARTIFACT_STORE.put(report_hash, context_artifact(stakeholder), version, context)
+        ARTIFACT_STORE.put(report_hash, context_sources_artifact(stakeholder), version,
+                           self._context_sources(stakeholder, report, report_hash, context))
+
+    def _context_sources(self, stakeholder: dict, report: str, report_hash: str, context: str) -> list:
+        """
+        Hashes of the report sections a stakeholder's context is drawn from: the sections of
+        the passages retrieved for it (every section when the whole report is sent) and any
+        other section the context quotes, e.g. from a batch-mate's passages.
+        """
+        from utils.near_duplicates import ReportFingerprint
+
+        cached = getattr(self, '_report_fingerprint', None)
+        if cached is None or cached[0] != report_hash:
+            cached = (report_hash, ReportFingerprint(report))
+            self._report_fingerprint = cached
+        fingerprint = cached[1]
+        passages = self._context_passages(stakeholder, report)
+        if passages is report:
+            return list(fingerprint.section_hashes)
+        sources = fingerprint.sections_in(passages)
+        return sources + [h for h in fingerprint.sections_in(context) if h not in sources]
+
+    def _context_passages(self, stakeholder: dict, report: str) -> str:
+        """Report text a stakeholder's context is extracted from: retrieved passages plus direct mentions."""
+        from utils.mention_index import merge_mention_windows
+        from utils.report_index import CONTEXT_RETRIEVER
+
+        passages = CONTEXT_RETRIEVER.select_passages(stakeholder, report)
+        mention_index = getattr(self, '_mention_index', None)
+        if mention_index is not None and passages is not report:
+            # Direct mentions of the stakeholder always make it into the context
+            passages = merge_mention_windows(mention_index.context_windows(stakeholder), passages)
+        return passages
+
     def _extract_relevant_context(self, stakeholder: dict, report: str) -> str:
         """
         Extract relevant sections from the report for this stakeholder.
         Uses LLM to identify pertinent information.
+
+        The report is indexed once (BM25) and only the passages retrieved for this
+        stakeholder are sent; with CONTEXT_RETRIEVAL_MODE=local they are returned directly.
         """
+        from agents.context_extraction import stakeholder_key
+        from utils.report_index import CONTEXT_RETRIEVER
+
+        prefetched = getattr(self, '_prefetched_contexts', {}).get(stakeholder_key(stakeholder))
+        if prefetched:
+            return prefetched
+
+        passages = self._context_passages(stakeholder, report)
+        if CONTEXT_RETRIEVER.skip_llm and passages is not report:
+            return passages
+
         prompt = CONTEXT_EXTRACTION_PROMPT.format(
             stakeholder_name=stakeholder['name'],
             stakeholder_title=stakeholder['title'],
             stakeholder_details=stakeholder['details'],
-            report=report
+            report=passages
         )
         
\ No newline at end of file
@@ -22,3 +22,41 @@ Research Report:
 {report}
 
 Extract and return the relevant excerpts. If the stakeholder is not mentioned directly, extract information related to their role and responsibilities. Keep the extracted content concise but informative (2-4 paragraphs maximum)."""
+
+BATCH_CONTEXT_EXTRACTION_PROMPT = """You are an expert research analyst. Your task is to extract relevant information from a research report for each stakeholder in a roster.
+
+For every stakeholder below, identify and extract the sections of the research report that would be useful for crafting a personalized email to that person.
+
+Focus on:
+- Information directly related to their responsibilities
+- Projects or initiatives they are involved in
+- Challenges or opportunities in their area
+- Recent achievements or developments
+- Any quotes or mentions of this person
+
+Stakeholders:
+{stakeholder_roster}
+
+Research Report:
+{report}
+
+If a stakeholder is not mentioned directly, extract information related to their role and responsibilities. Keep each stakeholder's extracted content concise but informative (2-4 paragraphs maximum).
+
+Return ONLY a JSON object that maps every stakeholder ID to a string with their relevant excerpts, with no markdown formatting:
+{{"S1": "excerpts for S1...", "S2": "excerpts for S2..."}}"""
+
+ENGAGEMENT_INDEX_PROMPT = """You are an expert research analyst. The excerpts below come from a hospital research report. Some of them give recommendations for engaging specific stakeholders.
+
+For every person the excerpts give engagement recommendations for, record:
+- communication_style: How to communicate with them (e.g. data-driven, relationship-focused, urgency-driven), in one short phrase
+- decision_triggers: What moves them to act (e.g. peer validation, quality penalties, published outcomes)
+- pain_points: The problems the report says they face
+- priorities: The goals or initiatives they care about
+
+Only use what the excerpts state about that person. Leave a field empty ("" or []) when the excerpts say nothing about it, and leave out people without any recommendation. Keep every item under 15 words.
+
+Report Excerpts:
+{engagement_excerpts}
+
+Return ONLY a JSON array, with no markdown formatting:
+[{{"name": "Full Name", "communication_style": "...", "decision_triggers": ["..."], "pain_points": ["..."], "priorities": ["..."]}}]"""
@@ -0,0 +1,70 @@
+"""
+Unit tests for the report artifact store
+"""
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from utils.artifact_store import ReportArtifactStore, artifact_version, content_hash, context_artifact
+
+REPORT = "MedStar Franklin Square is a 380-bed teaching hospital. Kim Schwenk leads the sepsis program."
+
+class TestArtifactStore:
+    """Test suite for ReportArtifactStore"""
+
+    def test_identical_content_reuses_artifact(self, tmp_path):
+        """Test that an artifact stored by one process is found by a fresh store for the same content"""
+        version = artifact_version("model-a", "prompt v1")
+        ReportArtifactStore(str(tmp_path)).put(content_hash(REPORT), "extraction", version, {"stakeholders": []})
+
+        store = ReportArtifactStore(str(tmp_path))
+
+        assert store.get(content_hash(REPORT), "extraction", version) == {"stakeholders": []}
+        assert store.get(content_hash(REPORT + " "), "extraction", version) is None
+        assert (store.hits, store.misses) == (1, 1)
+
+    def test_new_prompt_or_model_invalidates(self, tmp_path):
+        """Test that an artifact produced by another prompt or model version is stale"""
+        store = ReportArtifactStore(str(tmp_path))
+        key = content_hash(REPORT)
+        store.put(key, "extraction", artifact_version("model-a", "prompt v1"), "old")
+
+        assert store.get(key, "extraction", artifact_version("model-a", "prompt v2")) is None
+        assert store.get(key, "extraction", artifact_version("model-b", "prompt v1")) is None
+        assert store.stale == 2
+
+        store.put(key, "extraction", artifact_version("model-a", "prompt v2"), "new")
+        assert ReportArtifactStore(str(tmp_path)).get(key, "extraction", artifact_version("model-a", "prompt v2")) == "new"
+
+    def test_bytes_and_text_hash_alike(self):
+        """Test that file bytes and the decoded text of the same content share a hash"""
+        assert content_hash(REPORT) == content_hash(REPORT.encode('utf-8'))
+
+    def test_context_artifacts_per_stakeholder(self, tmp_path):
+        """Test that every stakeholder's context is a separate artifact of the report"""
+        store = ReportArtifactStore(str(tmp_path))
+        key = content_hash(REPORT)
+        kim = {"name": "Kim Schwenk", "title": "Sepsis Coordinator", "details": ""}
+        stuart = {"name": "Stuart Levine", "title": "President", "details": ""}
+        store.put(key, context_artifact(kim), "v1", "Kim leads the sepsis program.")
+
+        assert store.get(key, context_artifact(kim), "v1") == "Kim leads the sepsis program."
+        assert store.get(key, context_artifact(stuart), "v1") is None
+
+    def test_clear_and_memory_only(self, tmp_path):
+        """Test that clear drops a report's artifacts and that a store without a directory works in memory"""
+        store = ReportArtifactStore(str(tmp_path))
+        key = content_hash(REPORT)
+        store.put(key, "text", "1", REPORT)
+        store.clear(key)
+        assert store.get(key, "text", "1") is None
+
+        memory = ReportArtifactStore(None)
+        memory.put(key, "text", "1", REPORT)
+        assert memory.get(key, "text", "1") == REPORT
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,138 @@
+"""
+Unit tests for the batch orchestrator
+"""
+import asyncio
+import json
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from agents.batch_orchestrator import BatchOrchestrator, load_manifest, select_stakeholders
+from utils.llm_limits import LLMGate
+from utils.stakeholder_dedupe import dedupe_stakeholders
+
+STAKEHOLDERS = [
+    {"name": "Kim Schwenk", "title": "Sepsis Coordinator", "details": ""},
+    {"name": "Stuart Levine", "title": "President", "details": ""},
+    {"name": "Garo Ghazarian", "title": "ED Medical Director", "details": ""},
+]
+
+class FakeOrchestrator:
+    """OrchestratorAgent stand-in that makes one gated LLM call per email"""
+    def __init__(self, gate, fail_on=None):
+        self.client = gate.wrap(self)
+        self.fail_on = fail_on
+        self.report_content = None
+
+    def get_completion(self, messages, max_tokens=2048):
+        return "x" * 400
+
+    def _dedupe_stakeholders(self, stakeholders):
+        return dedupe_stakeholders(stakeholders)[0]
+
+    def _load_report(self, report_input):
+        self.report_content = report_input['content']
+        return self.report_content
+
+    async def extract_stakeholders_and_summary(self, report):
+        if self.fail_on and self.fail_on in report:
+            raise RuntimeError("extraction failed")
+        return STAKEHOLDERS + [{"name": "Kim Schwenk, MSN, RN", "title": "Sepsis Coordinator", "details": ""}], \
+            "A teaching hospital."
+
+    async def generate_emails_for_selected_stakeholders(self, report_input, selected_stakeholders, company_summary,
+                                                        generation_mode, mode_config):
+        emails = []
+        for stakeholder in self._dedupe_stakeholders(selected_stakeholders):
+            await asyncio.to_thread(self.client.get_completion, [{"role": "user", "content": "y" * 400}])
+            emails.append({"stakeholder_name": stakeholder['name'], "generation_mode": generation_mode,
+                           "mode_config": mode_config})
+        return emails
+
+def write_manifest(tmp_path, reports, defaults=None):
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (tmp_path / name).write_text(f"Report {name}")
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps({"defaults": defaults or {"generation_mode": "ai_style"}, "reports": reports}))
+    return str(path)
+
+class TestManifest:
+    """Test suite for manifest loading and stakeholder selection"""
+
+    def test_defaults_and_ids(self, tmp_path):
+        """Test that defaults apply, paths resolve against the manifest and ids default to file names"""
+        entries = load_manifest(write_manifest(tmp_path, [
+            {"path": "a.txt"},
+            {"id": "B report", "path": "b.txt", "generation_mode": "template", "mode_config": {"template_key": "t"}},
+        ], defaults={"generation_mode": "ai_style", "mode_config": {"style_key": "casual"}}))
+
+        assert [e['id'] for e in entries] == ["a", "B-report"]
+        assert entries[0]['path'] == str(tmp_path / "a.txt")
+        assert entries[0]['mode_config'] == {"style_key": "casual"}
+        assert entries[1]['generation_mode'] == "template"
+
+    def test_duplicate_ids_rejected(self, tmp_path):
+        """Test that two reports with one id are rejected"""
+        with pytest.raises(ValueError):
+            load_manifest(write_manifest(tmp_path, [{"path": "a.txt"}, {"path": "a.txt"}]))
+
+    def test_select_stakeholders(self):
+        """Test selection by name (credentials ignored) and by count"""
+        assert [s['name'] for s in select_stakeholders(STAKEHOLDERS, {"stakeholders": ["Dr. Garo Ghazarian, MD"]})] \
+            == ["Garo Ghazarian"]
+        assert len(select_stakeholders(STAKEHOLDERS, {"max_stakeholders": 2})) == 2
+
+class TestBatchOrchestrator:
+    """Test suite for BatchOrchestrator"""
+
+    def run_batch(self, tmp_path, gate, reports, fail_on=None, rerun=False):
+        entries = load_manifest(write_manifest(tmp_path, reports))
+        batch = BatchOrchestrator(str(tmp_path / "out"), max_reports=2, rerun=rerun, gate=gate,
+                                  orchestrator_factory=lambda: FakeOrchestrator(gate, fail_on))
+        return asyncio.run(batch.run(entries))
+
+    def test_results_directory_and_summary(self, tmp_path):
+        """Test that every report gets its results and a failing report does not stop the batch"""
+        gate = LLMGate(max_concurrency=2)
+        summary = self.run_batch(tmp_path, gate, [{"path": "a.txt"}, {"path": "b.txt", "max_stakeholders": 1},
+                                                  {"path": "c.txt"}], fail_on="c.txt")
+
+        assert summary['counts'] == {"complete": 2, "failed": 1}
+        out = tmp_path / "out"
+        assert len(json.loads((out / "a" / "emails.json").read_text())) == 3
+        result = json.loads((out / "b" / "result.json").read_text())
+        assert result['emails'] == 1
+        assert result['llm']['calls'] == 1
+        assert json.loads((out / "c" / "result.json").read_text())['error'] == "extraction failed"
+        assert json.loads((out / "summary.json").read_text())['finished'] == 3
+        assert gate.usage['calls'] == 4
+
+    def test_rerun_skips_completed_reports(self, tmp_path):
+        """Test that a second run with the same output directory only runs unfinished reports"""
+        gate = LLMGate()
+        self.run_batch(tmp_path, gate, [{"path": "a.txt"}, {"path": "c.txt"}], fail_on="c.txt")
+        summary = self.run_batch(tmp_path, gate, [{"path": "a.txt"}, {"path": "c.txt"}])
+
+        assert [r.get('skipped') for r in summary['results'] if r['id'] == "a"] == ["already complete"]
+        assert summary['counts'] == {"complete": 2}
+        assert gate.usage['calls'] == 6
+
+    def test_budget_skips_remaining_reports(self, tmp_path):
+        """Test that reports starting after the budget is spent are skipped"""
+        gate = LLMGate(token_budget=400)
+        entries = load_manifest(write_manifest(tmp_path, [{"path": "a.txt"}, {"path": "b.txt"}]))
+        batch = BatchOrchestrator(str(tmp_path / "out"), max_reports=1, gate=gate,
+                                  orchestrator_factory=lambda: FakeOrchestrator(gate))
+
+        summary = asyncio.run(batch.run(entries))
+
+        statuses = {r['id']: r['status'] for r in summary['results']}
+        assert statuses["a"] == "failed"
+        assert "budget" in summary['results'][0]['error']
+        assert statuses["b"] == "skipped"
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
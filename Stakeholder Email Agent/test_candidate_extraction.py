@@ -0,0 +1,105 @@
+"""
+Unit tests for candidate stakeholder pre-extraction
+"""
+import json
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from agents.candidate_extraction import CandidateExtractor, score_line, select_candidate_windows
+from tests.fixtures.mock_llm import ScriptedLLMClient
+
+FILLER = "Sepsis bundle compliance improved after the workflow changes were adopted across units.\n" * 12
+REPORT = (
+    "MedStar Franklin Square is a 380-bed teaching hospital in Baltimore.\n"
+    + FILLER
+    + "Key contacts:\n"
+    "- Kim Schwenk, MSN, RN - Sepsis Coordinator\n"
+    "- Stuart Levine - President\n"
+    + FILLER
+    + "Dr. Garo Ghazarian leads the emergency department physicians.\n"
+    + FILLER
+    + "References\n"
+    "1. Rhee Chanu, Dantes Raymund. Incidence and Trends of Sepsis in US Hospitals.\n"
+)
+
+class TestScoreLine:
+    """Test suite for score_line"""
+
+    @pytest.mark.parametrize("line", [
+        "- Kim Schwenk, MSN, RN - Sepsis Coordinator",
+        "Dr. Garo Ghazarian leads the emergency department physicians.",
+        "Christopher B. Thomas 1,2,3 , Benjamin Wyler 4",
+        "### Lisa Rodriguez - Director of Nursing",
+    ])
+    def test_stakeholder_lines_are_candidates(self, line):
+        """Test that credentials, honorifics, titles, name lists and list items score as candidates"""
+        assert score_line(line) >= 2
+
+    @pytest.mark.parametrize("line", [
+        "Sepsis bundle compliance improved after the workflow changes were adopted across units.",
+        "Strategic Priorities:",
+        "The Emergency Department sees 80,000 visits a year.",
+    ])
+    def test_other_lines_are_not(self, line):
+        """Test that headings and prose without people stay below the threshold"""
+        assert score_line(line) < 2
+
+class TestSelectCandidateWindows:
+    """Test suite for select_candidate_windows"""
+
+    def test_windows_keep_people_and_drop_filler(self):
+        """Test that every named person survives while most of the report is dropped"""
+        selection = select_candidate_windows(REPORT, context_lines=1)
+
+        for name in ("Kim Schwenk", "Stuart Levine", "Garo Ghazarian"):
+            assert name in selection["text"]
+        assert selection["coverage"] < 0.3
+        assert len(selection["windows"]) == 2
+
+    def test_reference_list_skipped(self):
+        """Test that cited authors after the reference heading are not candidates"""
+        selection = select_candidate_windows(REPORT, context_lines=1)
+
+        assert "Rhee Chanu" not in selection["text"]
+
+    def test_no_candidates(self):
+        """Test that a report without people yields no windows"""
+        selection = select_candidate_windows(FILLER)
+
+        assert selection == {"windows": [], "text": "", "candidates": 0, "coverage": 0.0}
+
+class TestCandidateExtractor:
+    """Test suite for CandidateExtractor"""
+
+    def test_only_windows_sent(self):
+        """Test that the prompt holds the candidate windows instead of the full report"""
+        client = ScriptedLLMClient(json.dumps([{"name": "Kim Schwenk", "title": "Sepsis Coordinator"}]))
+
+        stakeholders = CandidateExtractor(client, context_lines=1).extract(REPORT)
+
+        assert stakeholders == [{"name": "Kim Schwenk", "title": "Sepsis Coordinator", "details": ""}]
+        assert "Stuart Levine" in client.prompts[0]
+        assert client.prompts[0].count("Sepsis bundle compliance") < FILLER.count("\n")
+
+    def test_full_report_when_windows_do_not_shrink_it(self):
+        """Test that dense reports and reports without candidates skip the pre-pass"""
+        client = ScriptedLLMClient("[]")
+        extractor = CandidateExtractor(client, max_coverage=0.5)
+
+        assert extractor.extract("- Kim Schwenk, MSN, RN - Sepsis Coordinator\n") is None
+        assert extractor.extract(FILLER) is None
+        assert client.prompts == []
+
+    def test_empty_response_falls_back(self):
+        """Test that an empty or unusable response signals the caller to read the full report"""
+        client = ScriptedLLMClient("[]")
+
+        assert CandidateExtractor(client, context_lines=1).extract(REPORT) is None
+        assert len(client.prompts) == 1
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
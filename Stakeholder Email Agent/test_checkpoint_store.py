@@ -0,0 +1,109 @@
+"""
+Unit tests for workflow checkpoints and resume
+"""
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from agents.email_writer import EmailWriterAgent
+from agents.pipeline import StageLimiter, StakeholderPipeline
+from utils.checkpoint_store import CheckpointStore, checkpoint_key, run_fingerprint
+from tests.fixtures.mock_llm import MockLLMClient
+from tests.fixtures.test_data import SAMPLE_TASK
+
+STAKEHOLDERS = [{"id": 7, "name": "Jane Doe", "title": "CMO"}, {"id": 8, "name": "John Roe", "title": "CFO"}]
+
+class FlakyWriter:
+    """Writer stand-in that fails for the stakeholders listed in `failing`"""
+    def __init__(self, failing, calls):
+        self.failing = failing
+        self.calls = calls
+        self.stage_limiter = None
+        self.checkpoint = None
+
+    async def run(self, task):
+        self.calls.append(task["stakeholder_name"])
+        if task["stakeholder_name"] in self.failing:
+            raise RuntimeError("LLM call timed out")
+        return {"stakeholder_name": task["stakeholder_name"], "email_subject": "Hello"}
+
+def make_pipeline(checkpoints, failing, prepared, calls):
+    async def prepare_task(index, stakeholder, limiter):
+        prepared.append(stakeholder["name"])
+        return {"stakeholder_name": stakeholder["name"]}
+
+    return StakeholderPipeline(prepare_task, lambda i: FlakyWriter(failing, calls), StageLimiter(),
+                               checkpoints=checkpoints)
+
+class TestCheckpointStore:
+    """Test suite for CheckpointStore"""
+
+    def test_stages_persist_across_processes(self, tmp_path):
+        """Test that stage outputs written by one run are read back by the next"""
+        checkpoints = CheckpointStore(str(tmp_path)).open(42, "abc")
+        checkpoints.for_stakeholder(STAKEHOLDERS[0], 0).put("draft", {"subject": "Hi"})
+
+        reopened = CheckpointStore(str(tmp_path)).open(42, "abc")
+
+        assert reopened.for_stakeholder(STAKEHOLDERS[0], 0).get("draft") == {"subject": "Hi"}
+        assert reopened.for_stakeholder(STAKEHOLDERS[1], 1).get("draft") is None
+
+    def test_changed_inputs_discard_checkpoint(self, tmp_path):
+        """Test that a different report or configuration starts the workflow over"""
+        store = CheckpointStore(str(tmp_path))
+        first = run_fingerprint("report", "summary", "ai_style", {"style": "formal"})
+        store.open(42, first).for_stakeholder(STAKEHOLDERS[0], 0).put("final", {"email_subject": "Hi"})
+
+        second = run_fingerprint("report", "summary", "ai_style", {"style": "casual"})
+
+        assert store.open(42, second).for_stakeholder(STAKEHOLDERS[0], 0).get("final") is None
+        assert store.open(42, first).get(checkpoint_key(STAKEHOLDERS[0], 0), "final") is None
+
+    def test_unknown_stage_rejected(self, tmp_path):
+        """Test that only the documented stages can be checkpointed"""
+        checkpoints = CheckpointStore(str(tmp_path)).open(1, "abc")
+
+        with pytest.raises(ValueError):
+            checkpoints.put("id:7", "refine", {})
+
+class TestPipelineResume:
+    """Test suite for resuming a checkpointed pipeline"""
+
+    @pytest.mark.asyncio
+    async def test_rerun_only_processes_failed_stakeholders(self, tmp_path):
+        """Test that a re-run skips finished stakeholders and reuses their prepared context"""
+        store = CheckpointStore(str(tmp_path))
+        prepared, calls = [], []
+        first = await make_pipeline(store.open(5, "abc"), {"John Roe"}, prepared, calls).run(STAKEHOLDERS)
+        assert first[1]["email_subject"] == "ERROR"
+
+        prepared, calls = [], []
+        second = await make_pipeline(store.open(5, "abc"), set(), prepared, calls).run(STAKEHOLDERS)
+
+        assert [email["email_subject"] for email in second] == ["Hello", "Hello"]
+        assert second[0]["stakeholder_id"] == 7
+        assert calls == ["John Roe"]
+        assert prepared == []
+
+    @pytest.mark.asyncio
+    async def test_writer_resumes_from_checkpointed_draft(self, tmp_path):
+        """Test that a checkpointed draft skips the generate stage"""
+        checkpoint = CheckpointStore(str(tmp_path)).open(9, "abc").for_stakeholder(STAKEHOLDERS[0], 0)
+        checkpoint.put("draft", {"subject": "Checkpointed subject", "body": "Checkpointed body"})
+        agent = EmailWriterAgent("EmailWriter")
+        agent.llm_client = MockLLMClient()
+        agent.stage_limiter = StageLimiter()
+        agent.checkpoint = checkpoint
+
+        result = await agent.run(SAMPLE_TASK.copy())
+
+        assert agent.stage_limiter.stats["generate"]["calls"] == 0
+        assert agent.stage_limiter.stats["evaluate"]["calls"] >= 1
+        assert checkpoint.get("evaluation") is not None
+        assert result["email_subject"] != "ERROR"
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,83 @@
+"""
+Unit tests for combined stakeholder and company summary extraction
+"""
+import json
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from agents.combined_extraction import (
+    CombinedExtractor, ExtractionSchemaError, parse_json_response, validate_combined_extraction
+)
+from tests.fixtures.mock_llm import ScriptedLLMClient
+
+VALID_RESPONSE = json.dumps({
+    "stakeholders": [
+        {"name": " Kim Schwenk ", "title": "Sepsis Coordinator", "details": "Leads the sepsis program."},
+        {"name": "Stuart Levine", "title": None, "details": "President."},
+    ],
+    "company_summary": "MedStar Franklin Square is a 380-bed teaching hospital.",
+})
+
+class TestValidateCombinedExtraction:
+    """Test suite for the combined extraction schema"""
+
+    def test_valid_response_normalized(self):
+        """Test that names are stripped and missing fields become empty strings"""
+        result = validate_combined_extraction(json.loads(VALID_RESPONSE))
+
+        assert result["stakeholders"][0]["name"] == "Kim Schwenk"
+        assert result["stakeholders"][1]["title"] == ""
+        assert result["dropped"] == 0
+
+    def test_malformed_stakeholders_dropped(self):
+        """Test that entries without a name are dropped rather than failing the response"""
+        data = {"stakeholders": [{"title": "CFO"}, "Jane", {"name": "Jane Doe"}], "company_summary": "Summary."}
+
+        result = validate_combined_extraction(data)
+
+        assert [s["name"] for s in result["stakeholders"]] == ["Jane Doe"]
+        assert result["dropped"] == 2
+
+    @pytest.mark.parametrize("data", [
+        None,
+        [],
+        {"stakeholders": [], "company_summary": "  "},
+        {"stakeholders": {"name": "Jane"}, "company_summary": "Summary."},
+        {"company_summary": "Summary."},
+    ])
+    def test_invalid_shapes_rejected(self, data):
+        """Test that a wrong top-level shape or a missing summary is a schema error"""
+        with pytest.raises(ExtractionSchemaError):
+            validate_combined_extraction(data)
+
+    def test_parse_json_response_strips_fences(self):
+        """Test that code fences and surrounding text are tolerated"""
+        assert parse_json_response('Here you go:\n```json\n{"a": 1}\n```') == {"a": 1}
+        assert parse_json_response("no json here") is None
+
+class TestCombinedExtractor:
+    """Test suite for CombinedExtractor"""
+
+    def test_single_call_returns_both(self):
+        """Test that one call with the report yields stakeholders and the summary"""
+        client = ScriptedLLMClient(VALID_RESPONSE)
+
+        result = CombinedExtractor(client).extract("Report text about MedStar.")
+
+        assert len(client.prompts) == 1
+        assert "Report text about MedStar." in client.prompts[0]
+        assert len(result["stakeholders"]) == 2
+        assert result["company_summary"].startswith("MedStar")
+
+    def test_invalid_response_returns_none(self):
+        """Test that an unusable response signals the caller to fall back"""
+        client = ScriptedLLMClient('[{"name": "Kim Schwenk"}]')
+
+        assert CombinedExtractor(client).extract("Report text.") is None
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
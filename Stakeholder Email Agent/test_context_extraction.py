@@ -0,0 +1,117 @@
+"""
+Unit tests for batched multi-stakeholder context extraction
+"""
+import json
+import re
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from agents.context_extraction import BatchContextExtractor, stakeholder_key
+from utils.report_index import ContextRetriever
+from tests.fixtures.mock_llm import MockLLMClient
+from tests.fixtures.test_data import SAMPLE_RESEARCH_REPORT
+
+def make_roster(count):
+    return [
+        {"name": f"Person {i}", "title": f"Director {i}", "details": "Sepsis program"}
+        for i in range(count)
+    ]
+
+class RosterLLMClient(MockLLMClient):
+    """Mock client that answers a batched prompt with excerpts for every roster ID"""
+    def __init__(self, skip_ids=(), fail_above=None, raise_error=None):
+        super().__init__()
+        self.skip_ids = set(skip_ids)
+        self.fail_above = fail_above
+        self.raise_error = raise_error
+        self.batch_sizes = []
+
+    def get_completion(self, messages, max_tokens=2048, temperature=0.7):
+        self.call_count += 1
+        self.last_messages = messages
+        ids = re.findall(r"^(S\d+): ", messages[0]["content"], re.MULTILINE)
+        self.batch_sizes.append(len(ids))
+        if self.raise_error is not None:
+            raise self.raise_error
+        if self.fail_above is not None and len(ids) > self.fail_above:
+            return '{"S1": "truncated respon'
+        return json.dumps({sid: f"Excerpts for {sid}" for sid in ids if sid not in self.skip_ids})
+
+class TestBatchContextExtractor:
+    """Test suite for BatchContextExtractor"""
+
+    def make_extractor(self, client, max_output_tokens=8192):
+        return BatchContextExtractor(
+            client,
+            max_output_tokens=max_output_tokens,
+            tokens_per_stakeholder=450,
+            retriever=ContextRetriever(mode="full")
+        )
+
+    def test_single_call_for_roster(self):
+        """Test that a roster within the output budget is extracted in one call"""
+        client = RosterLLMClient()
+        roster = make_roster(5)
+
+        results = self.make_extractor(client).extract(roster, SAMPLE_RESEARCH_REPORT)
+
+        assert client.call_count == 1
+        assert len(results) == 5
+        assert results[stakeholder_key(roster[2])] == "Excerpts for S3"
+
+    def test_roster_split_by_output_budget(self):
+        """Test that batches are sized to the output token budget"""
+        client = RosterLLMClient()
+        roster = make_roster(7)
+
+        results = self.make_extractor(client, max_output_tokens=1350).extract(roster, SAMPLE_RESEARCH_REPORT)
+
+        assert client.batch_sizes == [3, 3, 1]
+        assert len(results) == 7
+
+    def test_unparseable_batch_is_split(self):
+        """Test that a truncated batch response is retried as two smaller batches"""
+        client = RosterLLMClient(fail_above=2)
+        roster = make_roster(4)
+
+        results = self.make_extractor(client).extract(roster, SAMPLE_RESEARCH_REPORT)
+
+        assert client.batch_sizes == [4, 2, 2]
+        assert len(results) == 4
+
+    def test_missing_entries_omitted(self):
+        """Test that stakeholders missing from the response are left for individual retry"""
+        client = RosterLLMClient(skip_ids={"S2"})
+        roster = make_roster(3)
+
+        results = self.make_extractor(client).extract(roster, SAMPLE_RESEARCH_REPORT)
+
+        assert stakeholder_key(roster[1]) not in results
+        assert len(results) == 2
+        assert client.call_count == 1
+
+    def test_failed_call_leaves_batch_missing(self):
+        """Test that an LLM error leaves the batch to individual extraction instead of raising"""
+        client = RosterLLMClient(raise_error=TimeoutError("LLM request timed out"))
+        roster = make_roster(3)
+
+        results = self.make_extractor(client).extract(roster, SAMPLE_RESEARCH_REPORT)
+
+        assert results == {}
+        assert client.batch_sizes == [3]
+
+    @pytest.mark.asyncio
+    async def test_extract_async(self):
+        """Test the non-blocking variant"""
+        client = RosterLLMClient()
+
+        results = await self.make_extractor(client).extract_async(make_roster(2), SAMPLE_RESEARCH_REPORT)
+
+        assert len(results) == 2
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,97 @@
+"""
+Unit tests for the token-budgeted context packer
+"""
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from utils.context_packer import ContextPacker, get_context_budget
+from utils.tokens import estimate_tokens
+from tests.fixtures.test_data import SAMPLE_TASK
+
+PRODUCT_REPORT = "\n\n".join([
+    "# IntelliSep Overview",
+    "IntelliSep is a rapid host-response test that stratifies sepsis risk in the emergency department within ten minutes.",
+] + [f"Filler paragraph {i}: vendor{i} shipped crate{i} to depot{i} along route{i} for region{i}." for i in range(40)] + [
+    "## Laboratory Workflow",
+    "The assay runs on a standard EDTA tube and fits the existing hematology workflow of the hospital laboratory.",
+    "## Pricing",
+    "Reimbursement is available under the NTAP program and the test is priced per patient encounter.",
+])
+
+ROLE_CONTEXT = "## Lab Director / Pathologist\nLab directors care about turnaround time, assay validation and laboratory workflow integration."
+
+def make_task(**overrides):
+    task = SAMPLE_TASK.copy()
+    task.update({
+        "stakeholder_title": "Laboratory Director",
+        "stakeholder_details": "Owns hematology workflow and assay validation",
+        "relevant_context": "The laboratory team is currently short-staffed. Turnaround time for lactate is 90 minutes.",
+        "company_summary": "Memorial is a 400-bed hospital. The laboratory team is currently short-staffed!",
+    })
+    task.update(overrides)
+    return task
+
+class TestContextPacker:
+    """Test suite for ContextPacker"""
+
+    def test_evidence_kept_and_duplicates_removed(self):
+        """Test that evidence is kept while duplicated sentences are sent once"""
+        packed = ContextPacker(budget_tokens=2000).pack(make_task(), PRODUCT_REPORT, ROLE_CONTEXT)
+
+        assert "Turnaround time for lactate is 90 minutes." in packed["relevant_context"]
+        assert "The laboratory team is currently short-staffed." in packed["relevant_context"]
+        assert "short-staffed" not in packed["company_summary"]
+        assert "400-bed hospital" in packed["company_summary"]
+
+    def test_budget_respected(self):
+        """Test that the packed context stays within the budget"""
+        packer = ContextPacker(budget_tokens=400)
+
+        packed = packer.pack(make_task(), PRODUCT_REPORT, ROLE_CONTEXT)
+
+        assert packed["tokens"] <= 400
+        assert packed["tokens"] < estimate_tokens(PRODUCT_REPORT)
+
+    def test_relevant_snippets_ranked_first(self):
+        """Test that snippets matching the stakeholder are chosen over filler"""
+        packed = ContextPacker(budget_tokens=300, min_reference_tokens=0).pack(make_task(), PRODUCT_REPORT, ROLE_CONTEXT)
+
+        assert "hematology workflow" in packed["product_report_excerpt"]
+        assert "Filler paragraph 20" not in packed["product_report_excerpt"]
+        assert "turnaround time" in packed["role_context_excerpt"]
+
+    def test_remaining_budget_filled(self):
+        """Test that snippets without query terms still fill the unused budget"""
+        packed = ContextPacker(budget_tokens=600, min_reference_tokens=0).pack(make_task(), PRODUCT_REPORT, ROLE_CONTEXT)
+
+        assert "Filler paragraph 0" in packed["product_report_excerpt"]
+        assert packed["tokens"] > 450
+
+    def test_headers_attached_to_snippets(self):
+        """Test that markdown headers travel with the snippet that follows them"""
+        packed = ContextPacker(budget_tokens=300, min_reference_tokens=0).pack(make_task(), PRODUCT_REPORT, ROLE_CONTEXT)
+
+        assert "## Laboratory Workflow\n\nThe assay runs" in packed["product_report_excerpt"]
+
+    def test_fallback_to_report_opening(self):
+        """Test that an unrelated stakeholder still gets the opening of the product report"""
+        task = make_task(stakeholder_title="Zyxwv", stakeholder_details="", relevant_context="")
+
+        packed = ContextPacker(budget_tokens=300).pack(task, PRODUCT_REPORT, "")
+
+        assert packed["product_report_excerpt"].startswith("# IntelliSep Overview")
+
+    def test_context_budget_override(self, monkeypatch):
+        """Test per-model budgets and the environment override"""
+        monkeypatch.delenv("CONTEXT_TOKEN_BUDGET", raising=False)
+        assert get_context_budget("google/gemini-2.5-flash") == 2000
+
+        monkeypatch.setenv("CONTEXT_TOKEN_BUDGET", "1234")
+        assert get_context_budget("google/gemini-2.5-flash") == 1234
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
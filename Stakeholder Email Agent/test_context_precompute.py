@@ -0,0 +1,83 @@
+"""
+Unit tests for speculative context precomputation
+"""
+import asyncio
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from agents.context_extraction import stakeholder_key
+from agents.context_precompute import ContextPrecomputer
+
+REPORT = "Kim Schwenk leads the sepsis program. Stuart Levine is the President. Dr. Garo Ghazarian runs the ED."
+ROSTER = [
+    {"name": "Kim Schwenk", "title": "Sepsis Coordinator", "details": ""},
+    {"name": "Stuart Levine", "title": "President", "details": ""},
+    {"name": "Garo Ghazarian", "title": "ED Medical Director", "details": ""},
+]
+
+class FakeTaskPlanner:
+    """Stand-in for TaskPlannerAgent's context extraction and artifact storage"""
+    def __init__(self, stored=None, on_extract=None):
+        self.llm_client = None
+        self.stored = dict(stored or {})
+        self.extracted = []
+        self.on_extract = on_extract
+
+    def _load_context_artifacts(self, stakeholders, report):
+        return {stakeholder_key(s): self.stored[s['name']] for s in stakeholders if s['name'] in self.stored}
+
+    def _extract_relevant_context(self, stakeholder, report):
+        self.extracted.append(stakeholder['name'])
+        if self.on_extract:
+            self.on_extract(stakeholder)
+        return f"Context for {stakeholder['name']}"
+
+    def _store_context_artifact(self, stakeholder, report, task):
+        self.stored[stakeholder['name']] = task['relevant_context']
+
+class TestContextPrecomputer:
+    """Test suite for ContextPrecomputer"""
+
+    def test_stores_missing_contexts(self):
+        """Test that only stakeholders without a stored context are extracted, and all end up stored"""
+        planner = FakeTaskPlanner(stored={"Kim Schwenk": "Kim leads the sepsis program."})
+
+        stats = asyncio.run(ContextPrecomputer(planner, batch=False).run(ROSTER, REPORT))
+
+        assert planner.extracted == ["Stuart Levine", "Garo Ghazarian"]
+        assert set(planner.stored) == {"Kim Schwenk", "Stuart Levine", "Garo Ghazarian"}
+        assert stats == {"stakeholders": 3, "warm": 1, "computed": 2, "remaining": 0, "stopped": None}
+
+    def test_cancel_stops_before_next_extraction(self):
+        """Test that cancelling keeps the finished contexts and starts no further calls"""
+        planner = FakeTaskPlanner()
+        precomputer = ContextPrecomputer(planner, batch=False)
+        planner.on_extract = lambda stakeholder: precomputer.cancel("generation started")
+
+        stats = asyncio.run(precomputer.run(ROSTER, REPORT))
+
+        assert planner.extracted == ["Kim Schwenk"]
+        assert set(planner.stored) == {"Kim Schwenk"}
+        assert stats["stopped"] == "generation started"
+        assert stats["remaining"] == 2
+
+    def test_failed_extraction_does_not_stop_others(self):
+        """Test that one failing stakeholder is logged and the rest are still stored"""
+        def fail_for_stuart(stakeholder):
+            if stakeholder['name'] == "Stuart Levine":
+                raise RuntimeError("rate limited")
+
+        planner = FakeTaskPlanner(on_extract=fail_for_stuart)
+
+        stats = asyncio.run(ContextPrecomputer(planner, concurrency=2, batch=False).run(ROSTER, REPORT))
+
+        assert set(planner.stored) == {"Kim Schwenk", "Garo Ghazarian"}
+        assert stats["computed"] == 2
+        assert stats["remaining"] == 1
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,151 @@
+"""
+Unit tests for deadlines, cancellation and partial results
+"""
+import asyncio
+import time
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from agents.email_writer import EmailWriterAgent
+from agents.pipeline import StageLimiter, StakeholderPipeline
+from utils.deadlines import Deadline, DeadlineExceeded
+from tests.fixtures.mock_llm import MockLLMClient
+from tests.fixtures.test_data import SAMPLE_TASK
+
+class SlowAfterDraftLLMClient(MockLLMClient):
+    """Mock client whose calls after the first (the draft) take `delay` seconds"""
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+
+    def get_completion(self, messages, max_tokens=2048, temperature=0.7):
+        if self.call_count >= 1:
+            time.sleep(self.delay)
+        return super().get_completion(messages, max_tokens, temperature)
+
+class SleepyWriter:
+    """Writer stand-in that never produces a draft before its deadline"""
+    def __init__(self):
+        self.stage_limiter = None
+        self.checkpoint = None
+        self.deadline = None
+
+    async def run(self, task):
+        await asyncio.sleep(5)
+
+    def partial_result(self, task, reason):
+        return None
+
+async def prepare_task(index, stakeholder, limiter):
+    task = SAMPLE_TASK.copy()
+    task["stakeholder_name"] = stakeholder["name"]
+    return task
+
+class TestDeadline:
+    """Test suite for Deadline"""
+
+    def test_unbounded(self):
+        """Test that a deadline without a limit never expires"""
+        deadline = Deadline()
+
+        assert deadline.remaining() is None
+        deadline.check()
+
+    def test_child_bounded_by_parent(self):
+        """Test that a nested deadline expires no later than its parent"""
+        parent = Deadline(0.5)
+        child = Deadline(60, parent=parent)
+
+        assert child.remaining() <= 0.5
+
+    def test_cancel_propagates_to_children(self):
+        """Test that cancelling a workflow deadline stops every stakeholder under it"""
+        parent = Deadline(60)
+        child = Deadline(60, parent=parent)
+
+        parent.cancel("workflow cancelled")
+
+        assert child.expired
+        with pytest.raises(DeadlineExceeded):
+            child.check()
+
+class TestPipelineDeadlines:
+    """Test suite for deadlines in StakeholderPipeline"""
+
+    @pytest.mark.asyncio
+    async def test_stakeholder_deadline_returns_unevaluated_draft(self):
+        """Test that an evaluation running past the deadline yields the initial draft as partial"""
+        def writer_factory(index):
+            agent = EmailWriterAgent(f"EmailWriter-{index}")
+            agent.llm_client = SlowAfterDraftLLMClient(delay=0.5)
+            return agent
+
+        pipeline = StakeholderPipeline(prepare_task, writer_factory, StageLimiter(), stakeholder_seconds=0.2)
+        started = time.monotonic()
+        results = await pipeline.run([{"name": "Jane Doe"}])
+
+        assert time.monotonic() - started < 0.45
+        assert results[0]["status"] == "partial"
+        assert results[0]["email_subject"] != "ERROR"
+        assert "evaluation did not finish" in results[0]["reflection_notes"]
+
+    @pytest.mark.asyncio
+    async def test_late_response_discarded(self):
+        """Test that an LLM call finishing after the deadline raises instead of returning"""
+        agent = EmailWriterAgent("EmailWriter")
+        agent.llm_client = SlowAfterDraftLLMClient(delay=0.1)
+        agent.llm_client.call_count = 1
+        agent.deadline = Deadline(0.05)
+
+        with pytest.raises(DeadlineExceeded):
+            agent._get_completion([{"role": "user", "content": "evaluate"}])
+
+    @pytest.mark.asyncio
+    async def test_workflow_deadline_times_out_remaining_stakeholders(self):
+        """Test that stakeholders not finished by the workflow deadline are marked timed out"""
+        pipeline = StakeholderPipeline(prepare_task, lambda i: SleepyWriter(), StageLimiter(),
+                                       max_active=1, workflow_seconds=0.1)
+        started = time.monotonic()
+        results = await pipeline.run([{"name": "A"}, {"name": "B"}, {"name": "C"}])
+
+        assert time.monotonic() - started < 0.5
+        assert [r["status"] for r in results] == ["timed_out"] * 3
+        assert "workflow deadline exceeded" in results[0]["reflection_notes"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_shared_step_times_out_stakeholder(self):
+        """Test that a shared step cancelled by another stakeholder's deadline does not abort the run"""
+        shared = {}
+
+        async def prepare_shared(index, stakeholder, limiter):
+            if "batch" not in shared:
+                shared["batch"] = asyncio.ensure_future(asyncio.sleep(5))
+            await shared["batch"]  # not shielded, so the first deadline cancels it for everyone
+            return await prepare_task(index, stakeholder, limiter)
+
+        pipeline = StakeholderPipeline(prepare_shared, lambda i: SleepyWriter(), StageLimiter(),
+                                       max_active=1, stakeholder_seconds=0.1)
+        results = await pipeline.run([{"name": "A"}, {"name": "B"}])
+
+        assert [r["status"] for r in results] == ["timed_out", "timed_out"]
+        assert "shared step cancelled" in results[1]["reflection_notes"]
+
+    @pytest.mark.asyncio
+    async def test_completed_results_marked_complete(self):
+        """Test that emails finished within their deadline carry status complete"""
+        def writer_factory(index):
+            agent = EmailWriterAgent(f"EmailWriter-{index}")
+            agent.llm_client = MockLLMClient()
+            return agent
+
+        pipeline = StakeholderPipeline(prepare_task, writer_factory, StageLimiter(), stakeholder_seconds=5)
+        results = await pipeline.run([{"name": "Jane Doe"}])
+
+        assert results[0]["status"] == "complete"
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
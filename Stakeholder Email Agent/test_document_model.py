@@ -0,0 +1,112 @@
+"""
+Unit tests for the report document model
+"""
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from utils.artifact_store import ReportArtifactStore
+from utils.document_model import DocumentModel, find_metrics, load_document_model, store_document_model
+
+PAGE_1 = """Thomas Hospital Sepsis Review
+Prepared for the quality committee.
+
+1. Executive Summary
+The hospital treats 1,200 sepsis cases a year across its two campuses."""
+PAGE_2 = """2. Quality
+SEP-1 compliance was 54% in 2023, below the national average.
+
+2.1. Mortality
+Sepsis mortality fell to 11.2% after a 6 months improvement project.
+
+STAKEHOLDERS
+Kim Schwenk leads the sepsis program."""
+PAGE_3 = """| Measure | 2022 | 2023 |
+|---|---|---|
+| SEP-1 | 49% | 54% |
+| Mortality | 12.5% | 11.2% |
+
+3. Recommendations
+Start with a pilot in the emergency department."""
+REPORT = "\n".join([PAGE_1, PAGE_2, PAGE_3])
+PAGE_STARTS = [0, len(PAGE_1) + 1, len(PAGE_1) + len(PAGE_2) + 2]
+
+class TestDocumentModel:
+    """Test suite for DocumentModel"""
+
+    def test_headings_and_outline(self):
+        """Test that numbered, nested and all-caps headings become sections in order"""
+        document = DocumentModel.build(REPORT, page_starts=PAGE_STARTS)
+
+        headings = [(s['heading'], s['level']) for s in document.sections]
+        assert headings[0] == ("", 0)
+        assert ("1. Executive Summary", 1) in headings
+        assert ("2.1. Mortality", 2) in headings
+        assert ("STAKEHOLDERS", 1) in headings
+        assert "  2.1. Mortality (p. 2)" in document.outline().split("\n")
+        assert "3. Recommendations (p. 3)" in document.outline()
+
+    def test_pages_from_extractor(self):
+        """Test that page numbers and page text follow the extractor's page boundaries"""
+        document = DocumentModel.build(REPORT, page_starts=PAGE_STARTS)
+
+        assert document.page_count == 3
+        assert document.page_text(2) == PAGE_2
+        assert document.page_of(REPORT.index("Kim Schwenk")) == 2
+        assert document.page_text(4) == ""
+        assert [s['heading'] for s in document.sections_on_page(3)][-1] == "3. Recommendations"
+
+    def test_pages_from_form_feeds(self):
+        """Test that form feeds mark pages when the extractor gives no boundaries"""
+        document = DocumentModel.build("\f".join([PAGE_1, PAGE_2, PAGE_3]))
+
+        assert document.page_count == 3
+        assert document.find_section("Recommendations")['page'] == 3
+
+    def test_section_text(self):
+        """Test that a section includes its subsections unless asked otherwise"""
+        document = DocumentModel.build(REPORT)
+
+        quality = document.section_text("quality")
+        assert "SEP-1 compliance was 54%" in quality
+        assert "Sepsis mortality fell" in quality
+        assert "Kim Schwenk" not in quality
+        assert "Sepsis mortality" not in document.section_text("quality", include_subsections=False)
+        assert document.section_text("Finance") == ""
+
+    def test_tables(self):
+        """Test that pipe tables are found with their rows and page"""
+        document = DocumentModel.build(REPORT, page_starts=PAGE_STARTS)
+
+        assert len(document.tables) == 1
+        table = document.tables[0]
+        assert table['page'] == 3
+        assert table['rows'][0] == ["Measure", "2022", "2023"]
+        assert len(table['rows']) == 3
+
+    def test_metrics_per_section(self):
+        """Test that each section lists its numeric findings with their sentence"""
+        document = DocumentModel.build(REPORT)
+
+        metrics = document.find_section("Mortality")['metrics']
+        assert [m['value'] for m in metrics] == ["11.2%", "6 months"]
+        assert REPORT[metrics[0]['offset']:].startswith("11.2%")
+        assert metrics[0]['context'] == "Sepsis mortality fell to 11.2% after a 6 months improvement project."
+        assert find_metrics("No numbers here.") == []
+
+    def test_stored_model_round_trip(self):
+        """Test that the model stored at ingestion is loaded for the same text, pages included"""
+        store = ReportArtifactStore(None)
+        store_document_model(DocumentModel.build(REPORT, page_starts=PAGE_STARTS), store)
+
+        loaded = load_document_model(REPORT, store)
+
+        assert loaded.page_count == 3
+        assert loaded.section_text("Recommendations").startswith("3. Recommendations")
+        assert load_document_model(PAGE_1, store).page_count == 1
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
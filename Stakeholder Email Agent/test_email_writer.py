@@ -95,6 +95,69 @@ class TestEmailWriterAgent:
         # Check that refinement was attempted
         assert "refined" in result["reflection_notes"].lower() or "refine" in result["reflection_notes"].lower()
     
+    @pytest.mark.asyncio
+    async def test_multi_round_reflection_stops_on_plateau(self, agent):
+        """Test that iterative reflection exits early when scores stop improving"""
+        task = SAMPLE_TASK.copy()
+        task["mode_config"] = {
+            "style_key": "technical_direct",
+            "reflection": {"max_iterations": 3, "target_score": 10.0}
+        }
+        
+        result = await agent.run(task)
+        
+        trace = result["reflection_trace"]
+        assert trace["stop_reason"] == "plateau"
+        assert trace["iterations"] == 1
+        assert len(trace["evaluations"]) == 2
+        assert trace["tokens"] > 0
+    
+    @pytest.mark.asyncio
+    async def test_speculative_refinement_used_for_near_miss(self, agent):
+        """Test that a near-miss score uses the refinement started during evaluation"""
+        from agents.reflection import SpeculativeRefinementPolicy
+        agent.speculative_refinement = True
+        agent.speculation_policy = SpeculativeRefinementPolicy(acceptance_margin=1.5)
+        agent.quality_threshold = 9.5  # Mock score 8.6 falls inside the acceptance band
+        
+        result = await agent.run(SAMPLE_TASK)
+        
+        assert "speculatively" in result["reflection_notes"]
+        assert agent.speculation_policy.get_stats()["speculation_used"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_speculative_refinement_discarded_when_quality_passes(self, agent):
+        """Test that the speculative result is dropped when the draft passes"""
+        from agents.reflection import SpeculativeRefinementPolicy
+        agent.speculative_refinement = True
+        agent.speculation_policy = SpeculativeRefinementPolicy()
+        
+        result = await agent.run(SAMPLE_TASK)
+        
+        assert "no refinement needed" in result["reflection_notes"]
+        stats = agent.speculation_policy.get_stats()
+        assert stats["speculated"] == 1
+        assert stats["speculation_used"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_speculative_refinement_cancelled_when_evaluation_raises(self, agent):
+        """Test that a failing evaluation does not leave the speculative refinement running"""
+        from agents.reflection import SpeculativeRefinementPolicy
+        agent.speculative_refinement = True
+        agent.speculation_policy = SpeculativeRefinementPolicy()
+        
+        def failing_evaluation(email, task):
+            raise RuntimeError("evaluation failed")
+        agent._evaluate_email = failing_evaluation
+        
+        with pytest.raises(RuntimeError):
+            await agent.run(SAMPLE_TASK)
+        await asyncio.sleep(0)
+        
+        pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        assert pending == []
+        assert agent.speculation_policy.get_stats()["speculation_used"] == 0
+    
     @pytest.mark.asyncio
     async def test_error_handling_for_invalid_mode(self, agent):
         """Test error handling for invalid generation mode"""
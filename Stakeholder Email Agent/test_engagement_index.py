@@ -0,0 +1,98 @@
+"""
+Unit tests for the engagement suggestions index
+"""
+import json
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from agents.engagement_index import (
+    EngagementIndex, EngagementIndexer, apply_engagement_entry, engagement_excerpts, validate_entries
+)
+from prompts.custom_prompt_handler import CUSTOM_PROMPT_TEMPLATE
+from utils.artifact_store import ReportArtifactStore
+from tests.fixtures.mock_llm import ScriptedLLMClient
+
+FILLER = "\n".join(f"Unit {i} reported bundle compliance of {60 + i}% in quarter {i % 4}." for i in range(40))
+REPORT = FILLER + """
+Stakeholder Engagement Suggestions
+Kim Schwenk, MSN, RN prefers data-driven outreach backed by SEP-1 numbers.
+Her decision triggers are peer validation and CMS penalties.
+""" + FILLER
+
+KIM_ENTRY = {"name": "Kim Schwenk", "communication_style": "data-driven",
+             "decision_triggers": ["peer validation", "CMS penalties"], "pain_points": ["SEP-1 compliance"],
+             "priorities": []}
+
+class TestEngagementIndex:
+    """Test suite for the engagement index"""
+
+    def test_excerpts_keep_engagement_lines_only(self):
+        """Test that the pre-pass keeps the recommendation lines and skips reports without any"""
+        excerpts = engagement_excerpts(REPORT)
+
+        assert "prefers data-driven outreach" in excerpts
+        assert len(excerpts) < len(REPORT) / 5
+        assert engagement_excerpts(FILLER) == ""
+
+    def test_build_once_per_report(self):
+        """Test that the index is built with one call and reused for an identical report"""
+        store = ReportArtifactStore(None)
+        client = ScriptedLLMClient(json.dumps([KIM_ENTRY]))
+
+        index = EngagementIndexer(client, store=store).build(REPORT)
+        again = EngagementIndexer(client, store=store).build(REPORT)
+
+        assert client.call_count == 1
+        assert len(index) == len(again) == 1
+        assert "Decision triggers: peer validation; CMS penalties" in index.entry_text({"name": "Dr. Kim Schwenk, MSN"})
+
+    def test_no_recommendations_no_call(self):
+        """Test that a report without engagement lines gives an empty index without an LLM call"""
+        client = ScriptedLLMClient("[]")
+        store = ReportArtifactStore(None)
+
+        index = EngagementIndexer(client, store=store).build(FILLER)
+
+        assert client.call_count == 0
+        assert index.entry_text({"name": "Kim Schwenk"}) == ""
+
+    def test_unparseable_response(self):
+        """Test that a failed indexing call returns None so prompts keep their instructions"""
+        assert EngagementIndexer(ScriptedLLMClient("not json"), store=ReportArtifactStore(None)).build(REPORT) is None
+
+    def test_lookup_by_last_name(self):
+        """Test that a shortened first name still finds the entry and other people do not"""
+        index = EngagementIndex(validate_entries([KIM_ENTRY, {"name": "Stuart Levine"}]))
+
+        assert index.lookup({"name": "K. Schwenk"})["name"] == "Kim Schwenk"
+        assert index.lookup({"name": "Stuart Levine"}) is None
+        assert index.lookup({"name": "Tom Schwenk"}) is None
+
+class TestApplyEngagementEntry:
+    """Test suite for replacing the prompt instruction block"""
+
+    def test_entry_replaces_block(self):
+        """Test that the stakeholder's entry replaces the generic instructions"""
+        applied = apply_engagement_entry(CUSTOM_PROMPT_TEMPLATE, "Communication style: data-driven")
+
+        assert "If the research report includes engagement recommendations" not in applied
+        assert "Communication style: data-driven\n\n**User's Custom Instructions:" in applied
+        assert len(applied) < len(CUSTOM_PROMPT_TEMPLATE)
+
+    def test_empty_entry_removes_block(self):
+        """Test that stakeholders without recommendations get no engagement block"""
+        applied = apply_engagement_entry(CUSTOM_PROMPT_TEMPLATE, "")
+
+        assert "ENGAGEMENT SUGGESTIONS" not in applied
+        assert "{relevant_context}\n\n**User's Custom Instructions:" in applied
+
+    def test_prompt_without_block_unchanged(self):
+        """Test that prompts without the block are left alone"""
+        assert apply_engagement_entry("Write an email.", "Priorities: sepsis") == "Write an email."
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
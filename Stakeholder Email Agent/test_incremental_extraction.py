@@ -0,0 +1,141 @@
+"""
+Unit tests for incremental extraction of report revisions
+"""
+import json
+import pytest
+import sys
+import os
+import textwrap
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from agents.incremental_extraction import IncrementalExtractor
+from utils.near_duplicates import NearDuplicateIndex
+from tests.fixtures.mock_llm import ScriptedLLMClient
+
+PREVIOUS = [
+    {"name": "Kim Schwenk", "title": "Sepsis Coordinator", "details": "Leads the sepsis program."},
+    {"name": "Stuart Levine", "title": "President", "details": "Hospital president."},
+]
+
+def make_report(people):
+    sentences = []
+    for i in range(120):
+        sentences.append(f"Finding {i} describes bundle compliance in unit {i % 7} during quarter {i % 4}.")
+        if i in people:
+            sentences.append(people[i])
+    return textwrap.fill(" ".join(sentences), width=70)
+
+OLD_REPORT = make_report({20: "Kim Schwenk, MSN, RN is the Sepsis Coordinator.",
+                          90: "Stuart Levine is the President of the hospital."})
+
+def revise(new_report):
+    index = NearDuplicateIndex(None)
+    index.add("old", OLD_REPORT)
+    fingerprint = index.add("new", new_report)
+    return fingerprint, index.find("new", fingerprint)
+
+class TestIncrementalExtractor:
+    """Test suite for IncrementalExtractor"""
+
+    def test_only_changed_sections_sent(self):
+        """Test that a new person is extracted from the changed section and merged with provenance"""
+        new_report = make_report({20: "Kim Schwenk, MSN, RN is the Sepsis Coordinator.",
+                                  60: "Dr. Garo Ghazarian is the new ED Medical Director.",
+                                  90: "Stuart Levine is the President of the hospital."})
+        fingerprint, match = revise(new_report)
+        client = ScriptedLLMClient(json.dumps([{"name": "Garo Ghazarian", "title": "ED Medical Director"}]))
+
+        stakeholders = IncrementalExtractor(client).extract("new", fingerprint, match, PREVIOUS)
+
+        assert len(client.prompts) == 1
+        assert "Garo Ghazarian" in client.prompts[0]
+        assert "Stuart Levine" not in client.prompts[0]
+        assert [s["name"] for s in stakeholders] == ["Kim Schwenk", "Stuart Levine", "Garo Ghazarian"]
+        assert stakeholders[0]["provenance"] == {"source": "previous_version", "report_hash": "old"}
+        assert stakeholders[2]["provenance"]["source"] == "revision"
+        assert len(stakeholders[2]["provenance"]["sections"]) == 1
+
+    def test_update_merged_into_previous(self):
+        """Test that a re-extracted previous stakeholder keeps its entry and records the update"""
+        new_report = make_report({20: "Kim Schwenk, MSN, RN now also chairs the sepsis committee.",
+                                  90: "Stuart Levine is the President of the hospital."})
+        fingerprint, match = revise(new_report)
+        client = ScriptedLLMClient(json.dumps([
+            {"name": "Kim Schwenk", "title": "Sepsis Coordinator", "details": "Chairs the sepsis committee."}
+        ]))
+
+        stakeholders = IncrementalExtractor(client).extract("new", fingerprint, match, PREVIOUS)
+
+        assert len(stakeholders) == 2
+        assert stakeholders[0]["details"] == "Chairs the sepsis committee. Leads the sepsis program."
+        assert stakeholders[0]["provenance"]["updated_in"] == "new"
+
+    def test_revised_title_takes_precedence(self):
+        """Test that a title changed in the revision replaces the previous, longer title"""
+        previous = [dict(PREVIOUS[0], id=7, title="Interim Chief Nursing Officer"), PREVIOUS[1]]
+        new_report = make_report({20: "Kim Schwenk, MSN, RN is the Chief Nursing Officer.",
+                                  90: "Stuart Levine is the President of the hospital."})
+        fingerprint, match = revise(new_report)
+        client = ScriptedLLMClient(json.dumps([{"name": "Kim Schwenk", "title": "Chief Nursing Officer"}]))
+
+        stakeholders = IncrementalExtractor(client).extract("new", fingerprint, match, previous)
+
+        assert stakeholders[0]["id"] == 7
+        assert stakeholders[0]["title"] == "Chief Nursing Officer"
+        assert stakeholders[0]["details"] == "Leads the sepsis program."
+
+    def test_revision_of_revision_takes_precedence(self):
+        """Test that an entry first found in an earlier revision still takes the new title and details once"""
+        previous = [dict(PREVIOUS[0], title="Director of Nursing Operations", details="Runs nursing.",
+                         provenance={"source": "revision", "report_hash": "older", "sections": []}), PREVIOUS[1]]
+        new_report = make_report({20: "Kim Schwenk, MSN, RN was promoted to CNO.",
+                                  90: "Stuart Levine is the President of the hospital."})
+        fingerprint, match = revise(new_report)
+        client = ScriptedLLMClient(json.dumps([{"name": "Kim Schwenk", "title": "CNO", "details": "Promoted."}]))
+
+        stakeholders = IncrementalExtractor(client).extract("new", fingerprint, match, previous)
+
+        assert stakeholders[0]["title"] == "CNO"
+        assert stakeholders[0]["details"] == "Promoted. Runs nursing."
+        assert stakeholders[0]["provenance"]["source"] == "revision"
+        assert stakeholders[0]["provenance"]["updated_in"] == "new"
+
+    def test_changed_sections_without_candidates_not_sent(self):
+        """Test that only the changed sections naming somebody go into the prompt"""
+        new_report = make_report({20: "Kim Schwenk, MSN, RN is the Sepsis Coordinator.",
+                                  45: "Compliance rose sharply after the protocol update.",
+                                  90: "Stuart Levine is the President of the hospital.",
+                                  110: "Dr. Garo Ghazarian is the new ED Medical Director."})
+        fingerprint, match = revise(new_report)
+        client = ScriptedLLMClient(json.dumps([{"name": "Garo Ghazarian", "title": "ED Medical Director"}]))
+
+        IncrementalExtractor(client).extract("new", fingerprint, match, PREVIOUS)
+
+        assert "Garo Ghazarian" in client.prompts[0]
+        assert "Compliance rose sharply" not in client.prompts[0]
+
+    def test_no_candidates_no_call_and_removed_people_dropped(self):
+        """Test that edits without people skip the LLM and that people no longer mentioned are dropped"""
+        new_report = make_report({20: "Kim Schwenk, MSN, RN is the Sepsis Coordinator.",
+                                  90: "The president's office declined to comment."})
+        fingerprint, match = revise(new_report)
+        client = ScriptedLLMClient("[]")
+
+        stakeholders = IncrementalExtractor(client).extract("new", fingerprint, match, PREVIOUS)
+
+        assert client.prompts == []
+        assert [s["name"] for s in stakeholders] == ["Kim Schwenk"]
+
+    def test_unparseable_response_falls_back(self):
+        """Test that a failed changed-section call signals a full extraction"""
+        new_report = make_report({20: "Kim Schwenk, MSN, RN is the Sepsis Coordinator.",
+                                  60: "Dr. Garo Ghazarian is the new ED Medical Director.",
+                                  90: "Stuart Levine is the President of the hospital."})
+        fingerprint, match = revise(new_report)
+
+        assert IncrementalExtractor(ScriptedLLMClient("not json")).extract("new", fingerprint, match, PREVIOUS) is None
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,81 @@
+"""
+Unit tests for the process-wide LLM limits
+"""
+import asyncio
+import threading
+import time
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from utils.llm_limits import LLMBudgetExceeded, LLMGate
+
+class SlowClient:
+    """Client stand-in that sleeps and answers with a fixed text"""
+    model = "test-model"
+
+    def __init__(self, delay=0.0, response="x" * 400):
+        self.delay = delay
+        self.response = response
+
+    def get_completion(self, messages, max_tokens=2048, temperature=0.7):
+        time.sleep(self.delay)
+        return self.response
+
+MESSAGES = [{"role": "user", "content": "y" * 800}]
+
+class TestLLMGate:
+    """Test suite for LLMGate"""
+
+    def test_concurrency_shared_across_clients(self):
+        """Test that calls from different clients share one limit"""
+        gate = LLMGate(max_concurrency=2)
+        clients = [gate.wrap(SlowClient(delay=0.05)) for _ in range(3)]
+        threads = [threading.Thread(target=clients[i % 3].get_completion, args=(MESSAGES,)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert gate.max_in_flight == 2
+        assert gate.usage["calls"] == 6
+
+    def test_budget_stops_new_calls(self):
+        """Test that calls raise once the estimated token budget is spent"""
+        gate = LLMGate(token_budget=500)
+        client = gate.wrap(SlowClient())
+
+        client.get_completion(MESSAGES)  # ~200 prompt + ~100 completion tokens
+        client.get_completion(MESSAGES)
+        assert gate.exhausted
+        with pytest.raises(LLMBudgetExceeded):
+            client.get_completion(MESSAGES)
+
+    def test_usage_tracked_per_task(self):
+        """Test that track() attributes calls, including those made in worker threads, to their own task"""
+        gate = LLMGate()
+        client = gate.wrap(SlowClient())
+
+        async def work(calls):
+            with gate.track() as usage:
+                await asyncio.gather(*(asyncio.to_thread(client.get_completion, MESSAGES) for _ in range(calls)))
+            return usage
+
+        async def main():
+            return await asyncio.gather(work(1), work(3))
+
+        first, second = asyncio.run(main())
+
+        assert (first["calls"], second["calls"]) == (1, 3)
+        assert gate.usage["calls"] == 4
+        assert second["prompt_tokens"] == 600
+
+    def test_wrapped_client_passes_attributes(self):
+        """Test that the proxy exposes the wrapped client's attributes"""
+        assert LLMGate().wrap(SlowClient()).model == "test-model"
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,126 @@
+"""
+Unit tests for the Aho-Corasick stakeholder mention index
+"""
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from utils.mention_index import (
+    AhoCorasickAutomaton,
+    MentionIndex,
+    merge_mention_windows,
+    name_variants
+)
+from tests.fixtures.test_data import SAMPLE_STAKEHOLDERS, SAMPLE_RESEARCH_REPORT
+
+REPORT = (
+    "The ED at Franklin Square struggles with SEP-1 compliance. "
+    "Kim Schwenk, MSN, RN leads the sepsis program. Schwenk said the bundle is hard to hit. "
+    "The Chief Nursing Officer approved a new triage pilot. "
+    "Separately, the CNO budget was cut. Schwenkville is a nearby town."
+)
+
+class TestNameVariants:
+    """Test suite for stakeholder name variants"""
+
+    def test_credentials_and_prefixes(self):
+        """Test variants for a name with a prefix and credentials"""
+        variants = dict(name_variants({"name": "Dr. Kim Schwenk, MSN, RN", "title": ""}))
+
+        assert variants["Kim Schwenk"] == "name"
+        assert variants["Dr. Schwenk"] == "name"
+        assert variants["Schwenk"] == "last_name"
+
+    def test_chief_title_acronym(self):
+        """Test that C-suite titles get an acronym alias"""
+        variants = dict(name_variants({"name": "", "title": "Chief Nursing Officer"}))
+
+        assert variants["Chief Nursing Officer"] == "title"
+        assert variants["CNO"] == "title"
+
+class TestAhoCorasickAutomaton:
+    """Test suite for the multi-pattern matcher"""
+
+    def test_overlapping_patterns(self):
+        """Test that nested and overlapping patterns are all reported"""
+        automaton = AhoCorasickAutomaton()
+        for pattern in ("he", "she", "his", "hers"):
+            automaton.add(pattern, pattern)
+
+        matches = {value for _, _, value in automaton.find_all("ushers she his he")}
+
+        assert matches == {"she", "his", "he"}
+
+    def test_whole_words_case_insensitive(self):
+        """Test case-insensitive matching that ignores partial words"""
+        automaton = AhoCorasickAutomaton()
+        automaton.add("Schwenk", "last")
+
+        matches = list(automaton.find_all("SCHWENK met Schwenkville"))
+
+        assert matches == [(0, 7, "last")]
+
+class TestMentionIndex:
+    """Test suite for MentionIndex"""
+
+    @pytest.fixture
+    def index(self):
+        stakeholders = [
+            {"name": "Kim Schwenk, MSN, RN", "title": "Sepsis Coordinator", "details": ""},
+            {"name": "Pat Doe", "title": "Chief Nursing Officer", "details": ""}
+        ]
+        return MentionIndex(REPORT, stakeholders), stakeholders
+
+    def test_mentions_with_offsets(self, index):
+        """Test that every mention is found with its offsets"""
+        mention_index, stakeholders = index
+
+        mentions = mention_index.mentions(stakeholders[0])
+
+        assert [m["kind"] for m in mentions] == ["name", "last_name"]
+        assert all(REPORT[m["start"]:m["end"]] == m["text"] for m in mentions)
+        assert mentions[0]["text"] == "Kim Schwenk, MSN, RN"
+
+    def test_title_alias_mentions(self, index):
+        """Test that title and acronym mentions are attributed to the stakeholder"""
+        mention_index, stakeholders = index
+
+        texts = [m["text"] for m in mention_index.mentions(stakeholders[1])]
+
+        assert texts == ["Chief Nursing Officer", "CNO"]
+
+    def test_context_windows_merge(self, index):
+        """Test that nearby mentions produce one merged window"""
+        mention_index, stakeholders = index
+
+        windows = mention_index.context_windows(stakeholders[0], radius=40)
+
+        assert len(windows) == 1
+        assert "leads the sepsis program" in windows[0]
+        assert windows[0] in REPORT
+
+    def test_sample_report(self):
+        """Test mentions in the sample research report"""
+        mention_index = MentionIndex(SAMPLE_RESEARCH_REPORT, SAMPLE_STAKEHOLDERS)
+
+        assert mention_index.mentions(SAMPLE_STAKEHOLDERS[0], kinds=("name",))
+        assert "Michael" in mention_index.context_windows(SAMPLE_STAKEHOLDERS[1])[0]
+
+    def test_unknown_stakeholder(self, index):
+        """Test that stakeholders outside the roster have no mentions"""
+        mention_index, _ = index
+
+        assert mention_index.mentions({"name": "Nobody Here", "title": ""}) == []
+
+    def test_merge_mention_windows(self):
+        """Test that windows already inside the passages are not duplicated"""
+        passages = "Alpha passage. Beta passage."
+
+        assert merge_mention_windows(["Alpha passage."], passages) == passages
+        assert merge_mention_windows(["Gamma."], passages) == "Gamma.\n\n" + passages
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
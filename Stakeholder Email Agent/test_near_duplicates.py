@@ -0,0 +1,95 @@
+"""
+Unit tests for near-duplicate report detection
+"""
+import pytest
+import sys
+import os
+import textwrap
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from utils.near_duplicates import NearDuplicateIndex, ReportFingerprint, content_sections, hamming_distance
+
+def make_report(date="28 May 2025", coordinator_note="Kim Schwenk leads the sepsis program."):
+    sentences = [f"Report generated on {date}."]
+    for i in range(120):
+        sentences.append(f"Finding {i} describes bundle compliance in unit {i % 7} during quarter {i % 4}.")
+        if i == 60:
+            sentences.append(coordinator_note)
+    # Wrap lines like a PDF text layer
+    return textwrap.fill(" ".join(sentences), width=70)
+
+class TestFingerprint:
+    """Test suite for ReportFingerprint"""
+
+    def test_rewrapped_text_identical(self):
+        """Test that line wrapping and case do not change the fingerprint"""
+        report = make_report()
+        rewrapped = " ".join(report.split("\n")).upper()
+
+        assert ReportFingerprint(report).section_hashes == ReportFingerprint(rewrapped).section_hashes
+
+    def test_edit_changes_only_its_section(self):
+        """Test that a small edit changes few bits and only the section around it"""
+        original = ReportFingerprint(make_report())
+        edited = ReportFingerprint(make_report(date="3 June 2025"))
+
+        assert hamming_distance(original.simhash, edited.simhash) <= 3
+        changed = edited.changed_sections(original.section_hashes)
+        assert len(changed) == 1
+        assert "3 June 2025" in changed[0]
+
+    def test_sections_cover_text(self):
+        """Test that sections keep every sentence in order"""
+        report = make_report()
+        sections = content_sections(report)
+
+        assert len(sections) > 5
+        assert " ".join(sections) == " ".join(report.split())
+
+    def test_stakeholder_sections(self):
+        """Test that the sections mentioning a stakeholder are found by name variants"""
+        fingerprint = ReportFingerprint(make_report())
+
+        assert len(fingerprint.stakeholder_sections({"name": "Kim Schwenk, MSN, RN"})) == 1
+        assert fingerprint.stakeholder_sections({"name": "Stuart Levine"}) == []
+
+    def test_sections_in_passages(self):
+        """Test that the sections quoted by a passage are found, whatever its wrapping"""
+        report = make_report()
+        fingerprint = ReportFingerprint(report)
+        passage = "...\nFinding 42 describes bundle compliance\nin unit 0 during quarter 2. (excerpt)"
+
+        found = fingerprint.sections_in(passage)
+
+        assert len(found) == 1
+        assert "Finding 42 describes" in fingerprint.sections[fingerprint.section_hashes.index(found[0])]
+        assert fingerprint.sections_in("Unrelated text about pharmacy budgets.") == []
+
+class TestNearDuplicateIndex:
+    """Test suite for NearDuplicateIndex"""
+
+    def test_finds_near_duplicate(self, tmp_path):
+        """Test that a re-export is matched to the earlier report across index instances"""
+        path = str(tmp_path / "index.json")
+        NearDuplicateIndex(path).add("old", make_report())
+        index = NearDuplicateIndex(path)
+        fingerprint = index.add("new", make_report(coordinator_note="Kim Schwenk now leads the sepsis program."))
+
+        match = index.find("new", fingerprint)
+
+        assert match["report_hash"] == "old"
+        assert match["shared"] > 0.8
+        assert fingerprint.stakeholder_sections({"name": "Kim Schwenk"})[0] not in match["section_hashes"]
+
+    def test_unrelated_report_not_matched(self):
+        """Test that a different report is not a near duplicate"""
+        index = NearDuplicateIndex(None)
+        index.add("old", make_report())
+        other = "\n".join(f"Dr. Garo Ghazarian reviewed case {i} with the pharmacy team." for i in range(200))
+
+        assert index.find("other", index.add("other", other)) is None
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
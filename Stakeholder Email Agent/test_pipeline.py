@@ -0,0 +1,226 @@
+"""
+Unit tests for the per-stakeholder pipeline
+"""
+import asyncio
+import threading
+import time
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from agents.email_writer import EmailWriterAgent
+from agents.pipeline import StageLimiter, StakeholderPipeline, _parse_limits
+from tests.fixtures.mock_llm import MockLLMClient
+from tests.fixtures.test_data import SAMPLE_TASK
+
+class FakeWriter:
+    """Writer stand-in that records its stage limiter and echoes the task"""
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.stage_limiter = None
+
+    async def run(self, task):
+        await asyncio.sleep(self.delay)
+        return {"stakeholder_name": task["stakeholder_name"], "finished_at": time.monotonic()}
+
+def make_prepare(delays):
+    async def prepare_task(index, stakeholder, limiter):
+        return await limiter.run("context", lambda: (time.sleep(delays[index]), {"stakeholder_name": stakeholder["name"]})[1])
+    return prepare_task
+
+class TestStageLimiter:
+    """Test suite for StageLimiter"""
+
+    def test_parse_limits(self):
+        """Test PIPELINE_CONCURRENCY parsing"""
+        assert _parse_limits("generate=4, refine=2,bad,evaluate=x") == {"generate": 4, "refine": 2}
+
+    @pytest.mark.asyncio
+    async def test_limit_bounds_concurrency(self):
+        """Test that a stage never runs more calls at once than its limit"""
+        limiter = StageLimiter({"generate": 2})
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def work():
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+
+        await asyncio.gather(*(limiter.run("generate", work) for _ in range(6)))
+
+        assert max(peak) == 2
+        assert limiter.stats["generate"]["calls"] == 6
+        assert limiter.stats["generate"]["max_in_flight"] == 2
+
+    @pytest.mark.asyncio
+    async def test_queue_depth_tracked(self):
+        """Test that callers beyond the limit are counted as queued"""
+        limiter = StageLimiter({"evaluate": 1})
+
+        await asyncio.gather(*(limiter.run("evaluate", time.sleep, 0.01) for _ in range(4)))
+
+        snapshot = limiter.snapshot()["evaluate"]
+        assert snapshot["max_queue_depth"] == 3
+        assert snapshot["queue_depth"] == 0
+        assert snapshot["queue_seconds"] > 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_holds_slot_until_thread_returns(self):
+        """Test that cancelling a caller does not free its slot while the thread still runs"""
+        limiter = StageLimiter({"refine": 1})
+        release = threading.Event()
+
+        first = asyncio.create_task(limiter.run("refine", release.wait))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        second = asyncio.create_task(limiter.run("refine", lambda: "done"))
+        await asyncio.sleep(0.01)
+
+        assert limiter.in_flight("refine") == 1
+        assert limiter.queue_depth("refine") == 1
+        assert not second.done()
+
+        release.set()
+        assert await second == "done"
+        assert limiter.stats["refine"]["calls"] == 2
+
+    def test_from_env_defaults_and_overrides(self, monkeypatch):
+        """Test default stage limits, overrides and queue bounds from the environment"""
+        monkeypatch.setenv("PIPELINE_CONCURRENCY", "context=2")
+        monkeypatch.setenv("PIPELINE_QUEUE_LIMITS", "generate=5")
+
+        limiter = StageLimiter.from_env()
+
+        assert limiter.limit("generate") == 20
+        assert limiter.limit("context") == 2
+        assert limiter.capacity("generate") == 25
+        assert limiter.capacity("context") == 4
+
+class TestStakeholderPipeline:
+    """Test suite for StakeholderPipeline"""
+
+    @pytest.mark.asyncio
+    async def test_results_in_input_order(self):
+        """Test that results come back in stakeholder order"""
+        stakeholders = [{"name": f"Person {i}"} for i in range(4)]
+        pipeline = StakeholderPipeline(make_prepare([0.03, 0.0, 0.02, 0.0]), lambda i: FakeWriter(), StageLimiter())
+
+        results = await pipeline.run(stakeholders)
+
+        assert [r["stakeholder_name"] for r in results] == [s["name"] for s in stakeholders]
+
+    @pytest.mark.asyncio
+    async def test_slow_context_does_not_block_other_emails(self):
+        """Test that a slow context extraction only delays its own email"""
+        stakeholders = [{"name": "Slow"}, {"name": "Fast"}]
+        pipeline = StakeholderPipeline(make_prepare([0.2, 0.0]), lambda i: FakeWriter(), StageLimiter())
+
+        results = await pipeline.run(stakeholders)
+
+        assert results[1]["finished_at"] < results[0]["finished_at"] - 0.1
+        assert pipeline.first_result_seconds < 0.15
+
+    @pytest.mark.asyncio
+    async def test_failure_becomes_error_result(self):
+        """Test that one failing stakeholder does not fail the batch"""
+        async def prepare_task(index, stakeholder, limiter):
+            if index == 0:
+                raise RuntimeError("context extraction failed")
+            return {"stakeholder_name": stakeholder["name"]}
+
+        pipeline = StakeholderPipeline(prepare_task, lambda i: FakeWriter(), StageLimiter())
+        results = await pipeline.run([{"name": "Broken", "title": "CMO"}, {"name": "Fine"}])
+
+        assert results[0]["email_subject"] == "ERROR"
+        assert results[0]["stakeholder_title"] == "CMO"
+        assert results[1]["stakeholder_name"] == "Fine"
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_in_completion_order(self):
+        """Test that streamed results arrive as they finish, tagged with stakeholder ids"""
+        stakeholders = [{"name": "Slow", "id": 41}, {"name": "Fast", "id": 42}, {"name": "No id"}]
+        pipeline = StakeholderPipeline(make_prepare([0.1, 0.0, 0.05]), lambda i: FakeWriter(), StageLimiter())
+
+        results = [result async for result in pipeline.stream(stakeholders)]
+
+        assert [r["stakeholder_name"] for r in results] == ["Fast", "No id", "Slow"]
+        assert [r["stakeholder_id"] for r in results] == [42, 2, 41]
+
+    @pytest.mark.asyncio
+    async def test_stream_cancels_remaining_when_consumer_stops(self):
+        """Test that breaking out of the stream cancels unfinished stakeholders"""
+        started = []
+
+        def writer_factory(index):
+            started.append(index)
+            return FakeWriter(delay=0.0 if index == 0 else 5.0)
+
+        async def prepare_task(index, stakeholder, limiter):
+            return {"stakeholder_name": stakeholder["name"]}
+
+        pipeline = StakeholderPipeline(prepare_task, writer_factory, StageLimiter())
+        stream = pipeline.stream([{"name": "A"}, {"name": "B"}])
+        first = await stream.__anext__()
+        await stream.aclose()
+
+        assert first["stakeholder_name"] == "A"
+        assert sorted(started) == [0, 1]
+
+    @pytest.mark.asyncio
+    async def test_admission_bounded_by_generate_capacity(self):
+        """Test that stakeholders beyond the generation capacity wait before context extraction"""
+        active = []
+        peak = []
+
+        async def prepare_task(index, stakeholder, limiter):
+            active.append(index)
+            peak.append(len(active))
+            return {"stakeholder_name": stakeholder["name"]}
+
+        class TrackingWriter(FakeWriter):
+            async def run(self, task):
+                result = await super().run(task)
+                active.pop()
+                return result
+
+        limiter = StageLimiter({"generate": 2}, queue_limits={"generate": 1})
+        pipeline = StakeholderPipeline(prepare_task, lambda i: TrackingWriter(delay=0.01), limiter)
+
+        results = await pipeline.run([{"name": f"Person {i}"} for i in range(8)])
+
+        assert len(results) == 8
+        assert max(peak) == 3
+        assert pipeline.max_intake_depth == 5
+
+    @pytest.mark.asyncio
+    async def test_writer_stages_use_limiter(self):
+        """Test that EmailWriterAgent routes its LLM stages through the pipeline limiter"""
+        limiter = StageLimiter()
+
+        def writer_factory(index):
+            agent = EmailWriterAgent(f"EmailWriter-{index}")
+            agent.llm_client = MockLLMClient()
+            return agent
+
+        async def prepare_task(index, stakeholder, limiter):
+            return SAMPLE_TASK.copy()
+
+        pipeline = StakeholderPipeline(prepare_task, writer_factory, limiter)
+        results = await pipeline.run([{"name": "A"}, {"name": "B"}])
+
+        assert all(r["email_subject"] != "ERROR" for r in results)
+        assert limiter.stats["generate"]["calls"] == 2
+        assert limiter.stats["evaluate"]["calls"] >= 2
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,124 @@
+"""
+Unit tests for reflection control policies
+"""
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from agents.reflection import SpeculativeRefinementPolicy, ReflectionLoopController
+
+class TestSpeculativeRefinementPolicy:
+    """Test suite for SpeculativeRefinementPolicy"""
+    
+    def test_accepts_scores_just_below_threshold(self):
+        """Test that only near-miss scores use the speculative result"""
+        policy = SpeculativeRefinementPolicy(acceptance_margin=1.5)
+        
+        assert policy.accepts(6.0, 7.0)
+        assert policy.accepts(5.5, 7.0)
+        assert not policy.accepts(7.0, 7.0)
+        assert not policy.accepts(4.0, 7.0)
+    
+    def test_acceptance_rate_governs_activation(self):
+        """Test that speculation switches off when drafts rarely land near the threshold"""
+        policy = SpeculativeRefinementPolicy(min_acceptance_rate=0.35, prior_accepted=1, prior_observed=2)
+        assert policy.should_speculate()
+        
+        for _ in range(10):
+            policy.record_evaluation(9.0, 7.0)
+        
+        assert policy.acceptance_rate < 0.35
+        assert not policy.should_speculate()
+        
+        for _ in range(10):
+            policy.record_evaluation(6.5, 7.0)
+        
+        assert policy.should_speculate()
+    
+    def test_stats_persist_across_instances(self, tmp_path):
+        """Test that statistics survive process restarts when a stats file is set"""
+        stats_path = str(tmp_path / "speculation.json")
+        policy = SpeculativeRefinementPolicy(stats_path=stats_path)
+        policy.record_evaluation(6.5, 7.0)
+        policy.record_speculation(used=True)
+        
+        reloaded = SpeculativeRefinementPolicy(stats_path=stats_path)
+        stats = reloaded.get_stats()
+        
+        assert stats["observed"] == 1
+        assert stats["accepted"] == 1
+        assert stats["speculation_used"] == 1
+
+class TestReflectionLoopController:
+    """Test suite for ReflectionLoopController"""
+    
+    def test_default_is_single_refinement_without_reevaluation(self):
+        """Test that defaults keep the original one-evaluation, one-refinement pattern"""
+        controller = ReflectionLoopController(target_score=7.0)
+        controller.record_evaluation(5.0)
+        
+        assert controller.should_refine(5.0)
+        controller.record_refinement()
+        assert not controller.should_evaluate_refinement()
+        assert controller.stop_reason == "max_iterations"
+    
+    def test_stops_when_target_reached(self):
+        """Test early exit once the target score is met"""
+        controller = ReflectionLoopController(max_iterations=3, target_score=8.0)
+        controller.record_evaluation(8.5)
+        
+        assert not controller.should_refine(8.5)
+        assert controller.stop_reason == "target_reached"
+    
+    def test_stops_on_plateau_and_records_deltas(self):
+        """Test that small score gains end the loop and deltas are traced"""
+        controller = ReflectionLoopController(max_iterations=5, target_score=9.0, min_improvement=0.5)
+        controller.record_evaluation(6.0)
+        controller.record_refinement()
+        controller.record_evaluation(7.5)
+        assert controller.should_refine(7.5)
+        controller.record_refinement()
+        controller.record_evaluation(7.7)
+        
+        assert not controller.should_refine(7.7)
+        trace = controller.get_trace()
+        assert trace["stop_reason"] == "plateau"
+        assert [e["delta"] for e in trace["evaluations"]] == [None, 1.5, 0.2]
+    
+    def test_stops_on_token_budget(self):
+        """Test that the projected token cost of another round is respected"""
+        tokens = {"used": 0}
+        controller = ReflectionLoopController(max_iterations=5, target_score=9.0, token_budget=3000,
+                                              token_source=lambda: tokens["used"])
+        tokens["used"] = 1000
+        controller.record_evaluation(5.0)
+        assert controller.should_refine(5.0)
+        
+        controller.record_refinement()
+        tokens["used"] = 2000
+        controller.record_evaluation(6.0)
+        
+        assert not controller.should_refine(6.0)
+        assert controller.stop_reason == "token_budget"
+    
+    def test_stops_on_time_budget(self):
+        """Test that an exhausted wall-clock budget ends the loop"""
+        controller = ReflectionLoopController(max_iterations=5, target_score=9.0, time_budget_seconds=0)
+        controller.record_evaluation(5.0)
+        
+        assert not controller.should_refine(5.0)
+        assert controller.stop_reason == "time_budget"
+    
+    def test_from_config_overrides(self):
+        """Test construction from a mode_config['reflection'] dictionary"""
+        controller = ReflectionLoopController.from_config({"max_iterations": 3, "token_budget": 5000}, target_score=7.0)
+        
+        assert controller.max_iterations == 3
+        assert controller.target_score == 7.0
+        assert controller.evaluate_final
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
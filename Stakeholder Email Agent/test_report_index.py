@@ -0,0 +1,134 @@
+"""
+Unit tests for the BM25 report index
+"""
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from utils.report_index import (
+    BM25Index,
+    ContextRetriever,
+    build_stakeholder_query,
+    chunk_report
+)
+from compare_context_retrieval import compare, term_recall
+from tests.fixtures.test_data import SAMPLE_STAKEHOLDERS, SAMPLE_RESEARCH_REPORT
+
+class TestReportIndex:
+    """Test suite for report chunking and BM25 retrieval"""
+
+    def test_chunk_report_respects_size(self):
+        """Test that passages stay near the target size without cutting sentences"""
+        report = "\n\n".join(["Sentence one about sepsis. Sentence two about lactate."] * 40)
+        chunks = chunk_report(report, max_chars=300)
+
+        assert len(chunks) > 1
+        assert all(len(chunk) <= 300 for chunk in chunks)
+        assert all(chunk.endswith(".") for chunk in chunks)
+
+    def test_chunk_report_splits_long_paragraph(self):
+        """Test that a single long paragraph is split on sentence boundaries"""
+        paragraph = " ".join(f"Finding number {i} is important." for i in range(50))
+        chunks = chunk_report(paragraph, max_chars=200)
+
+        assert len(chunks) > 1
+        assert "".join(chunks).replace(" ", "") == paragraph.replace(" ", "")
+
+    def test_query_drops_name_credentials(self):
+        """Test that honorifics and credentials are not query terms"""
+        query = build_stakeholder_query({"name": "Dr. Kim Schwenk, MSN, RN", "title": "Sepsis Coordinator", "details": ""})
+
+        assert "schwenk" in query
+        assert query["schwenk"] > query["sepsis"]
+        assert "dr" not in query
+        assert "msn" not in query
+
+    def test_search_ranks_stakeholder_passage_first(self):
+        """Test that the passage mentioning the stakeholder ranks first"""
+        chunks = chunk_report(SAMPLE_RESEARCH_REPORT, max_chars=400)
+        index = BM25Index(chunks)
+
+        hits = index.search(build_stakeholder_query(SAMPLE_STAKEHOLDERS[1]), top_k=2)
+
+        assert hits
+        assert "Michael" in chunks[hits[0][1]]
+
+    def test_search_without_matches(self):
+        """Test that passages without query terms are not returned"""
+        index = BM25Index(chunk_report(SAMPLE_RESEARCH_REPORT, max_chars=400))
+
+        assert index.search({"zyxwv": 1.0}) == []
+
+class TestContextRetriever:
+    """Test suite for per-stakeholder passage selection"""
+
+    def test_short_report_sent_whole(self):
+        """Test that reports below the size threshold are not trimmed"""
+        retriever = ContextRetriever(min_report_chars=100000)
+
+        assert retriever.select_passages(SAMPLE_STAKEHOLDERS[0], SAMPLE_RESEARCH_REPORT) is SAMPLE_RESEARCH_REPORT
+
+    def test_full_mode_sends_whole_report(self):
+        """Test that full mode keeps the previous behaviour"""
+        retriever = ContextRetriever(mode="full", min_report_chars=0)
+
+        assert retriever.select_passages(SAMPLE_STAKEHOLDERS[0], SAMPLE_RESEARCH_REPORT) is SAMPLE_RESEARCH_REPORT
+
+    def test_retrieve_mode_trims_report(self):
+        """Test that retrieved passages are shorter than the report and stakeholder-specific"""
+        retriever = ContextRetriever(top_k=1, min_report_chars=0, chunk_chars=400)
+
+        passages = retriever.select_passages(SAMPLE_STAKEHOLDERS[0], SAMPLE_RESEARCH_REPORT)
+
+        assert len(passages) < len(SAMPLE_RESEARCH_REPORT)
+        assert "Dr. Smith" in passages
+
+    def test_index_built_once_per_report(self):
+        """Test that the report is indexed once for all stakeholders"""
+        retriever = ContextRetriever(min_report_chars=0)
+
+        for stakeholder in SAMPLE_STAKEHOLDERS:
+            retriever.select_passages(stakeholder, SAMPLE_RESEARCH_REPORT)
+
+        assert retriever.indexes_built == 1
+
+    def test_group_passages_cover_every_member(self):
+        """Test that batched extraction gets each member's passages once"""
+        retriever = ContextRetriever(top_k=1, min_report_chars=0, chunk_chars=400)
+
+        passages = retriever.select_passages_for_group(SAMPLE_STAKEHOLDERS, SAMPLE_RESEARCH_REPORT)
+
+        assert "Dr. Smith" in passages
+        assert "Michael" in passages
+        assert len(passages) < len(SAMPLE_RESEARCH_REPORT)
+
+    def test_local_mode_falls_back_to_opening_passages(self):
+        """Test that local mode never returns the whole report when nothing matches"""
+        retriever = ContextRetriever(mode="local", top_k=1, min_report_chars=0, chunk_chars=400)
+        stakeholder = {"name": "Zyxwv Qqqq", "title": "", "details": ""}
+
+        passages = retriever.select_passages(stakeholder, SAMPLE_RESEARCH_REPORT)
+
+        assert passages == retriever.get_index(SAMPLE_RESEARCH_REPORT).chunks[0]
+
+class TestComparisonHarness:
+    """Test suite for the retrieval comparison harness"""
+
+    def test_term_recall(self):
+        """Test term recall against a reference extraction"""
+        assert term_recall("sepsis lactate triage", "sepsis triage") == pytest.approx(2 / 3)
+        assert term_recall("", "anything") == 1.0
+
+    def test_offline_comparison(self):
+        """Test a retrieval-only comparison run"""
+        results = compare(SAMPLE_RESEARCH_REPORT, SAMPLE_STAKEHOLDERS, top_k=1)
+
+        assert len(results) == len(SAMPLE_STAKEHOLDERS)
+        assert all(r["passage_chars"] <= r["report_chars"] for r in results)
+        assert "full" not in results[0]
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
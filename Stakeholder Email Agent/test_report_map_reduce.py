@@ -0,0 +1,153 @@
+"""
+Unit tests for map-reduce report extraction
+"""
+import json
+import re
+import threading
+import time
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from agents.report_map_reduce import MapReduceExtractor, overlapping_chunks
+
+PEOPLE = ["Kim Schwenk", "Stuart Levine", "Nathan Barbo", "Diana Pancu", "Garo Ghazarian", "Stephanie Detterline"]
+
+def make_report(sections=30):
+    paragraphs = []
+    for i in range(sections):
+        person = PEOPLE[i % len(PEOPLE)]
+        paragraphs.append(f"Section {i}. {person} discussed initiative {i} at the hospital. " * 8)
+    return "\n\n".join(paragraphs)
+
+class ChunkLLMClient:
+    """Fake client that answers chunk prompts with the people named in the chunk"""
+    def __init__(self, delay=0.0, broken_chunk=None, raising_chunk=None, reduce_error=False):
+        self.delay = delay
+        self.broken_chunk = broken_chunk
+        self.raising_chunk = raising_chunk
+        self.reduce_error = reduce_error
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        self.prompts = []
+
+    def get_completion(self, messages, max_tokens=2048, temperature=0.7):
+        prompt = messages[0]["content"]
+        self.prompts.append(prompt)
+        if prompt.startswith("You are an expert research analyst. The facts below"):
+            if self.reduce_error:
+                raise RuntimeError("provider unavailable")
+            return "Memorial Hospital summary."
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        number = int(re.search(r"part (\d+) of", prompt).group(1))
+        if number == self.broken_chunk:
+            return "not json"
+        if number == self.raising_chunk:
+            raise TimeoutError("LLM request timed out")
+        chunk = prompt.split("Report part:", 1)[1]
+        stakeholders = [{"name": name, "title": "Director", "details": f"Seen in part {number}."}
+                        for name in PEOPLE if name in chunk]
+        return json.dumps({"stakeholders": stakeholders, "facts": ["Memorial is a 400-bed hospital."]})
+
+class TestOverlappingChunks:
+    """Test suite for overlapping_chunks"""
+
+    def test_chunks_bounded_and_overlapping(self):
+        """Test that chunks respect the size and consecutive chunks share text"""
+        report = make_report()
+        chunks = overlapping_chunks(report, chunk_chars=3000, overlap_chars=600)
+
+        assert len(chunks) > 3
+        assert all(len(chunk) <= 3000 for chunk in chunks)
+        for previous, current in zip(chunks, chunks[1:]):
+            assert current.split("\n\n")[0] in previous
+
+    def test_covers_whole_report(self):
+        """Test that every paragraph ends up in some chunk"""
+        report = make_report()
+        chunks = overlapping_chunks(report, chunk_chars=3000, overlap_chars=600)
+
+        for paragraph in report.split("\n\n"):
+            assert any(paragraph.strip() in chunk for chunk in chunks)
+
+    def test_short_report_single_chunk(self):
+        """Test that a report smaller than a chunk is not split"""
+        assert overlapping_chunks("One paragraph.\n\nAnother.", chunk_chars=3000) == ["One paragraph.\n\nAnother."]
+
+class TestMapReduceExtractor:
+    """Test suite for MapReduceExtractor"""
+
+    @pytest.mark.asyncio
+    async def test_stakeholders_merged_across_chunks(self):
+        """Test that people found in several chunks are returned once, with one summary call"""
+        client = ChunkLLMClient()
+        extractor = MapReduceExtractor(client, chunk_chars=3000, overlap_chars=600)
+
+        stakeholders, summary = await extractor.extract(make_report())
+
+        assert sorted(s["name"] for s in stakeholders) == sorted(PEOPLE)
+        assert summary == "Memorial Hospital summary."
+        reduce_prompt = client.prompts[-1]
+        assert reduce_prompt.count("400-bed hospital") == 1
+
+    @pytest.mark.asyncio
+    async def test_chunks_extracted_concurrently(self):
+        """Test that chunk calls overlap up to the concurrency limit"""
+        client = ChunkLLMClient(delay=0.05)
+        extractor = MapReduceExtractor(client, chunk_chars=3000, overlap_chars=600, concurrency=3)
+
+        await extractor.extract(make_report())
+
+        assert client.peak == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_chunk_skipped(self):
+        """Test that an unparseable chunk is counted and the rest still contribute"""
+        client = ChunkLLMClient(broken_chunk=1)
+        extractor = MapReduceExtractor(client, chunk_chars=3000, overlap_chars=600)
+
+        stakeholders, _ = await extractor.extract(make_report())
+
+        assert extractor.failed_chunks == 1
+        assert len(stakeholders) == len(PEOPLE)
+
+    @pytest.mark.asyncio
+    async def test_chunk_call_error_skipped(self):
+        """Test that an LLM error in one chunk is counted and the other chunks are kept"""
+        client = ChunkLLMClient(raising_chunk=2)
+        extractor = MapReduceExtractor(client, chunk_chars=3000, overlap_chars=600)
+
+        stakeholders, summary = await extractor.extract(make_report())
+
+        assert extractor.failed_chunks == 1
+        assert len(stakeholders) == len(PEOPLE)
+        assert summary == "Memorial Hospital summary."
+
+    @pytest.mark.asyncio
+    async def test_reduce_error_gives_empty_summary(self):
+        """Test that a failed summary call keeps the stakeholders with an empty summary"""
+        client = ChunkLLMClient(reduce_error=True)
+        extractor = MapReduceExtractor(client, chunk_chars=3000, overlap_chars=600)
+
+        stakeholders, summary = await extractor.extract(make_report())
+
+        assert len(stakeholders) == len(PEOPLE)
+        assert summary == ""
+
+    def test_parse_bare_array(self):
+        """Test that a response in the single-call array format is accepted"""
+        parsed = MapReduceExtractor._parse('```json\n[{"name": "Kim Schwenk"}, {"title": "No name"}]\n```')
+
+        assert parsed == {"stakeholders": [{"name": "Kim Schwenk", "title": "", "details": ""}], "facts": []}
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
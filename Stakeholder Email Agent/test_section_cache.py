@@ -0,0 +1,142 @@
+"""
+Unit tests for the template section cache
+"""
+import re
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from agents.email_writer import EmailWriterAgent
+from prompts.editable_templates import EDITABLE_TEMPLATES, get_template
+from utils.section_cache import TemplateSectionCache, get_prompt_fields
+from tests.fixtures.mock_llm import MockLLMClient
+from tests.fixtures.test_data import SAMPLE_TASK
+
+USER_FIELDS = {
+    "subject": "Test Subject",
+    "opening": "Test Opening",
+    "benefit_1": "Benefit 1",
+    "benefit_2": "Benefit 2",
+    "benefit_3": "Benefit 3",
+    "call_to_action": "Let's talk",
+    "closing": "Best regards"
+}
+
+class SectionsLLMClient(MockLLMClient):
+    """Mock client that always returns problem-solution AI sections"""
+    def get_completion(self, messages, max_tokens=2048, temperature=0.7):
+        self.call_count += 1
+        self.last_messages = messages
+        return '{"pain_points_section": "Sepsis bundle delays.", "application_section": "Faster triage."}'
+
+class TemplateLoopLLMClient(MockLLMClient):
+    """Mock client that answers template prompts with AI sections and the rest of the loop as usual"""
+    def get_completion(self, messages, max_tokens=2048, temperature=0.7):
+        if any("pain_points_section" in m.get("content", "") for m in messages):
+            self.call_count += 1
+            return '{"pain_points_section": "Sepsis bundle delays.", "application_section": "Faster triage."}'
+        return super().get_completion(messages, max_tokens, temperature)
+
+def make_task(user_fields):
+    task = SAMPLE_TASK.copy()
+    task["generation_mode"] = "template"
+    task["mode_config"] = {"template_key": "problem_solution", "user_fields": dict(user_fields)}
+    return task
+
+class TestTemplateSectionCache:
+    """Test suite for TemplateSectionCache"""
+    
+    @pytest.fixture
+    def agent(self):
+        """Create an EmailWriterAgent with mock LLM client and an in-memory cache"""
+        agent = EmailWriterAgent("TestEmailWriter")
+        agent.llm_client = SectionsLLMClient()
+        agent.section_cache = TemplateSectionCache()
+        return agent
+    
+    def test_prompt_fields_exclude_assembly_only_fields(self):
+        """Test that closing/subject are not prompt dependencies"""
+        fields = get_prompt_fields(get_template("problem_solution"))
+        
+        assert "opening" in fields
+        assert "closing" not in fields
+        assert "subject" not in fields
+    
+    @pytest.mark.parametrize("template_key", sorted(EDITABLE_TEMPLATES))
+    def test_built_in_prompt_fields_match_prompt(self, template_key):
+        """Test that every user field a built-in prompt substitutes is part of the cache key"""
+        template = get_template(template_key)
+        placeholders = set(re.findall(r"\{(\w+)\}", template["generation_prompt"]))
+        
+        assert set(get_prompt_fields(template)) == placeholders & set(template["user_fields"])
+        assert "subject" not in placeholders
+    
+    def test_prompt_fields_default_to_placeholders(self):
+        """Test that templates without a declaration depend on every referenced field"""
+        template = {
+            "user_fields": {"subject": "", "hook": ""},
+            "generation_prompt": "Write about {hook} for {stakeholder_name}"
+        }
+        
+        assert get_prompt_fields(template) == ["hook"]
+    
+    def test_assembly_only_edit_reuses_sections(self, agent):
+        """Test that changing the closing re-assembles without an LLM call"""
+        agent._generate_template_email(make_task(USER_FIELDS))
+        calls_after_first = agent.llm_client.call_count
+        
+        edited = dict(USER_FIELDS, closing="Cheers, Sam")
+        email = agent._generate_template_email(make_task(edited))
+        
+        assert agent.llm_client.call_count == calls_after_first
+        assert email["body"].endswith("Cheers, Sam")
+    
+    def test_prompt_field_edit_regenerates(self, agent):
+        """Test that changing a prompt dependency misses the cache"""
+        agent._generate_template_email(make_task(USER_FIELDS))
+        calls_after_first = agent.llm_client.call_count
+        
+        edited = dict(USER_FIELDS, opening="A different opening")
+        agent._generate_template_email(make_task(edited))
+        
+        assert agent.llm_client.call_count == calls_after_first + 1
+    
+    def test_reassemble_template_email(self, agent):
+        """Test the no-LLM re-assembly entry point"""
+        assert agent.reassemble_template_email(make_task(USER_FIELDS)) is None
+        
+        agent._generate_template_email(make_task(USER_FIELDS))
+        agent.llm_client.reset()
+        result = agent.reassemble_template_email(make_task(dict(USER_FIELDS, subject="New Subject")))
+        
+        assert result["email_subject"] == "New Subject"
+        assert agent.llm_client.call_count == 0
+    
+    @pytest.mark.asyncio
+    async def test_run_skips_loop_for_assembly_only_edit(self, agent):
+        """Test that run() re-assembles an evaluated template email without generate/evaluate/refine"""
+        agent.llm_client = TemplateLoopLLMClient()
+        await agent.run(make_task(USER_FIELDS))
+        assert agent.llm_client.call_count >= 2
+        agent.llm_client.reset()
+        
+        result = await agent.run(make_task(dict(USER_FIELDS, closing="Cheers, Sam")))
+        
+        assert agent.llm_client.call_count == 0
+        assert result["email_body"].endswith("Cheers, Sam")
+        assert "Re-assembled from cached AI sections" in result["reflection_notes"]
+    
+    def test_entries_persist_to_disk(self, tmp_path):
+        """Test that entries survive a new cache instance (one bridge process per action)"""
+        cache = TemplateSectionCache(cache_dir=str(tmp_path))
+        cache.put("abc", {"pain_points_section": "x"}, 8.0)
+        
+        reloaded = TemplateSectionCache(cache_dir=str(tmp_path))
+        
+        assert reloaded.get("abc")["quality_score"] == 8.0
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,132 @@
+"""
+Unit tests for stakeholder de-duplication
+"""
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from utils.stakeholder_dedupe import StakeholderDeduplicator, dedupe_stakeholders, normalize_name
+
+class TestNormalizeName:
+    """Test suite for normalize_name"""
+
+    @pytest.mark.parametrize("name", [
+        "Kim Schwenk, MSN, RN",
+        "Kim Schwenk",
+        "Dr. Kim Schwenk",
+        "kim schwenk MSN RN",
+        "Kim A. Schwenk",
+    ])
+    def test_credentials_and_prefixes_stripped(self, name):
+        """Test that prefixes, middle names and credentials do not change the normalized name"""
+        assert normalize_name(name) == ("kim", "schwenk")
+
+    def test_single_word(self):
+        """Test that a lone surname becomes a last name"""
+        assert normalize_name("Dr. Schwenk") == ("", "schwenk")
+
+class TestStakeholderDeduplicator:
+    """Test suite for StakeholderDeduplicator"""
+
+    def test_credential_variants_merged(self):
+        """Test the same person with and without credentials is merged with details combined"""
+        stakeholders = [
+            {"id": 1, "name": "Kim Schwenk, MSN, RN", "title": "Sepsis Coordinator", "details": "Leads the sepsis program."},
+            {"id": 2, "name": "John Smith", "title": "CFO", "details": ""},
+            {"id": 3, "name": "Kim Schwenk", "title": "Sepsis Program Coordinator", "details": "Reports to the CNO."},
+        ]
+
+        unique, report = dedupe_stakeholders(stakeholders)
+
+        assert [s["id"] for s in unique] == [1, 2]
+        assert unique[0]["title"] == "Sepsis Program Coordinator"
+        assert unique[0]["details"] == "Leads the sepsis program. Reports to the CNO."
+        assert unique[0]["merged_from"] == [3]
+        assert report["merged"] == 1
+        assert report["merges_by_kind"] == {"exact": 1}
+
+    def test_prefix_and_initial_variants_merged(self):
+        """Test that "Dr." prefixes, initials and lone surnames merge when titles agree"""
+        stakeholders = [
+            {"name": "Dr. Maria Lopez", "title": "ED Medical Director"},
+            {"name": "Maria Lopez, MD", "title": ""},
+            {"name": "M. Lopez", "title": "Medical Director"},
+            {"name": "Dr. Lopez", "title": "Director of Emergency Medicine"},
+        ]
+
+        unique, report = StakeholderDeduplicator().dedupe(stakeholders)
+
+        assert len(unique) == 1
+        assert report["merges_by_kind"] == {"exact": 1, "initial": 1, "last_name_only": 1}
+
+    def test_different_people_kept(self):
+        """Test that same-surname stakeholders with different first names or roles stay separate"""
+        stakeholders = [
+            {"name": "Kim Schwenk", "title": "Sepsis Coordinator"},
+            {"name": "Karl Schwenk", "title": "Sepsis Coordinator"},
+            {"name": "K. Schwenk", "title": "Chief Financial Officer"},
+            {"name": "Schwenk", "title": "Pharmacy Buyer"},
+        ]
+
+        unique, report = dedupe_stakeholders(stakeholders)
+
+        assert len(unique) == 4
+        assert report["merged"] == 0
+
+    def test_lone_surname_does_not_chain_people(self):
+        """Test that a surname matching two different people merges neither of them"""
+        stakeholders = [
+            {"name": "Dr. Schwenk", "title": ""},
+            {"name": "Kim Schwenk", "title": "CNO"},
+            {"name": "Karl Schwenk", "title": "CFO"},
+        ]
+
+        unique, report = dedupe_stakeholders(stakeholders)
+
+        assert [s["name"] for s in unique] == ["Dr. Schwenk", "Kim Schwenk", "Karl Schwenk"]
+        assert report["merged"] == 0
+
+    def test_initial_does_not_chain_people(self):
+        """Test that an initial compatible with two full first names keeps all three apart"""
+        stakeholders = [
+            {"name": "J. Smith", "title": "Director"},
+            {"name": "John Smith", "title": "Director of Quality"},
+            {"name": "Jane Smith", "title": "Director of Finance"},
+        ]
+
+        unique, report = dedupe_stakeholders(stakeholders)
+
+        assert [s["name"] for s in unique] == ["J. Smith", "John Smith", "Jane Smith"]
+        assert report["merged"] == 0
+
+    def test_weak_match_joins_only_fitting_group(self):
+        """Test that an initial merges with the one person it fits, whatever its position"""
+        stakeholders = [
+            {"id": 1, "name": "J. Smith", "title": "Director of Quality"},
+            {"id": 2, "name": "John Smith", "title": "Quality Director"},
+            {"id": 3, "name": "Jane Smith", "title": "CFO"},
+        ]
+
+        unique, report = dedupe_stakeholders(stakeholders)
+
+        assert [s["id"] for s in unique] == [1, 3]
+        assert unique[0]["merged_from"] == [2]
+        assert report["merges_by_kind"] == {"initial": 1}
+
+    def test_fuzzy_spelling_merged(self):
+        """Test that near spellings of a first name merge when the titles are compatible"""
+        stakeholders = [
+            {"name": "Katherine Moore", "title": "CNO"},
+            {"name": "Katharine Moore", "title": "CNO"},
+        ]
+
+        unique, report = dedupe_stakeholders(stakeholders)
+
+        assert len(unique) == 1
+        assert report["merges_by_kind"] == {"fuzzy": 1}
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
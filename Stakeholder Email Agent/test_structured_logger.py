@@ -0,0 +1,99 @@
+"""
+Unit tests for the structured logger
+"""
+import io
+import json
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from utils import structured_logger
+from utils.structured_logger import DEBUG, INFO, LogConfig, LogSink, get_logger
+
+@pytest.fixture
+def log_stream():
+    """Route logging to an in-memory stream and restore the configuration afterwards"""
+    config = structured_logger._config
+    saved = (config.level, config.sampling, config.sink.output_format, config.sink.stream)
+    stream = io.StringIO()
+    structured_logger.configure(level=INFO, sampling={}, output_format="text", stream=stream)
+    yield stream
+    structured_logger.flush()
+    config.level, config.sampling, config.sink.output_format, config.sink.stream = saved
+
+class TestStructuredLogger:
+    """Test suite for leveled, sampled, asynchronous logging"""
+
+    def test_info_is_written_with_agent_name(self, log_stream):
+        """Test that emitted records include the level and agent name"""
+        get_logger("EmailWriter-0").info("Generating email for %s...", "Dr. Sarah Johnson")
+        structured_logger.flush()
+
+        output = log_stream.getvalue()
+        assert "INFO" in output
+        assert "[EmailWriter-0] Generating email for Dr. Sarah Johnson..." in output
+
+    def test_debug_filtered_at_info_level(self, log_stream):
+        """Test that records below the configured level are dropped without formatting"""
+        evaluated = []
+
+        def expensive():
+            evaluated.append(True)
+            return "payload"
+
+        get_logger("EmailWriter-0").debug("Response: %s", expensive, category="llm_payload")
+        structured_logger.flush()
+
+        assert log_stream.getvalue() == ""
+        assert evaluated == []
+
+    def test_lazy_arguments_evaluated_when_enabled(self, log_stream):
+        """Test that callable arguments are rendered when the record is emitted"""
+        structured_logger.configure(level="DEBUG")
+        get_logger("EmailWriter-0").debug("Response: %s", lambda: "full payload", category="llm_payload")
+        structured_logger.flush()
+
+        assert "Response: full payload" in log_stream.getvalue()
+
+    def test_category_sampling(self, log_stream):
+        """Test that a sampled category keeps the configured share of records"""
+        structured_logger.configure(sampling={"llm_payload": 0.25, "muted": 0.0})
+        log = get_logger("EmailWriter-0")
+        for i in range(8):
+            log.info("payload %d", i, category="llm_payload")
+            log.info("muted %d", i, category="muted")
+        log.info("unsampled")
+        structured_logger.flush()
+
+        output = log_stream.getvalue()
+        assert output.count("payload") == 2
+        assert "muted" not in output
+        assert "unsampled" in output
+
+    def test_bridge_format(self, log_stream):
+        """Test LOG: JSON lines consumed by the webapp debug console"""
+        structured_logger.configure(output_format="bridge")
+        get_logger("Orchestrator").warning("Report is short", category="stage", characters=120)
+        structured_logger.flush()
+
+        line = log_stream.getvalue().strip()
+        assert line.startswith("LOG:")
+        payload = json.loads(line[len("LOG:"):])
+        assert payload["type"] == "log"
+        assert payload["data"]["level"] == "warning"
+        assert payload["data"]["agent"] == "Orchestrator"
+        assert payload["data"]["metadata"] == {"characters": 120, "category": "stage"}
+
+    def test_full_queue_drops_records(self):
+        """Test that a full queue drops records instead of blocking the caller"""
+        sink = LogSink(stream=io.StringIO(), max_queue=1)
+        sink._thread = object()  # Pretend the writer is running but stalled
+        config = LogConfig(level=DEBUG, sink=sink)
+
+        for _ in range(3):
+            config.sink.submit((0.0, INFO, "Test", None, "message", (), {}))
+
+        assert sink.dropped == 2
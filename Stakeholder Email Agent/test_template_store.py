@@ -0,0 +1,103 @@
+"""
+Unit tests for the pooled, versioned user template store
+"""
+import pytest
+import asyncio
+import sys
+import os
+from contextlib import contextmanager
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from utils.template_store import UserTemplateCache
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.result = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        return False
+    
+    def execute(self, sql, params):
+        self.db.executed.append(sql)
+        row = self.db.rows.get(params)
+        if row is None:
+            self.result = None
+        elif sql.startswith("SELECT updatedAt"):
+            self.result = {"updatedAt": row["updatedAt"]}
+        else:
+            self.result = dict(row)
+    
+    def fetchone(self):
+        return self.result
+
+class FakePool:
+    """In-memory stand-in for MySQLConnectionPool"""
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+    
+    @contextmanager
+    def connection(self):
+        yield self
+    
+    def cursor(self):
+        return FakeCursor(self)
+
+class TestUserTemplateCache:
+    """Test suite for UserTemplateCache"""
+    
+    @pytest.fixture
+    def pool(self):
+        return FakePool({(7, 1): {"promptTemplate": "Write to {stakeholder_name}", "updatedAt": "2025-12-01"}})
+    
+    def test_repeated_lookups_hit_database_once(self, pool):
+        """Test that a batch of stakeholders shares one query"""
+        cache = UserTemplateCache(pool_factory=lambda: pool)
+        
+        results = [cache.get(7, 1) for _ in range(20)]
+        
+        assert all(r == "Write to {stakeholder_name}" for r in results)
+        assert len(pool.executed) == 1
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_async_lookups_share_query(self, pool):
+        """Test that concurrent lookups off the event loop are de-duplicated"""
+        cache = UserTemplateCache(pool_factory=lambda: pool)
+        
+        results = await asyncio.gather(*[cache.get_async(7, 1) for _ in range(10)])
+        
+        assert len(set(results)) == 1
+        assert len(pool.executed) == 1
+    
+    def test_expired_entry_revalidates_by_version(self, pool):
+        """Test that only updatedAt is re-checked after the TTL"""
+        cache = UserTemplateCache(pool_factory=lambda: pool, ttl_seconds=0)
+        cache.get(7, 1)
+        
+        cache.get(7, 1)
+        assert pool.executed[-1].startswith("SELECT updatedAt")
+        
+        pool.rows[(7, 1)] = {"promptTemplate": "Edited {stakeholder_name}", "updatedAt": "2025-12-02"}
+        assert cache.get(7, 1) == "Edited {stakeholder_name}"
+    
+    def test_missing_template_returns_none(self, pool):
+        """Test lookups for templates owned by another user"""
+        cache = UserTemplateCache(pool_factory=lambda: pool)
+        
+        assert cache.get(7, 2) is None
+    
+    def test_missing_database_url_raises(self):
+        """Test that an unconfigured database is reported"""
+        cache = UserTemplateCache(pool_factory=lambda: None)
+        
+        with pytest.raises(RuntimeError):
+            cache.get(7, 1)
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -11,6 +11,8 @@ from pathlib import Path
 from typing import Optional
 from bs4 import BeautifulSoup
 
+from utils.document_model import DocumentModel
+
 
 def extract_text_from_pdf(pdf_path: str) -> str:
     """
@@ -26,6 +28,11 @@ def extract_text_from_pdf(pdf_path: str) -> str:
         FileNotFoundError: If PDF file doesn't exist
         RuntimeError: If text extraction fails
     """
+    return _extract_pdf_document(pdf_path).text
+
+
+def _extract_pdf_document(pdf_path: str) -> DocumentModel:
+    """Text and document model of a PDF file, with the page boundaries pdftotext reports."""
     if not os.path.exists(pdf_path):
         raise FileNotFoundError(f"PDF file not found: {pdf_path}")
     
@@ -38,15 +45,22 @@ def extract_text_from_pdf(pdf_path: str) -> str:
             check=True
         )
         
-        text = result.stdout
-        
-        # Clean up the extracted text
-        text = _clean_extracted_text(text)
+        # pdftotext ends every page with a form feed; clean each page and record where it starts
+        pages = result.stdout.split('\f')
+        if len(pages) > 1 and not pages[-1].strip():
+            pages.pop()
+        text = ""
+        page_starts = []
+        for page in pages:
+            page = _clean_extracted_text(page)
+            page_starts.append(len(text) + (1 if text and page else 0))
+            if page:
+                text = f"{text}\n{page}" if text else page
         
         if not text.strip():
             raise RuntimeError(f"No text extracted from PDF: {pdf_path}")
             
-        return text
+        return DocumentModel.build(text, page_starts=page_starts)
         
     except subprocess.CalledProcessError as e:
         raise RuntimeError(f"Failed to extract text from PDF: {e.stderr}")
@@ -68,6 +82,11 @@ def extract_text_from_html(html_path: str) -> str:
         FileNotFoundError: If HTML file doesn't exist
         RuntimeError: If text extraction fails
     """
+    return _extract_html_document(html_path).text
+
+
+def _extract_html_document(html_path: str) -> DocumentModel:
+    """Text and document model of an HTML file, with its <h1>-<h6> elements as headings."""
     if not os.path.exists(html_path):
         raise FileNotFoundError(f"HTML file not found: {html_path}")
     
@@ -81,6 +100,7 @@ def extract_text_from_html(html_path: str) -> str:
         # Remove script and style elements
         for script in soup(["script", "style"]):
             script.decompose()
+        headings = [h.get_text(" ", strip=True) for h in soup.find_all(["h1", "h2", "h3", "h4", "h5", "h6"])]
         
         # Get text
         text = soup.get_text()
@@ -91,7 +111,7 @@ def extract_text_from_html(html_path: str) -> str:
         if not text.strip():
             raise RuntimeError(f"No text extracted from HTML: {html_path}")
             
-        return text
+        return DocumentModel.build(text, heading_hints=headings)
         
     except Exception as e:
         raise RuntimeError(f"Failed to extract text from HTML: {str(e)}")
@@ -134,6 +154,31 @@ def extract_text_from_file(file_path: str) -> str:
         )
 
 
+def extract_document_from_file(file_path: str) -> DocumentModel:
+    """
+    Extract text from a file together with its document model (see utils/document_model.py).
+    The model's text is the same as extract_text_from_file returns; PDFs add their page
+    boundaries and HTML files their headings.
+    
+    Args:
+        file_path: Path to the file
+        
+    Returns:
+        DocumentModel whose .text is the extracted text
+        
+    Raises:
+        ValueError: If file format is not supported
+        FileNotFoundError: If file doesn't exist
+        RuntimeError: If text extraction fails
+    """
+    file_ext = Path(file_path).suffix.lower()
+    if file_ext == '.pdf':
+        return _extract_pdf_document(file_path)
+    if file_ext in ['.html', '.htm']:
+        return _extract_html_document(file_path)
+    return DocumentModel.build(extract_text_from_file(file_path))
+
+
 def _clean_extracted_text(text: str) -> str:
     """
     Clean up extracted text by removing excessive whitespace and normalizing line breaks.
@@ -0,0 +1,44 @@
+"""
+Token Estimation Utilities
+OpenRouter responses are consumed as plain text, so token usage is estimated locally
+"""
+
+# Rough average for English prose across the Gemini/GPT tokenizers we route to
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a piece of text.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count (0 for empty text)
+    """
+    if not text:
+        return 0
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def estimate_message_tokens(messages: list) -> int:
+    """
+    Estimate the prompt tokens of a chat message list.
+
+    Multimodal content lists are supported; only their text parts are counted.
+
+    Args:
+        messages: List of message dictionaries with 'role' and 'content'
+
+    Returns:
+        Estimated token count
+    """
+    total = 0
+    for message in messages:
+        content = message.get('content', '')
+        if isinstance(content, list):
+            total += sum(estimate_tokens(part.get('text', '')) for part in content if part.get('type') == 'text')
+        else:
+            total += estimate_tokens(content)
+    return total
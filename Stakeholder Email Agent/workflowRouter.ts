@@ -4,13 +4,13 @@ import { storagePut } from "./storage";
 import { 
   createWorkflow, getWorkflow, getUserWorkflows, updateWorkflow,
   createStakeholders, getWorkflowStakeholders, updateStakeholderSelection, getSelectedStakeholders,
-  createEmails, getWorkflowEmails, updateEmail,
+  replaceStakeholderEmails, getWorkflowEmails, updateEmail,
   createLogs, getWorkflowLogs,
   getDb
 } from "./db";
 import { emailTemplates } from "../drizzle/schema";
 import { eq } from "drizzle-orm";
-import { spawn, exec } from "child_process";
+import { spawn, exec, type ChildProcess } from "child_process";
 import { randomBytes } from "crypto";
 import { promisify } from "util";
 import { writeFile, unlink, readFile } from "fs/promises";
@@ -49,8 +49,13 @@ async function prepareReportInput(reportUrl: string, filename: string): Promise<
 /**
  * Execute Python bridge script and return JSON result
  * Captures logs from stderr and saves them to database in real-time
+ * Finished emails streamed on stderr ("email" events) are passed to onEmail as they arrive
  */
-export async function executePythonBridge(input: any, workflowId: number): Promise<any> {
+export async function executePythonBridge(
+  input: any,
+  workflowId: number,
+  onEmail?: (email: any) => Promise<void>
+): Promise<any> {
   return new Promise((resolve, reject) => {
     const apiKey = process.env.OPENROUTER_API_KEY;
     console.log(`[Python Bridge] API Key available: ${apiKey ? 'YES (length: ' + apiKey.length + ')' : 'NO'}`);
@@ -62,6 +67,8 @@ export async function executePythonBridge(input: any, workflowId: number): Promi
         ...process.env, 
         OPENROUTER_API_KEY: apiKey || "",
         DATABASE_URL: process.env.DATABASE_URL || "",
+        // Keys the bridge's generation checkpoints, so a retried workflow resumes
+        WORKFLOW_ID: String(workflowId),
         PYTHONPATH: "/usr/local/lib/python3.11/dist-packages:/usr/lib/python3/dist-packages",
         PYTHONHOME: "/usr"
       }
@@ -96,6 +103,8 @@ export async function executePythonBridge(input: any, workflowId: number): Promi
                 testId: logData.data.testId || null,
                 metadata: logData.data.metadata ? JSON.stringify(logData.data.metadata) : null,
               }]);
+            } else if (logData.type === "email" && logData.data && onEmail) {
+              await onEmail(logData.data);
             }
           } catch (e) {
             console.error("Failed to parse log line:", line, e);
@@ -130,6 +139,63 @@ export async function executePythonBridge(input: any, workflowId: number): Promi
   });
 }
 
+/**
+ * Background context precomputation, at most one process per workflow
+ * Started after extraction so relevant context is extracted and stored while the user
+ * selects stakeholders; generateEmails then starts from warm context. The process stops
+ * before its next LLM call on SIGTERM (generation started or the workflow was
+ * re-extracted) and on its own deadline (CONTEXT_PRECOMPUTE_SECONDS) when the workflow
+ * is abandoned. Disabled with CONTEXT_PRECOMPUTE=0.
+ */
+const precomputeProcesses = new Map<number, ChildProcess>();
+
+function startContextPrecompute(workflowId: number, reportInput: any, stakeholders: any[]) {
+  if (process.env.CONTEXT_PRECOMPUTE === "0" || stakeholders.length === 0) {
+    return;
+  }
+  stopContextPrecompute(workflowId);
+
+  const precomputeProcess = spawn("/usr/bin/python3.11", [
+    "/home/ubuntu/stakeholder_webapp/server/agentic_system/precompute_bridge.py"
+  ], {
+    env: {
+      ...process.env,
+      OPENROUTER_API_KEY: process.env.OPENROUTER_API_KEY || "",
+      WORKFLOW_ID: String(workflowId),
+      PYTHONPATH: "/usr/local/lib/python3.11/dist-packages:/usr/lib/python3/dist-packages",
+      PYTHONHOME: "/usr"
+    },
+    stdio: ["pipe", "pipe", "ignore"]
+  });
+  precomputeProcesses.set(workflowId, precomputeProcess);
+
+  let stdout = "";
+  precomputeProcess.stdout?.on("data", (data) => {
+    stdout += data.toString();
+  });
+  precomputeProcess.on("close", (code) => {
+    if (precomputeProcesses.get(workflowId) === precomputeProcess) {
+      precomputeProcesses.delete(workflowId);
+    }
+    console.log(`[Context Precompute] Workflow ${workflowId} finished with code ${code}: ${stdout.trim().substring(0, 500)}`);
+  });
+  precomputeProcess.on("error", (error) => {
+    precomputeProcesses.delete(workflowId);
+    console.error(`[Context Precompute] Workflow ${workflowId} could not start:`, error);
+  });
+
+  precomputeProcess.stdin?.write(JSON.stringify({ workflowId, reportInput, stakeholders }));
+  precomputeProcess.stdin?.end();
+}
+
+function stopContextPrecompute(workflowId: number) {
+  const precomputeProcess = precomputeProcesses.get(workflowId);
+  if (precomputeProcess) {
+    precomputeProcesses.delete(workflowId);
+    precomputeProcess.kill("SIGTERM");
+  }
+}
+
 export const workflowRouter = router({
   /**
    * Upload research report and create new workflow
@@ -178,6 +244,9 @@ export const workflowRouter = router({
         throw new Error("Workflow not found");
       }
 
+      // A re-extraction replaces the stakeholders a running precomputation works on
+      stopContextPrecompute(input.workflowId);
+
       // Update status to extracting
       console.log(`[extractStakeholders] Updating status to extracting`);
       await updateWorkflow(input.workflowId, { status: "extracting" });
@@ -242,6 +311,15 @@ export const workflowRouter = router({
         });
         console.log(`[extractStakeholders] Workflow updated to ready`);
 
+        // Extract context for every stakeholder in the background while the user selects
+        const savedStakeholders = await getWorkflowStakeholders(input.workflowId);
+        startContextPrecompute(input.workflowId, reportInput, savedStakeholders.map(s => ({
+          id: s.id,
+          name: s.name,
+          title: s.title,
+          details: s.details,
+        })));
+
         // Save logs
         if (result.logs) {
           await createLogs(result.logs.map((log: any) => ({
@@ -331,6 +409,9 @@ export const workflowRouter = router({
         throw new Error("Workflow not found");
       }
 
+      // Generation extracts whatever context is still missing itself
+      stopContextPrecompute(input.workflowId);
+
       // Update workflow with generation mode
       await updateWorkflow(input.workflowId, {
         status: "generating",
@@ -361,6 +442,28 @@ export const workflowRouter = router({
         // Prepare report input (file URL or text content)
         const reportInput = await prepareReportInput(workflow.reportUrl, workflow.reportFilename);
 
+        const toEmailRecord = (email: any) => ({
+          workflowId: input.workflowId,
+          stakeholderId: email.stakeholder_id || 0,
+          subject: email.email_subject || email.subject || 'No subject',
+          body: email.email_body || email.body || 'No body generated',
+          qualityScore: email.quality_score ? Math.round(email.quality_score * 10) : null,
+          reflectionNotes: email.reflection_notes || null,
+          generationMode: input.generationMode,
+          templateId: input.generationMode === 'template' && input.modeConfig?.template_id ? input.modeConfig.template_id : null,
+        });
+
+        // Persist each email as soon as the bridge reports it finished. A resumed run re-reports
+        // the emails saved before the interruption, so each save replaces the stakeholder's earlier rows
+        const persistedStakeholderIds = new Set<number>();
+        const saveStreamedEmail = async (email: any) => {
+          if (!email.stakeholder_id || persistedStakeholderIds.has(email.stakeholder_id)) {
+            return;
+          }
+          persistedStakeholderIds.add(email.stakeholder_id);
+          await replaceStakeholderEmails(input.workflowId, [toEmailRecord(email)]);
+        };
+
         // Execute Python bridge to generate emails
         const result = await executePythonBridge({
           action: "generate_emails",
@@ -368,6 +471,7 @@ export const workflowRouter = router({
           userId: ctx.user.id,
           reportInput,
           selectedStakeholders: selectedStakeholders.map(s => ({
+            id: s.id,
             name: s.name,
             title: s.title,
             details: s.details,
@@ -375,7 +479,7 @@ export const workflowRouter = router({
           companySummary: workflow.companySummary,
           generationMode: input.generationMode,
           modeConfig: input.modeConfig,
-        }, input.workflowId);
+        }, input.workflowId, saveStreamedEmail);
 
         if (!result.success) {
           await updateWorkflow(input.workflowId, {
@@ -398,18 +502,22 @@ export const workflowRouter = router({
           throw new Error(result.error);
         }
 
-        // Save generated emails to database
-        const emailRecords = result.emails.map((email: any, index: number) => ({
-          workflowId: input.workflowId,
-          stakeholderId: selectedStakeholders[index]?.id || 0,
-          subject: email.email_subject || email.subject || 'No subject',
-          body: email.email_body || email.body || 'No body generated',
-          qualityScore: email.quality_score ? Math.round(email.quality_score * 10) : null,
-          reflectionNotes: email.reflection_notes || null,
-          generationMode: input.generationMode,
-          templateId: input.generationMode === 'template' && input.modeConfig?.template_id ? input.modeConfig.template_id : null,
-        }));
-        await createEmails(emailRecords);
+        // Save generated emails that were not already persisted while streaming
+        const emailRecords = result.emails
+          .map((email: any, index: number) => ({
+            ...email,
+            stakeholder_id: email.stakeholder_id || selectedStakeholders[index]?.id || 0,
+          }))
+          .filter((email: any) => {
+            // Claim the id so a late stream event for the same stakeholder is ignored
+            if (persistedStakeholderIds.has(email.stakeholder_id)) {
+              return false;
+            }
+            persistedStakeholderIds.add(email.stakeholder_id);
+            return true;
+          })
+          .map(toEmailRecord);
+        await replaceStakeholderEmails(input.workflowId, emailRecords);
 
         // Update workflow status
         await updateWorkflow(input.workflowId, {